@@ -2,4 +2,12 @@
 
 __all__ = ["ProcessingOptions", "process_midi_to_workbook", "extract_light_chorus_events"]
 
-from .processor import ProcessingOptions, extract_light_chorus_events, process_midi_to_workbook
+
+def __getattr__(name):
+    # Import the processor lazily so dependency-free helpers such as
+    # light_chorus_app.pitch_tables can be used without mido/openpyxl installed.
+    if name in __all__:
+        from . import processor
+
+        return getattr(processor, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
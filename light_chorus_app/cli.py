@@ -0,0 +1,237 @@
+"""Headless batch conversion for Light Chorus MIDI exports."""
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .incremental import CACHE_SUFFIX, extract_light_chorus_events_incremental
+from .processor import (
+    ProcessingOptions,
+    build_workbook,
+    export_csv,
+    export_json,
+    extract_light_chorus_events,
+)
+
+OUTPUT_FORMATS = ("xlsx", "csv", "json")
+OUTPUT_SUFFIX = ".light_chorus"
+CACHE_FILE_NAME = ".light_chorus_batch_cache.json"
+CACHE_VERSION = 1
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def expand_inputs(patterns: Sequence[str]) -> List[Path]:
+    """Resolve files and glob patterns into a de-duplicated, ordered path list."""
+
+    resolved: Dict[Path, None] = {}
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise FileNotFoundError(f"No MIDI files match {pattern}")
+        for match in sorted(matches):
+            path = Path(match).resolve()
+            if not path.is_file():
+                raise FileNotFoundError(path)
+            resolved.setdefault(path, None)
+    return list(resolved)
+
+
+def output_paths_for(midi_path: Path, output_dir: Optional[Path], formats: Sequence[str]) -> Dict[str, Path]:
+    target_dir = output_dir or midi_path.parent
+    return {fmt: target_dir / f"{midi_path.stem}{OUTPUT_SUFFIX}.{fmt}" for fmt in formats}
+
+
+def convert_file(
+    midi_path: str,
+    outputs: Dict[str, str],
+    options: ProcessingOptions,
+    incremental: bool = False,
+) -> Dict[str, Any]:
+    """Convert one MIDI file; runs inside a worker process."""
+
+    started = time.perf_counter()
+    diff_summary: Optional[Dict[str, int]] = None
+    if incremental:
+        target_dir = Path(next(iter(outputs.values()))).parent
+        stem = Path(midi_path).stem
+        events, part_order, diff = extract_light_chorus_events_incremental(
+            midi_path,
+            options,
+            cache_path=target_dir / f"{stem}{CACHE_SUFFIX}",
+        )
+        diff_path = target_dir / f"{stem}{OUTPUT_SUFFIX}.diff.json"
+        diff_path.write_text(json.dumps(diff.to_payload(), indent=2) + "\n")
+        diff_summary = {"added": len(diff.added), "removed": len(diff.removed), "changed": len(diff.changed)}
+    else:
+        events, part_order = extract_light_chorus_events(midi_path, options)
+    if "xlsx" in outputs:
+        build_workbook(events, part_order, write_only=options.write_only).save(outputs["xlsx"])
+    if "csv" in outputs:
+        export_csv(events, part_order, outputs["csv"])
+    if "json" in outputs:
+        export_json(events, part_order, outputs["json"])
+    return {
+        "eventCount": len(events),
+        "seconds": round(time.perf_counter() - started, 3),
+        "diff": diff_summary,
+    }
+
+
+def load_cache(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    try:
+        payload = json.loads(path.read_text())
+    except json.JSONDecodeError:
+        return {}
+    if payload.get("version") != CACHE_VERSION:
+        return {}
+    return payload.get("entries", {})
+
+
+def write_cache(path: Path, entries: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.tmp")
+    temp_path.write_text(json.dumps({"version": CACHE_VERSION, "entries": entries}, indent=2) + "\n")
+    temp_path.replace(path)
+
+
+def is_up_to_date(cached: Optional[Dict[str, Any]], digest: str, options_key: Dict[str, Any], outputs: Dict[str, Path]) -> bool:
+    if not cached:
+        return False
+    if cached.get("sha256") != digest or cached.get("options") != options_key:
+        return False
+    if sorted(cached.get("outputs", [])) != sorted(str(path) for path in outputs.values()):
+        return False
+    return all(path.exists() for path in outputs.values())
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Convert Light Chorus MIDI exports to spreadsheets in parallel, skipping unchanged inputs."
+    )
+    parser.add_argument("inputs", nargs="+", help="MIDI files or glob patterns (quote globs to use ** recursion).")
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="Directory for generated files. Defaults to writing next to each MIDI file.",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=OUTPUT_FORMATS,
+        default=["xlsx"],
+        help="Output formats to write for every input.",
+    )
+    parser.add_argument(
+        "--octave-offset",
+        type=int,
+        default=ProcessingOptions.octave_offset,
+        help="-1 for scientific pitch (C4 = MIDI 60), 0 for project legacy numbering (C5 = MIDI 60).",
+    )
+    parser.add_argument("--short-base-note", type=int, default=ProcessingOptions.short_sample_base_note)
+    parser.add_argument("--write-only", action="store_true", help="Stream XLSX rows through openpyxl's write-only mode.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse cached per-part tick maps and write a <name>.light_chorus.diff.json revision diff.",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true", help="Convert every input even if its content hash is unchanged.")
+    parser.add_argument(
+        "--cache-file",
+        type=Path,
+        default=None,
+        help=f"Hash cache location. Defaults to {CACHE_FILE_NAME} in the output directory (or the working directory).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    options = ProcessingOptions(
+        octave_offset=args.octave_offset,
+        short_sample_base_note=args.short_base_note,
+        write_only=args.write_only,
+    )
+    options_key = {**asdict(options), "formats": sorted(args.formats)}
+    output_dir = args.output_dir.resolve() if args.output_dir else None
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    cache_path = args.cache_file or (output_dir or Path.cwd()) / CACHE_FILE_NAME
+    cache = load_cache(cache_path)
+
+    midi_paths = expand_inputs(args.inputs)
+    jobs: Dict[Path, Dict[str, Path]] = {}
+    claimed: Dict[Path, Path] = {}
+    digests: Dict[Path, str] = {}
+    skipped = 0
+    for midi_path in midi_paths:
+        outputs = output_paths_for(midi_path, output_dir, args.formats)
+        for output_path in outputs.values():
+            if output_path in claimed:
+                raise SystemExit(f"{midi_path} and {claimed[output_path]} would both write {output_path}")
+            claimed[output_path] = midi_path
+        digests[midi_path] = sha256_file(midi_path)
+        if not args.force and is_up_to_date(cache.get(str(midi_path)), digests[midi_path], options_key, outputs):
+            skipped += 1
+            print(f"= {midi_path.name} unchanged")
+            continue
+        jobs[midi_path] = outputs
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(jobs) or 1))) as executor:
+        futures = {
+            executor.submit(
+                convert_file,
+                str(midi_path),
+                {fmt: str(path) for fmt, path in outputs.items()},
+                options,
+                args.incremental,
+            ): midi_path
+            for midi_path, outputs in jobs.items()
+        }
+        for future in as_completed(futures):
+            midi_path = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:  # noqa: BLE001
+                failures += 1
+                cache.pop(str(midi_path), None)
+                print(f"❌ {midi_path.name}: {exc}", file=sys.stderr)
+                continue
+            cache[str(midi_path)] = {
+                "sha256": digests[midi_path],
+                "options": options_key,
+                "outputs": sorted(str(path) for path in jobs[midi_path].values()),
+                "eventCount": result["eventCount"],
+            }
+            diff_note = ""
+            if result["diff"] is not None:
+                diff_note = " (+{added} -{removed} ~{changed})".format(**result["diff"])
+            print(f"✅ {midi_path.name}: {result['eventCount']} events in {result['seconds']:.2f}s{diff_note}")
+
+    write_cache(cache_path, cache)
+    print(f"Converted {len(jobs) - failures}, skipped {skipped}, failed {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,9 +2,11 @@
 from __future__ import annotations
 
 import sys
+import threading
 from pathlib import Path
 
-from PyQt6.QtCore import Qt, QUrl
+import mido
+from PyQt6.QtCore import QObject, QRunnable, Qt, QThreadPool, QUrl, pyqtSignal
 from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtWidgets import (
     QApplication,
@@ -16,22 +18,105 @@ from PyQt6.QtWidgets import (
     QLineEdit,
     QMainWindow,
     QMessageBox,
+    QProgressBar,
     QPushButton,
     QPlainTextEdit,
+    QTableWidget,
+    QTableWidgetItem,
     QWidget,
 )
 
-from .processor import ProcessingOptions, process_midi_to_workbook
+from .processor import (
+    EventColumn,
+    ProcessingOptions,
+    build_workbook,
+    iter_light_chorus_events,
+    light_chorus_part_order,
+)
 
 APP_TITLE = "Flashlights Light Chorus Builder"
 DEFAULT_OUTPUT_NAME = "LightChorusEvents.xlsx"
+PREVIEW_COLUMN_COUNT = 16
+
+# Conversion stages with the progress percentage reported when each one starts
+STAGE_PROGRESS = (
+    ("parse", "Parsing MIDI", 0),
+    ("extract", "Extracting events", 20),
+    ("build", "Building workbook", 60),
+    ("save", "Saving spreadsheet", 85),
+)
+
+
+class ConversionCancelled(Exception):
+    """Raised inside the worker when the user cancels between stages."""
+
+
+class ConversionSignals(QObject):
+    stage = pyqtSignal(str, str, int)  # key, label, percent
+    preview = pyqtSignal(object)  # EventColumn
+    finished = pyqtSignal(str, int)  # output path, event count
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class ConversionWorker(QRunnable):
+    """Runs MIDI → spreadsheet conversion off the UI thread."""
+
+    def __init__(self, midi_path: Path, output_path: Path, options: ProcessingOptions) -> None:
+        super().__init__()
+        self.midi_path = midi_path
+        self.output_path = output_path
+        self.options = options
+        self.signals = ConversionSignals()
+        self._cancel_requested = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel_requested.set()
+
+    def _enter_stage(self, key: str) -> None:
+        if self._cancel_requested.is_set():
+            raise ConversionCancelled()
+        for stage_key, label, percent in STAGE_PROGRESS:
+            if stage_key == key:
+                self.signals.stage.emit(stage_key, label, percent)
+                return
+
+    def run(self) -> None:
+        try:
+            self._enter_stage("parse")
+            midi_file = mido.MidiFile(str(self.midi_path))
+
+            self._enter_stage("extract")
+            events: list[EventColumn] = []
+            for event in iter_light_chorus_events(midi_file, self.options):
+                if self._cancel_requested.is_set():
+                    raise ConversionCancelled()
+                events.append(event)
+                if len(events) <= PREVIEW_COLUMN_COUNT:
+                    self.signals.preview.emit(event)
+
+            self._enter_stage("build")
+            workbook = build_workbook(events, light_chorus_part_order(), write_only=self.options.write_only)
+
+            self._enter_stage("save")
+            # Save next to the target first so a failed save never clobbers the previous output
+            temp_path = self.output_path.with_name(f".{self.output_path.name}.partial")
+            workbook.save(str(temp_path))
+            temp_path.replace(self.output_path)
+        except ConversionCancelled:
+            self.signals.cancelled.emit()
+            return
+        except Exception as exc:  # noqa: BLE001
+            self.signals.failed.emit(str(exc))
+            return
+        self.signals.finished.emit(str(self.output_path), len(events))
 
 
 class MainWindow(QMainWindow):
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle(APP_TITLE)
-        self.resize(720, 420)
+        self.resize(860, 620)
 
         container = QWidget(self)
         self.setCentralWidget(container)
@@ -78,24 +163,43 @@ class MainWindow(QMainWindow):
         # Action buttons
         self.generate_button = QPushButton("Generate Spreadsheet", self)
         self.generate_button.clicked.connect(self._generate)
+        self.cancel_button = QPushButton("Cancel", self)
+        self.cancel_button.clicked.connect(self._cancel)
+        self.cancel_button.setEnabled(False)
         self.open_button = QPushButton("Reveal Output", self)
         self.open_button.clicked.connect(self._reveal_output)
         self.open_button.setEnabled(False)
 
         button_row = QHBoxLayout()
         button_row.addWidget(self.generate_button)
+        button_row.addWidget(self.cancel_button)
         button_row.addWidget(self.open_button)
         button_row.addStretch(1)
 
         layout.addLayout(button_row, 3, 0, 1, 2)
 
+        # Progress for the background conversion stages
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar, 4, 0, 1, 2)
+
+        # Live preview of the first event columns while extraction runs
+        part_order = light_chorus_part_order()
+        self.preview_table = QTableWidget(3 + len(part_order), 0, self)
+        self.preview_table.setVerticalHeaderLabels(["Event #", "Measure #", "Position (beat)", *part_order])
+        self.preview_table.horizontalHeader().setVisible(False)
+        layout.addWidget(self.preview_table, 5, 0, 1, 2)
+
         # Status console
         self.status_console = QPlainTextEdit(self)
         self.status_console.setReadOnly(True)
         self.status_console.setPlaceholderText("Status messages will appear here…")
-        layout.addWidget(self.status_console, 4, 0, 1, 2)
+        layout.addWidget(self.status_console, 6, 0, 1, 2)
 
         self._last_output_path: Path | None = None
+        self._worker: ConversionWorker | None = None
+        self._thread_pool = QThreadPool.globalInstance()
 
     # --- UI helpers -------------------------------------------------
     def _select_midi_file(self) -> None:
@@ -152,24 +256,72 @@ class MainWindow(QMainWindow):
         options = ProcessingOptions(octave_offset=octave_offset)
 
         self._log("Starting conversion…")
-        self.generate_button.setEnabled(False)
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        try:
-            workbook = process_midi_to_workbook(str(midi_path), str(output_path), options=options)
-        except Exception as exc:  # noqa: BLE001
-            QApplication.restoreOverrideCursor()
-            self.generate_button.setEnabled(True)
-            self._log(f"❌ Error: {exc}")
-            QMessageBox.critical(self, APP_TITLE, f"Failed to build spreadsheet:\n{exc}")
+        self.preview_table.setColumnCount(0)
+        self.progress_bar.setValue(0)
+        self._set_running(True)
+
+        worker = ConversionWorker(midi_path, output_path, options)
+        worker.signals.stage.connect(self._on_stage)
+        worker.signals.preview.connect(self._on_preview)
+        worker.signals.finished.connect(self._on_finished)
+        worker.signals.failed.connect(self._on_failed)
+        worker.signals.cancelled.connect(self._on_cancelled)
+        self._worker = worker
+        self._thread_pool.start(worker)
+
+    def _cancel(self) -> None:
+        if self._worker is None:
             return
-
-        QApplication.restoreOverrideCursor()
-        self.generate_button.setEnabled(True)
-        self._last_output_path = output_path
+        self._log("Cancelling…")
+        self.cancel_button.setEnabled(False)
+        self._worker.cancel()
+
+    def _set_running(self, running: bool) -> None:
+        self.generate_button.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+        if running:
+            QApplication.setOverrideCursor(Qt.CursorShape.BusyCursor)
+        else:
+            QApplication.restoreOverrideCursor()
+            self._worker = None
+
+    # --- worker callbacks ------------------------------------------
+    def _on_stage(self, _key: str, label: str, percent: int) -> None:
+        self.progress_bar.setValue(percent)
+        self.progress_bar.setFormat(f"{label}… %p%")
+        self._log(f"{label}…")
+
+    def _on_preview(self, event: EventColumn) -> None:
+        column = self.preview_table.columnCount()
+        self.preview_table.insertColumn(column)
+        values = [str(event.number), str(event.measure), event.position_label]
+        for part_name in light_chorus_part_order():
+            entries = event.part_notes.get(part_name) or []
+            values.append(", ".join(entry.note_name for entry in entries))
+        for row, value in enumerate(values):
+            self.preview_table.setItem(row, column, QTableWidgetItem(value))
+
+    def _on_finished(self, output_path: str, event_count: int) -> None:
+        self._set_running(False)
+        self.progress_bar.setValue(100)
+        self.progress_bar.setFormat("Done")
+        self._last_output_path = Path(output_path)
         self.open_button.setEnabled(True)
-        self._log(f"✅ Created {output_path}")
+        self._log(f"✅ Created {output_path} ({event_count} events)")
         QMessageBox.information(self, APP_TITLE, "Spreadsheet generated successfully!")
 
+    def _on_failed(self, message: str) -> None:
+        self._set_running(False)
+        self.progress_bar.setFormat("Failed")
+        self._log(f"❌ Error: {message}")
+        QMessageBox.critical(self, APP_TITLE, f"Failed to build spreadsheet:\n{message}")
+
+    def _on_cancelled(self) -> None:
+        self._set_running(False)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("Cancelled")
+        self._log("Conversion cancelled; existing output left untouched.")
+
     def _reveal_output(self) -> None:
         if not self._last_output_path or not self._last_output_path.exists():
             QMessageBox.information(self, APP_TITLE, "Build the spreadsheet first.")
@@ -179,6 +331,12 @@ class MainWindow(QMainWindow):
     def _log(self, message: str) -> None:
         self.status_console.appendPlainText(message)
 
+    def closeEvent(self, event) -> None:  # noqa: N802 - Qt override
+        if self._worker is not None:
+            self._worker.cancel()
+            self._thread_pool.waitForDone()
+        super().closeEvent(event)
+
 
 def run_app() -> None:
     app = QApplication(sys.argv)
@@ -0,0 +1,331 @@
+"""Incremental Light Chorus extraction with score-revision diffs."""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import mido
+
+from .processor import (
+    EventColumn,
+    NoteEntry,
+    ProcessingOptions,
+    TimeSignatureMap,
+    _build_note_entry,
+    _collect_note_on_events,
+    _part_track_indices,
+    light_chorus_part_order,
+)
+
+CACHE_VERSION = 2
+CACHE_SUFFIX = ".light_chorus_cache.json"
+TRACK_NAME_META = 0x03
+SYSTEM_DATA_BYTES = {0xF1: 1, 0xF2: 2, 0xF3: 1}
+
+
+@dataclass
+class EventDiff:
+    """Event columns that moved between two revisions of the same score."""
+
+    changed_parts: List[str] = field(default_factory=list)
+    added: List[EventColumn] = field(default_factory=list)
+    removed: List[EventColumn] = field(default_factory=list)
+    changed: List[Tuple[EventColumn, EventColumn]] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def to_payload(self) -> Dict[str, Any]:
+        def column(event: EventColumn) -> Dict[str, Any]:
+            return {
+                "number": event.number,
+                "tick": event.tick,
+                "measure": event.measure,
+                "position": event.position_label,
+                "parts": {
+                    part_name: [entry.note_name for entry in entries]
+                    for part_name, entries in event.part_notes.items()
+                },
+            }
+
+        return {
+            "changedParts": self.changed_parts,
+            "added": [column(event) for event in self.added],
+            "removed": [column(event) for event in self.removed],
+            "changed": [{"before": column(before), "after": column(after)} for before, after in self.changed],
+        }
+
+
+@dataclass(frozen=True)
+class RawMidiFile:
+    """A Standard MIDI File split into its header fields and undecoded ``MTrk`` bodies."""
+
+    midi_type: int
+    ticks_per_beat: int
+    tracks: List[bytes]
+
+    @classmethod
+    def read(cls, midi_path: str) -> "RawMidiFile":
+        """Split the file the way mido reads it: ``MThd``, then one ``MTrk`` chunk per track."""
+
+        data = Path(midi_path).read_bytes()
+        name, size = struct.unpack_from(">4sL", data, 0)
+        if name != b"MThd":
+            raise OSError("MThd not found. Probably not a MIDI file")
+        midi_type, track_count, ticks_per_beat = struct.unpack_from(">hhh", data, 8)
+        offset = 8 + size
+        tracks: List[bytes] = []
+        for _ in range(track_count):
+            if offset + 8 > len(data):
+                raise EOFError
+            name, size = struct.unpack_from(">4sL", data, offset)
+            if name != b"MTrk":
+                raise OSError("no MTrk header at start of track")
+            tracks.append(data[offset + 8 : offset + 8 + size])
+            offset += 8 + size
+        return cls(midi_type, ticks_per_beat, tracks)
+
+    def parse(self, index: int) -> mido.MidiFile:
+        """Decode one track with mido, as a single-track file with this file's header."""
+
+        chunk = self.tracks[index]
+        data = (
+            struct.pack(">4sLhhh", b"MThd", 6, self.midi_type, 1, self.ticks_per_beat)
+            + struct.pack(">4sL", b"MTrk", len(chunk))
+            + chunk
+        )
+        return mido.MidiFile(file=io.BytesIO(data))
+
+
+def track_fingerprint(chunk: bytes) -> str:
+    """Hash the raw ``MTrk`` body, so any edit to a track changes its key without decoding it."""
+
+    return hashlib.sha256(chunk).hexdigest()
+
+
+def _read_varlen(chunk: bytes, offset: int) -> Tuple[int, int]:
+    value = 0
+    while True:
+        byte = chunk[offset]
+        offset += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, offset
+
+
+def raw_track_name(chunk: bytes) -> str:
+    """Return the first track-name meta event, walking the events without building messages.
+
+    Matches ``mido.MidiTrack.name``, including running status and mido's default
+    latin-1 meta charset.
+    """
+
+    offset = 0
+    last_status: Optional[int] = None
+    while offset < len(chunk):
+        _, offset = _read_varlen(chunk, offset)
+        status = chunk[offset]
+        offset += 1
+        if status < 0x80:
+            if last_status is None:
+                raise OSError("running status without last_status")
+            status = last_status
+            offset -= 1
+        elif status != 0xFF:
+            # Meta events don't set running status
+            last_status = status
+        if status == 0xFF:
+            meta_type = chunk[offset]
+            length, offset = _read_varlen(chunk, offset + 1)
+            if meta_type == TRACK_NAME_META:
+                return chunk[offset : offset + length].decode("latin1")
+            offset += length
+        elif status in (0xF0, 0xF7):
+            length, offset = _read_varlen(chunk, offset)
+            offset += length
+        elif status < 0xF0:
+            offset += 1 if 0xC0 <= status < 0xE0 else 2
+        else:
+            offset += SYSTEM_DATA_BYTES.get(status, 0)
+    return ""
+
+
+def default_cache_path(midi_path: str) -> Path:
+    path = Path(midi_path)
+    return path.with_name(f"{path.stem}{CACHE_SUFFIX}")
+
+
+def _load_cache(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    try:
+        payload = json.loads(path.read_text())
+    except json.JSONDecodeError:
+        return {}
+    if payload.get("version") != CACHE_VERSION:
+        return {}
+    return payload
+
+
+def _write_cache(path: Path, payload: Dict[str, Any]) -> None:
+    temp_path = path.with_name(f"{path.name}.tmp")
+    temp_path.write_text(json.dumps(payload, separators=(",", ":")) + "\n")
+    temp_path.replace(path)
+
+
+def _decode_tick_map(raw: Dict[str, List[int]]) -> Dict[int, List[int]]:
+    return {int(tick): notes for tick, notes in raw.items()}
+
+
+def _merge_columns(
+    part_tick_maps: Dict[str, Dict[int, List[int]]],
+    positions: Dict[int, Tuple[int, str]],
+    opts: ProcessingOptions,
+    reusable: Optional[Dict[int, Dict[str, List[NoteEntry]]]] = None,
+    dirty_ticks: Optional[Set[int]] = None,
+) -> List[EventColumn]:
+    """Merge per-part tick maps into numbered columns.
+
+    Columns whose tick is not in ``dirty_ticks`` keep the note entries from ``reusable``.
+    """
+
+    reusable = reusable or {}
+    unique_ticks = sorted({tick for mapping in part_tick_maps.values() for tick in mapping})
+    events: List[EventColumn] = []
+    for column_index, tick in enumerate(unique_ticks, start=1):
+        part_entries = reusable.get(tick)
+        if part_entries is None or dirty_ticks is None or tick in dirty_ticks:
+            part_entries = {}
+            for part_name, tick_map in part_tick_maps.items():
+                notes = tick_map.get(tick)
+                if not notes:
+                    continue
+                part_entries[part_name] = [
+                    _build_note_entry(note, opts.octave_offset, opts.short_sample_base_note)
+                    for note in notes
+                ]
+        measure, beat_label = positions[tick]
+        events.append(EventColumn(number=column_index, tick=tick, measure=measure, position_label=beat_label, part_notes=part_entries))
+    return events
+
+
+def _columns_differ(before: EventColumn, after: EventColumn) -> bool:
+    if (before.measure, before.position_label) != (after.measure, after.position_label):
+        return True
+    before_notes = {part: [entry.midi for entry in entries] for part, entries in before.part_notes.items()}
+    after_notes = {part: [entry.midi for entry in entries] for part, entries in after.part_notes.items()}
+    return before_notes != after_notes
+
+
+def diff_event_columns(previous: List[EventColumn], current: List[EventColumn], changed_parts: List[str]) -> EventDiff:
+    """Compare two column lists by onset tick; renumbering alone is not reported."""
+
+    previous_by_tick = {event.tick: event for event in previous}
+    current_by_tick = {event.tick: event for event in current}
+    diff = EventDiff(changed_parts=changed_parts)
+    for tick, event in current_by_tick.items():
+        before = previous_by_tick.get(tick)
+        if before is None:
+            diff.added.append(event)
+        elif _columns_differ(before, event):
+            diff.changed.append((before, event))
+    diff.removed = [event for tick, event in previous_by_tick.items() if tick not in current_by_tick]
+    return diff
+
+
+def extract_light_chorus_events_incremental(
+    midi_path: str,
+    options: Optional[ProcessingOptions] = None,
+    cache_path: Optional[Path] = None,
+) -> Tuple[List[EventColumn], List[str], EventDiff]:
+    """Like :func:`extract_light_chorus_events`, but reuse per-part tick maps from the last run.
+
+    Each part track is fingerprinted from its raw ``MTrk`` bytes; only parts whose
+    fingerprint changed are decoded with mido and re-merged into the column list. A time-signature or option change invalidates
+    everything. The returned :class:`EventDiff` lists columns added, removed and changed
+    since the cached revision (all columns count as added on the first run).
+    """
+
+    opts = options or ProcessingOptions()
+    cache_file = cache_path or default_cache_path(midi_path)
+    cache = _load_cache(cache_file)
+    options_key = {"octave_offset": opts.octave_offset, "short_sample_base_note": opts.short_sample_base_note}
+
+    raw_file = RawMidiFile.read(midi_path)
+    part_indices = _part_track_indices([raw_track_name(chunk) for chunk in raw_file.tracks])
+    meter_fingerprint = track_fingerprint(raw_file.tracks[0])
+    cache_valid = (
+        cache.get("options") == options_key
+        and cache.get("meterFingerprint") == meter_fingerprint
+        and cache.get("ticksPerBeat") == raw_file.ticks_per_beat
+    )
+    # The previous revision is always kept for the diff, but only reused when still valid
+    previous_parts: Dict[str, Any] = cache.get("parts", {})
+    previous_positions: Dict[int, Tuple[int, str]] = {
+        int(tick): (measure, label) for tick, (measure, label) in cache.get("positions", {}).items()
+    }
+    previous_tick_maps = {part: _decode_tick_map(entry["ticks"]) for part, entry in previous_parts.items()}
+
+    part_tick_maps: Dict[str, Dict[int, List[int]]] = {}
+    fingerprints: Dict[str, str] = {}
+    dirty_parts: List[str] = []
+    for part_name, index in part_indices.items():
+        fingerprint = track_fingerprint(raw_file.tracks[index])
+        fingerprints[part_name] = fingerprint
+        cached = previous_parts.get(part_name)
+        if cache_valid and cached is not None and cached.get("fingerprint") == fingerprint:
+            part_tick_maps[part_name] = previous_tick_maps[part_name]
+        else:
+            part_tick_maps[part_name] = _collect_note_on_events(raw_file.parse(index).tracks[0])
+            dirty_parts.append(part_name)
+    dirty_parts.extend(part for part in previous_tick_maps if part not in part_indices)
+
+    time_mapper: Optional[TimeSignatureMap] = None
+    positions: Dict[int, Tuple[int, str]] = {}
+    for mapping in part_tick_maps.values():
+        for tick in mapping:
+            if tick in positions:
+                continue
+            if cache_valid and tick in previous_positions:
+                positions[tick] = previous_positions[tick]
+            else:
+                time_mapper = time_mapper or TimeSignatureMap(raw_file.parse(0))
+                positions[tick] = time_mapper.measure_position(tick)
+
+    # Only onsets touched by a changed part (before or after the edit) are rebuilt
+    dirty_ticks: Set[int] = set()
+    for part_name in dirty_parts:
+        dirty_ticks.update(previous_tick_maps.get(part_name, {}))
+        dirty_ticks.update(part_tick_maps.get(part_name, {}))
+    previous_events = _merge_columns(previous_tick_maps, previous_positions, opts)
+    if cache_valid:
+        reusable = {event.tick: event.part_notes for event in previous_events}
+        events = _merge_columns(part_tick_maps, positions, opts, reusable, dirty_ticks)
+    else:
+        events = _merge_columns(part_tick_maps, positions, opts)
+    diff = diff_event_columns(previous_events, events, dirty_parts)
+
+    _write_cache(
+        cache_file,
+        {
+            "version": CACHE_VERSION,
+            "options": options_key,
+            "ticksPerBeat": raw_file.ticks_per_beat,
+            "meterFingerprint": meter_fingerprint,
+            "parts": {
+                part_name: {
+                    "fingerprint": fingerprints[part_name],
+                    "ticks": {str(tick): notes for tick, notes in tick_map.items()},
+                }
+                for part_name, tick_map in part_tick_maps.items()
+            },
+            "positions": {str(tick): list(position) for tick, position in positions.items()},
+        },
+    )
+    return events, light_chorus_part_order(), diff
@@ -0,0 +1,112 @@
+"""Precomputed pitch lookups shared by the Light Chorus app and recipe generators.
+
+Everything here is built once at import time and exposed as tuples or read-only
+mappings, so per-note work in the processors becomes an index or dict lookup.
+This module deliberately has no third-party imports so scripts can use it
+without the spreadsheet dependencies.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+MIDI_RANGE = range(128)
+# MIDI note number associated with primer tone Short0 / Long50 (C2 in scientific pitch)
+SHORT_SAMPLE_BASE_NOTE = 36
+LONG_SAMPLE_INDEX_OFFSET = 50
+# -1: scientific pitch (MIDI 60 -> C4); 0: project legacy numbering (MIDI 60 -> C5)
+OCTAVE_CONVENTIONS = (-1, 0)
+
+PREFERRED_PITCH_CLASS_NAMES = ("C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B")
+STEP_TO_SEMITONE: Mapping[str, int] = MappingProxyType(
+    {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+)
+ALTER_TO_ACCIDENTAL: Mapping[int, str] = MappingProxyType({-2: "bb", -1: "b", 0: "", 1: "#", 2: "##"})
+
+
+@dataclass(frozen=True)
+class PitchEntry:
+    """Project terminology for one MIDI note under one octave convention."""
+
+    midi: int
+    note_name: str
+    short_index: int
+    long_index: int
+
+    @property
+    def short_sample_path(self) -> str:
+        return SHORT_SAMPLE_PATHS[self.midi]
+
+    @property
+    def long_sample_path(self) -> str:
+        return LONG_SAMPLE_PATHS[self.midi]
+
+
+def _short_sample_path(short_index: int) -> str:
+    return f"primerTones/short{short_index}.mp3"
+
+
+def _long_sample_path(short_index: int) -> str:
+    return f"primerTones/long{short_index + LONG_SAMPLE_INDEX_OFFSET}.mp3"
+
+
+SHORT_SAMPLE_PATHS: Tuple[str, ...] = tuple(_short_sample_path(midi - SHORT_SAMPLE_BASE_NOTE) for midi in MIDI_RANGE)
+LONG_SAMPLE_PATHS: Tuple[str, ...] = tuple(_long_sample_path(midi - SHORT_SAMPLE_BASE_NOTE) for midi in MIDI_RANGE)
+
+PITCH_TABLE: Mapping[int, Tuple[PitchEntry, ...]] = MappingProxyType(
+    {
+        octave_offset: tuple(
+            PitchEntry(
+                midi=midi,
+                note_name=f"{PREFERRED_PITCH_CLASS_NAMES[midi % 12]}{midi // 12 + octave_offset}",
+                short_index=midi - SHORT_SAMPLE_BASE_NOTE,
+                long_index=midi - SHORT_SAMPLE_BASE_NOTE + LONG_SAMPLE_INDEX_OFFSET,
+            )
+            for midi in MIDI_RANGE
+        )
+        for octave_offset in OCTAVE_CONVENTIONS
+    }
+)
+
+
+def _build_spelling_tables() -> Tuple[Dict[Tuple[str, int, int], Tuple[int, str]], Dict[str, int]]:
+    spellings: Dict[Tuple[str, int, int], Tuple[int, str]] = {}
+    labels: Dict[str, int] = {}
+    for octave in range(-1, 10):
+        for step, semitone in STEP_TO_SEMITONE.items():
+            for alter, accidental in ALTER_TO_ACCIDENTAL.items():
+                midi = 12 * (octave + 1) + semitone + alter
+                label = f"{step}{accidental}{octave}"
+                spellings[(step, alter, octave)] = (midi, label)
+                labels[label] = midi
+    return spellings, labels
+
+
+_SPELLINGS, _LABELS = _build_spelling_tables()
+# (MusicXML step, alter, octave) -> (MIDI number, written label), scientific octaves
+SPELLING_TO_PITCH: Mapping[Tuple[str, int, int], Tuple[int, str]] = MappingProxyType(_SPELLINGS)
+# Written label such as "F#4" or "Bbb3" -> MIDI number, scientific octaves
+LABEL_TO_MIDI: Mapping[str, int] = MappingProxyType(_LABELS)
+
+
+def pitch_entry(midi: int, octave_offset: int = -1) -> PitchEntry:
+    return PITCH_TABLE[octave_offset][midi]
+
+
+def note_name(midi: int, octave_offset: int = -1) -> str:
+    table = PITCH_TABLE.get(octave_offset)
+    if table is None or not 0 <= midi < 128:
+        return f"{PREFERRED_PITCH_CLASS_NAMES[midi % 12]}{midi // 12 + octave_offset}"
+    return table[midi].note_name
+
+
+def label_to_midi(label: str) -> Optional[int]:
+    return LABEL_TO_MIDI.get(label)
+
+
+def primer_sample_path(midi: int, *, is_long: bool) -> str:
+    if 0 <= midi < 128:
+        return LONG_SAMPLE_PATHS[midi] if is_long else SHORT_SAMPLE_PATHS[midi]
+    short_index = midi - SHORT_SAMPLE_BASE_NOTE
+    return _long_sample_path(short_index) if is_long else _short_sample_path(short_index)
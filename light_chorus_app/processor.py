@@ -1,18 +1,21 @@
 """Core MIDI parsing and spreadsheet generation logic for the Light Chorus app."""
 from __future__ import annotations
 
+import csv
+import json
 from dataclasses import dataclass
 from fractions import Fraction
-from typing import Dict, List, Optional, Sequence, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import mido
 from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
 from openpyxl.utils import get_column_letter
 
-# MIDI note number associated with primer tone Short0 (see project documentation)
-# Default so that Short0.mp3 corresponds to MIDI note 36 (C2 in scientific pitch notation)
-SHORT_SAMPLE_BASE_NOTE = 36
+from .pitch_tables import SHORT_SAMPLE_BASE_NOTE, note_name, pitch_entry
+
 # Aligns computed measure numbers with the shared event recipe spreadsheet
 MEASURE_NUMBER_OFFSET = -2
 
@@ -29,14 +32,15 @@ PART_DEFINITIONS: Sequence[Tuple[str, str]] = (
     ("Bass 3", "#7d4bff"),     # Purple
 )
 
-PREFERRED_ACCIDENTAL_MAP = {
-    "C#": "Db",
-    "D#": "Eb",
-    "F#": "Gb",
-    "G#": "Ab",
-    "A#": "Bb",
-}
+# Shared named styles used by the write-only workbook builder
+HEADER_STYLE_NAME = "Light Chorus Header"
+BODY_STYLE_NAME = "Light Chorus Cell"
 
+# XLSX sheets stop at column XFD (16,384); one column is taken by the row labels,
+# so longer scores continue on "Light Chorus 2", "Light Chorus 3", ...
+SHEET_TITLE = "Light Chorus"
+XLSX_MAX_COLUMNS = 16_384
+EVENTS_PER_SHEET = XLSX_MAX_COLUMNS - 1
 
 @dataclass(frozen=True)
 class NoteEntry:
@@ -156,25 +160,32 @@ def _normalise_track_name(name: str) -> str:
     return name.strip().lower()
 
 
-def _build_part_track_map(midi_file: mido.MidiFile) -> Dict[str, mido.MidiTrack]:
-    """Locate the MIDI tracks that correspond to the nine Light Chorus parts."""
+def _part_track_indices(track_names: Sequence[str]) -> Dict[str, int]:
+    """Map each Light Chorus part to the index of its track, given every track's name."""
 
-    name_to_track: Dict[str, mido.MidiTrack] = {}
-    for track in midi_file.tracks:
-        if track.name:
-            name_to_track[_normalise_track_name(track.name)] = track
+    name_to_index: Dict[str, int] = {}
+    for index, name in enumerate(track_names):
+        if name:
+            name_to_index[_normalise_track_name(name)] = index
 
-    part_tracks: Dict[str, mido.MidiTrack] = {}
+    part_indices: Dict[str, int] = {}
     for part_name, _ in PART_DEFINITIONS:
         key = _normalise_track_name(part_name)
-        if key in name_to_track:
-            part_tracks[part_name] = name_to_track[key]
+        if key in name_to_index:
+            part_indices[part_name] = name_to_index[key]
     # Fallback to canonical indices if matching by name failed
-    if len(part_tracks) < len(PART_DEFINITIONS):
+    if len(part_indices) < len(PART_DEFINITIONS):
         indices = list(range(4, 13))
         for (part_name, _), index in zip(PART_DEFINITIONS, indices):
-            part_tracks.setdefault(part_name, midi_file.tracks[index])
-    return part_tracks
+            part_indices.setdefault(part_name, index)
+    return part_indices
+
+
+def _build_part_track_map(midi_file: mido.MidiFile) -> Dict[str, mido.MidiTrack]:
+    """Locate the MIDI tracks that correspond to the nine Light Chorus parts."""
+
+    part_indices = _part_track_indices([track.name for track in midi_file.tracks])
+    return {part_name: midi_file.tracks[index] for part_name, index in part_indices.items()}
 
 
 def _collect_note_on_events(track: mido.MidiTrack) -> Dict[int, List[int]]:
@@ -190,21 +201,22 @@ def _collect_note_on_events(track: mido.MidiTrack) -> Dict[int, List[int]]:
 
 
 def _note_to_name(note: int, octave_offset: int) -> str:
-    pitch_classes = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-    base_name = pitch_classes[note % 12]
-    note_name = PREFERRED_ACCIDENTAL_MAP.get(base_name, base_name)
-    octave = (note // 12) + octave_offset
-    return f"{note_name}{octave}"
+    return note_name(note, octave_offset)
 
 
 def _note_to_short_index(note: int, short_base_note: int) -> int:
-    index = note - short_base_note
+    if short_base_note == SHORT_SAMPLE_BASE_NOTE and 0 <= note < 128:
+        index = pitch_entry(note).short_index
+    else:
+        index = note - short_base_note
     if index < 0:
         raise ValueError(f"Note {note} is below available short sample range")
     return index
 
 
+@lru_cache(maxsize=None)
 def _build_note_entry(note: int, octave_offset: int, short_base_note: int) -> NoteEntry:
+    # NoteEntry is immutable, so one instance per (note, convention, base) is shared across columns
     short_index = _note_to_short_index(note, short_base_note)
     return NoteEntry(midi=note, note_name=_note_to_name(note, octave_offset), short_sample=str(short_index))
 
@@ -215,13 +227,17 @@ class ProcessingOptions:
 
     octave_offset: int = -1  # scientific pitch: MIDI 60 -> C4
     short_sample_base_note: int = SHORT_SAMPLE_BASE_NOTE
+    write_only: bool = False  # stream rows through openpyxl's write-only mode
 
 
-def extract_light_chorus_events(midi_path: str, options: Optional[ProcessingOptions] = None) -> Tuple[List[EventColumn], List[str]]:
-    """Parse the MIDI file and return structured Light Chorus event data."""
+def iter_light_chorus_events(midi_file: mido.MidiFile, options: Optional[ProcessingOptions] = None) -> Iterator[EventColumn]:
+    """Yield event columns in onset order from an already-parsed MIDI file.
+
+    Columns are produced one at a time so callers can preview or cancel a long
+    conversion before every onset has been translated.
+    """
 
     opts = options or ProcessingOptions()
-    midi_file = mido.MidiFile(midi_path)
     time_mapper = TimeSignatureMap(midi_file)
     part_tracks = _build_part_track_map(midi_file)
     part_tick_maps: Dict[str, Dict[int, List[int]]] = {
@@ -230,7 +246,6 @@ def extract_light_chorus_events(midi_path: str, options: Optional[ProcessingOpti
     }
 
     unique_ticks = sorted({tick for mapping in part_tick_maps.values() for tick in mapping})
-    events: List[EventColumn] = []
     for column_index, tick in enumerate(unique_ticks, start=1):
         measure, beat_label = time_mapper.measure_position(tick)
         part_entries: Dict[str, List[NoteEntry]] = {}
@@ -242,16 +257,50 @@ def extract_light_chorus_events(midi_path: str, options: Optional[ProcessingOpti
                 _build_note_entry(note, opts.octave_offset, opts.short_sample_base_note)
                 for note in notes
             ]
-        events.append(EventColumn(number=column_index, tick=tick, measure=measure, position_label=beat_label, part_notes=part_entries))
-    part_order = [part_name for part_name, _ in PART_DEFINITIONS]
-    return events, part_order
+        yield EventColumn(number=column_index, tick=tick, measure=measure, position_label=beat_label, part_notes=part_entries)
 
 
-def build_workbook(events: Sequence[EventColumn], part_order: Sequence[str]) -> Workbook:
+def light_chorus_part_order() -> List[str]:
+    return [part_name for part_name, _ in PART_DEFINITIONS]
+
+
+def extract_light_chorus_events(midi_path: str, options: Optional[ProcessingOptions] = None) -> Tuple[List[EventColumn], List[str]]:
+    """Parse the MIDI file and return structured Light Chorus event data."""
+
+    midi_file = mido.MidiFile(midi_path)
+    events = list(iter_light_chorus_events(midi_file, options))
+    return events, light_chorus_part_order()
+
+
+def build_workbook(
+    events: Sequence[EventColumn],
+    part_order: Sequence[str],
+    write_only: bool = False,
+) -> Workbook:
+    if write_only:
+        return build_write_only_workbook(events, part_order)
+
     workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Light Chorus"
+    for sheet_index, (title, sheet_events) in enumerate(_event_sheets(events)):
+        if sheet_index == 0:
+            sheet = workbook.active
+            sheet.title = title
+        else:
+            sheet = workbook.create_sheet(title)
+        _fill_event_sheet(sheet, sheet_events, part_order)
+    return workbook
+
 
+def _event_sheets(events: Sequence[EventColumn]) -> Iterator[Tuple[str, Sequence[EventColumn]]]:
+    """Split the events into chunks that fit one sheet, with their sheet titles."""
+
+    for start in range(0, max(len(events), 1), EVENTS_PER_SHEET):
+        number = start // EVENTS_PER_SHEET + 1
+        title = SHEET_TITLE if number == 1 else f"{SHEET_TITLE} {number}"
+        yield title, events[start : start + EVENTS_PER_SHEET]
+
+
+def _fill_event_sheet(sheet, events: Sequence[EventColumn], part_order: Sequence[str]) -> None:
     header_font = Font(bold=True, color="FFFFFF")
     header_fill = PatternFill(fill_type="solid", fgColor="000000")
     alignment_center = Alignment(horizontal="center", vertical="center", wrap_text=True)
@@ -312,11 +361,160 @@ def build_workbook(events: Sequence[EventColumn], part_order: Sequence[str]) ->
             sheet.column_dimensions[column_letter].width = 20
 
     sheet.freeze_panes = "B4"
+
+
+def _register_named_styles(workbook: Workbook, part_order: Sequence[str]) -> Dict[str, str]:
+    """Register the shared cell styles once and return the part → style name lookup."""
+
+    alignment_center = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    workbook.add_named_style(
+        NamedStyle(
+            name=HEADER_STYLE_NAME,
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(fill_type="solid", fgColor="000000"),
+            alignment=alignment_center,
+        )
+    )
+    workbook.add_named_style(NamedStyle(name=BODY_STYLE_NAME, alignment=alignment_center))
+
+    color_lookup = {name: color for name, color in PART_DEFINITIONS}
+    part_styles: Dict[str, str] = {}
+    for part_name in part_order:
+        color_hex = color_lookup.get(part_name, "#3c3c3c").replace("#", "")
+        style_name = f"Light Chorus Part {color_hex}"
+        if style_name not in workbook.named_styles:
+            workbook.add_named_style(
+                NamedStyle(
+                    name=style_name,
+                    font=Font(bold=True, color="FFFFFF"),
+                    fill=PatternFill(fill_type="solid", fgColor=color_hex),
+                    alignment=alignment_center,
+                )
+            )
+        part_styles[part_name] = style_name
+    return part_styles
+
+
+def _styled_row(
+    sheet,
+    label: object,
+    label_style: str,
+    values: Iterable[object],
+    value_style: str,
+) -> List[WriteOnlyCell]:
+    label_cell = WriteOnlyCell(sheet, value=label)
+    label_cell.style = label_style
+    row = [label_cell]
+    for value in values:
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.style = value_style
+        row.append(cell)
+    return row
+
+
+def _joined_part_values(events: Sequence[EventColumn], part_name: str, attribute: str) -> Iterator[Optional[str]]:
+    for event in events:
+        entries = event.part_notes.get(part_name)
+        yield ", ".join(getattr(entry, attribute) for entry in entries) if entries else None
+
+
+def build_write_only_workbook(events: Sequence[EventColumn], part_order: Sequence[str]) -> Workbook:
+    """Build the same sheets as :func:`build_workbook` using openpyxl's write-only mode.
+
+    Rows are emitted top to bottom and every cell references a shared named style,
+    so memory stays flat regardless of how many event columns the score produces.
+    The returned workbook can only be saved once.
+    """
+
+    workbook = Workbook(write_only=True)
+    part_styles = _register_named_styles(workbook, part_order)
+    for title, sheet_events in _event_sheets(events):
+        _append_write_only_sheet(workbook.create_sheet(title), sheet_events, part_order, part_styles)
     return workbook
 
 
+def _append_write_only_sheet(
+    sheet,
+    events: Sequence[EventColumn],
+    part_order: Sequence[str],
+    part_styles: Dict[str, str],
+) -> None:
+    # Column widths and panes must be configured before the first row is written
+    sheet.column_dimensions[get_column_letter(1)].width = 18
+    for col_index in range(2, len(events) + 2):
+        sheet.column_dimensions[get_column_letter(col_index)].width = 20
+    sheet.freeze_panes = "B4"
+
+    header_rows = (
+        ("Event #", (event.number for event in events)),
+        ("Measure #", (event.measure for event in events)),
+        ("Position (beat)", (event.position_label for event in events)),
+    )
+    for label, values in header_rows:
+        sheet.append(_styled_row(sheet, label, HEADER_STYLE_NAME, values, HEADER_STYLE_NAME))
+
+    # Part rows with styling (two rows per part: primer tone paths then pitch names)
+    for part_name in part_order:
+        part_style = part_styles[part_name]
+        primer_values = _joined_part_values(events, part_name, "sample_path")
+        pitch_values = _joined_part_values(events, part_name, "note_name")
+        sheet.append(_styled_row(sheet, part_name, part_style, primer_values, BODY_STYLE_NAME))
+        sheet.append(_styled_row(sheet, "", part_style, pitch_values, BODY_STYLE_NAME))
+
+
+def build_sheet_rows(events: Sequence[EventColumn], part_order: Sequence[str]) -> List[List[object]]:
+    """Return the workbook layout as plain rows for CSV export."""
+
+    rows: List[List[object]] = [
+        ["Event #", *[event.number for event in events]],
+        ["Measure #", *[event.measure for event in events]],
+        ["Position (beat)", *[event.position_label for event in events]],
+    ]
+    for part_name in part_order:
+        rows.append([part_name, *[value or "" for value in _joined_part_values(events, part_name, "sample_path")]])
+        rows.append(["", *[value or "" for value in _joined_part_values(events, part_name, "note_name")]])
+    return rows
+
+
+def events_to_payload(events: Sequence[EventColumn], part_order: Sequence[str]) -> Dict[str, Any]:
+    """Serialise extracted events into a JSON-friendly mapping."""
+
+    return {
+        "partOrder": list(part_order),
+        "eventCount": len(events),
+        "events": [
+            {
+                "number": event.number,
+                "tick": event.tick,
+                "measure": event.measure,
+                "position": event.position_label,
+                "parts": {
+                    part_name: [
+                        {"midi": entry.midi, "note": entry.note_name, "sample": entry.sample_path}
+                        for entry in entries
+                    ]
+                    for part_name, entries in event.part_notes.items()
+                },
+            }
+            for event in events
+        ],
+    }
+
+
+def export_csv(events: Sequence[EventColumn], part_order: Sequence[str], output_path: str) -> None:
+    with open(output_path, "w", newline="") as handle:
+        csv.writer(handle).writerows(build_sheet_rows(events, part_order))
+
+
+def export_json(events: Sequence[EventColumn], part_order: Sequence[str], output_path: str) -> None:
+    with open(output_path, "w") as handle:
+        json.dump(events_to_payload(events, part_order), handle, indent=2)
+        handle.write("\n")
+
+
 def process_midi_to_workbook(midi_path: str, output_path: str, options: Optional[ProcessingOptions] = None) -> Workbook:
-    events, part_order = extract_light_chorus_events(midi_path, options)
-    workbook = build_workbook(events, part_order)
+    opts = options or ProcessingOptions()
+    events, part_order = extract_light_chorus_events(midi_path, opts)
+    workbook = build_workbook(events, part_order, write_only=opts.write_only)
     workbook.save(output_path)
     return workbook
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+import argparse
+import json
+import os
 import shutil
 import subprocess
 import sys
-import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Any
+
+import file_hashes
 
 
 ROOT = Path(__file__).resolve().parent.parent
@@ -14,9 +20,13 @@ TARGET_DIRS = (
     ROOT / "flashlights_client" / "available-sounds" / "primerTones",
     ROOT / "FlashlightsInTheDark_MacOS" / "Audio" / "primerTones",
 )
+MANIFEST_PATH = ROOT / "docs" / "protools-housekeeping" / "long_primer_lowpass_manifest.json"
+MANIFEST_VERSION = 1
 
 FFMPEG_FILTER = "lowpass=f=3000:p=2"
+ENCODER_ARGS = ("-codec:a", "libmp3lame", "-b:a", "192k")
 EXPECTED_FILE_NAMES = tuple(f"Long{number}.mp3" for number in range(50, 99))
+DEFAULT_WORKERS = os.cpu_count() or 1
 
 
 def ensure_ffmpeg() -> None:
@@ -36,39 +46,164 @@ def verify_targets() -> None:
             )
 
 
-def filter_file(path: Path) -> None:
-    with tempfile.TemporaryDirectory(prefix="long-primer-lowpass-") as tmp_dir:
-        temp_output = Path(tmp_dir) / path.name
-        command = [
-            "ffmpeg",
-            "-hide_banner",
-            "-loglevel",
-            "error",
-            "-y",
-            "-i",
-            str(path),
-            "-af",
-            FFMPEG_FILTER,
-            "-codec:a",
-            "libmp3lame",
-            "-b:a",
-            "192k",
-            str(temp_output),
-        ]
+def target_paths() -> list[Path]:
+    return [directory / file_name for file_name in EXPECTED_FILE_NAMES for directory in TARGET_DIRS]
+
+
+def filter_signature() -> dict[str, str]:
+    return {"filter": FFMPEG_FILTER, "encoder": " ".join(ENCODER_ARGS)}
+
+
+def load_manifest() -> dict[str, dict[str, Any]]:
+    if not MANIFEST_PATH.exists():
+        return {}
+    payload = json.loads(MANIFEST_PATH.read_text())
+    if payload.get("version") != MANIFEST_VERSION:
+        return {}
+    return payload.get("files", {})
+
+
+def write_manifest(entries: dict[str, dict[str, Any]]) -> None:
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"version": MANIFEST_VERSION, "files": dict(sorted(entries.items()))}
+    MANIFEST_PATH.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def manifest_key(path: Path) -> str:
+    return str(path.relative_to(ROOT))
+
+
+def is_processed(entry: dict[str, Any] | None, current_hash: str) -> bool:
+    if entry is None:
+        return False
+    signature = filter_signature()
+    return (
+        entry.get("filter") == signature["filter"]
+        and entry.get("encoder") == signature["encoder"]
+        and entry.get("outputSha256") == current_hash
+    )
+
+
+def filter_file(source: Path, output: Path) -> None:
+    temp_output = output.with_name(f".{output.stem}.lowpass{output.suffix}")
+    command = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-i",
+        str(source),
+        "-af",
+        FFMPEG_FILTER,
+        *ENCODER_ARGS,
+        str(temp_output),
+    ]
+    try:
         subprocess.run(command, check=True)
-        temp_output.replace(path)
+        temp_output.replace(output)
+    finally:
+        temp_output.unlink(missing_ok=True)
+
+
+def install_copy(rendered: Path, target: Path) -> None:
+    """Hardlink the rendered file into place, falling back to a copy across filesystems."""
+
+    temp_target = target.with_name(f".{target.stem}.lowpass{target.suffix}")
+    temp_target.unlink(missing_ok=True)
+    try:
+        os.link(rendered, temp_target)
+    except OSError:
+        shutil.copy2(rendered, temp_target)
+    temp_target.replace(target)
+
+
+def process_group(paths: list[Path], source_hash: str) -> dict[str, dict[str, Any]]:
+    """Filter identical copies of one long primer once and fan the result out."""
+
+    primary, *copies = paths
+    filter_file(primary, primary)
+    for target in copies:
+        install_copy(primary, target)
+    entry = {**filter_signature(), "sourceSha256": source_hash, "outputSha256": file_hashes.cached_sha256(primary)}
+    return {manifest_key(path): entry for path in paths}
+
+
+def plan_groups(
+    manifest: dict[str, dict[str, Any]],
+    force: bool,
+) -> tuple[list[tuple[list[Path], str]], int]:
+    """Group unprocessed targets by content so each distinct source is filtered once."""
+
+    groups: dict[str, list[Path]] = {}
+    skipped = 0
+    current_hashes = file_hashes.sha256_many(target_paths())
+    for path, current_hash in current_hashes.items():
+        if not force and is_processed(manifest.get(manifest_key(path)), current_hash):
+            skipped += 1
+            continue
+        groups.setdefault(current_hash, []).append(path)
+    return [(paths, source_hash) for source_hash, paths in groups.items()], skipped
+
+
+def mark_processed(manifest: dict[str, dict[str, Any]]) -> None:
+    for path, current_hash in file_hashes.sha256_many(target_paths()).items():
+        manifest[manifest_key(path)] = {
+            **filter_signature(),
+            "sourceSha256": manifest.get(manifest_key(path), {}).get("sourceSha256"),
+            "outputSha256": current_hash,
+        }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Apply the long-primer lowpass once per distinct file and mirror it into every target directory."
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--force", action="store_true", help="Re-filter files even if the manifest says they are done.")
+    parser.add_argument(
+        "--mark-processed",
+        action="store_true",
+        help="Record the current files as already filtered without running ffmpeg.",
+    )
+    return parser.parse_args()
 
 
 def main() -> int:
-    ensure_ffmpeg()
+    args = parse_args()
     verify_targets()
+    manifest = load_manifest()
 
-    for directory in TARGET_DIRS:
-        for file_name in EXPECTED_FILE_NAMES:
-            filter_file(directory / file_name)
-        print(f"Filtered 49 long primer tones in {directory}")
+    if args.mark_processed:
+        mark_processed(manifest)
+        write_manifest(manifest)
+        print(f"Recorded {len(EXPECTED_FILE_NAMES) * len(TARGET_DIRS)} long primer tones as filtered")
+        return 0
 
-    return 0
+    ensure_ffmpeg()
+    groups, skipped = plan_groups(manifest, args.force)
+    failures = 0
+    rendered = 0
+    installed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            futures = {executor.submit(process_group, paths, source_hash): paths for paths, source_hash in groups}
+            for future in as_completed(futures):
+                try:
+                    entries = future.result()
+                except (subprocess.CalledProcessError, OSError) as exc:
+                    failures += 1
+                    print(f"Failed to filter {futures[future][0]}: {exc}", file=sys.stderr)
+                    continue
+                manifest.update(entries)
+                rendered += 1
+                installed += len(entries)
+    finally:
+        # Keep every group that did land, even if the run is interrupted
+        write_manifest(manifest)
+
+    print(f"Filtered {rendered} distinct long primer tones into {installed} files; {skipped} already filtered")
+    return 1 if failures else 0
 
 
 if __name__ == "__main__":
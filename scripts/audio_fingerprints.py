@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Waveform fingerprints for spotting re-exports of the same audio.
+
+Each file is decoded by ffmpeg into a 4 kHz mono float32 stream. The stream is
+read in chunks and reduced to band energies over overlapping 512 ms windows,
+hopped every 12.5 ms, in 25 log-spaced bands. Each window becomes a 24-bit
+sub-fingerprint: one bit per pair of neighbouring bands, set when the energy
+difference between the two bands grew since the previous window. Sub-fingerprints
+are cached under `.cache/audio-fingerprints/`, keyed by path, size and
+`st_mtime_ns`.
+
+A file's set of sub-fingerprints is gain-invariant. It also survives header,
+bit-depth and small time-shift changes. MinHash signatures over those sets go
+into a banded LSH index, so only files that share a bucket are compared exactly,
+never all pairs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+
+ROOT = Path(__file__).resolve().parents[1]
+FINGERPRINT_CACHE_ROOT = ROOT / ".cache" / "audio-fingerprints"
+FINGERPRINT_VERSION = 1
+DEFAULT_WORKERS = os.cpu_count() or 1
+ANALYSIS_RATE = 4000
+WINDOW_SAMPLES = 2048
+HOP_SAMPLES = 50
+FRAMES_PER_CHUNK = 512
+BAND_COUNT = 25
+BAND_LOW_HZ = 150.0
+BAND_HIGH_HZ = 1900.0
+SILENCE_ENERGY = 1e-7
+MINHASH_COUNT = 64
+LSH_BANDS = 32
+MIN_SIMILARITY = 0.2
+MINHASH_SEED = 20250727
+
+_HASH_RNG = np.random.default_rng(MINHASH_SEED)
+_HASH_MULTIPLIERS = _HASH_RNG.integers(1, 2**63, size=MINHASH_COUNT, dtype=np.uint64) | np.uint64(1)
+_HASH_OFFSETS = _HASH_RNG.integers(0, 2**63, size=MINHASH_COUNT, dtype=np.uint64)
+
+
+@dataclass(frozen=True)
+class NearDuplicatePair:
+    first: Path
+    second: Path
+    similarity: float
+
+
+def decode_command(path: Path) -> list[str]:
+    return [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-i",
+        str(path),
+        "-map",
+        "0:a:0",
+        "-ac",
+        "1",
+        "-ar",
+        str(ANALYSIS_RATE),
+        "-f",
+        "f32le",
+        "-codec:a",
+        "pcm_f32le",
+        "pipe:1",
+    ]
+
+
+def band_edges() -> np.ndarray:
+    bins = np.fft.rfftfreq(WINDOW_SAMPLES, 1.0 / ANALYSIS_RATE)
+    edges = np.geomspace(BAND_LOW_HZ, BAND_HIGH_HZ, BAND_COUNT + 1)
+    return np.searchsorted(bins, edges)
+
+
+def band_energies(samples: np.ndarray, frame_count: int) -> np.ndarray:
+    starts = np.arange(frame_count) * HOP_SAMPLES
+    windows = samples[starts[:, np.newaxis] + np.arange(WINDOW_SAMPLES)] * np.hanning(WINDOW_SAMPLES)
+    power = np.abs(np.fft.rfft(windows, axis=1)) ** 2
+    edges = band_edges()
+    return np.add.reduceat(power, edges, axis=1)[:, :BAND_COUNT].astype(np.float32)
+
+
+def energies_from_chunks(chunks: Iterable[bytes]) -> np.ndarray:
+    """Fold a stream of little-endian float32 samples into per-window band energies."""
+
+    pending = np.zeros(0, dtype=np.float64)
+    carry = b""
+    energies: list[np.ndarray] = []
+    for chunk in chunks:
+        data = carry + chunk
+        usable = len(data) // 4 * 4
+        carry = data[usable:]
+        pending = np.concatenate([pending, np.frombuffer(data[:usable], dtype="<f4")])
+        while len(pending) >= WINDOW_SAMPLES:
+            frame_count = min(FRAMES_PER_CHUNK, (len(pending) - WINDOW_SAMPLES) // HOP_SAMPLES + 1)
+            energies.append(band_energies(pending, frame_count))
+            pending = pending[frame_count * HOP_SAMPLES :]
+    if not energies:
+        return np.zeros((0, BAND_COUNT), dtype=np.float32)
+    return np.concatenate(energies)
+
+
+def read_chunks(stream: Any, chunk_bytes: int) -> Iterator[bytes]:
+    while chunk := stream.read(chunk_bytes):
+        yield chunk
+
+
+def decode_energies(path: Path) -> np.ndarray | None:
+    """Stream-decode one file into band energies; None when ffmpeg cannot read it."""
+
+    process = subprocess.Popen(decode_command(path), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    assert process.stdout is not None
+    with process.stdout:
+        energies = energies_from_chunks(read_chunks(process.stdout, FRAMES_PER_CHUNK * HOP_SAMPLES * 4))
+    if process.wait() != 0:
+        return None
+    return energies
+
+
+def cache_path_for(path: Path) -> Path:
+    resolved = path.resolve()
+    stat = resolved.stat()
+    key = f"{FINGERPRINT_VERSION}|{resolved}|{stat.st_size}|{stat.st_mtime_ns}"
+    return FINGERPRINT_CACHE_ROOT / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.npy"
+
+
+def subfingerprints(energies: np.ndarray) -> np.ndarray:
+    """Distinct 24-bit sub-fingerprints of the audible windows."""
+
+    if len(energies) < 2:
+        return np.zeros(0, dtype=np.uint64)
+    spread = energies[:, :-1].astype(np.float64) - energies[:, 1:]
+    bits = (spread[1:] - spread[:-1]) > 0
+    weights = np.left_shift(np.uint64(1), np.arange(BAND_COUNT - 1, dtype=np.uint64))
+    words = bits.astype(np.uint64) @ weights
+    audible = energies[1:].sum(axis=1) > SILENCE_ENERGY * WINDOW_SAMPLES
+    return np.unique(words[audible])
+
+
+def fingerprint_file(path: Path) -> np.ndarray | None:
+    cached = cache_path_for(path)
+    if cached.exists():
+        return np.load(cached)
+    energies = decode_energies(path)
+    if energies is None:
+        return None
+    fingerprint = subfingerprints(energies)
+    FINGERPRINT_CACHE_ROOT.mkdir(parents=True, exist_ok=True)
+    temp_path = cached.with_name(f"{cached.name}.{os.getpid()}.partial")
+    with temp_path.open("wb") as handle:
+        np.save(handle, fingerprint)
+    temp_path.replace(cached)
+    return fingerprint
+
+
+def fingerprint_files(paths: Iterable[Path], workers: int = DEFAULT_WORKERS) -> dict[Path, np.ndarray]:
+    """Fingerprints for every decodable path, decoding cache misses in parallel."""
+
+    unique_paths = list(dict.fromkeys(paths))
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(unique_paths) or 1))) as executor:
+        loaded = dict(zip(unique_paths, executor.map(fingerprint_file, unique_paths)))
+    return {path: fingerprint for path, fingerprint in loaded.items() if fingerprint is not None}
+
+
+def minhash_signature(words: np.ndarray) -> np.ndarray:
+    # multiply-shift hashing; uint64 multiplication wraps, which is what we want
+    with np.errstate(over="ignore"):
+        hashed = (words[:, np.newaxis] * _HASH_MULTIPLIERS + _HASH_OFFSETS) >> np.uint64(32)
+    return hashed.min(axis=0)
+
+
+def jaccard(first: np.ndarray, second: np.ndarray) -> float:
+    union = len(np.union1d(first, second))
+    return len(np.intersect1d(first, second, assume_unique=True)) / union if union else 0.0
+
+
+def near_duplicate_pairs(
+    fingerprints: dict[Path, np.ndarray],
+    min_similarity: float = MIN_SIMILARITY,
+) -> list[NearDuplicatePair]:
+    """Pairs whose sub-fingerprint sets overlap by at least `min_similarity` (Jaccard)."""
+
+    words = {path: values for path, values in fingerprints.items() if len(values)}
+    rows = MINHASH_COUNT // LSH_BANDS
+    buckets: dict[tuple[int, bytes], list[Path]] = defaultdict(list)
+    for path, values in words.items():
+        signature = minhash_signature(values)
+        for band in range(LSH_BANDS):
+            buckets[(band, signature[band * rows : (band + 1) * rows].tobytes())].append(path)
+
+    candidates: set[tuple[Path, Path]] = set()
+    for members in buckets.values():
+        for index, first in enumerate(members):
+            for second in members[index + 1 :]:
+                candidates.add((first, second) if first < second else (second, first))
+
+    pairs = []
+    for first, second in sorted(candidates):
+        similarity = jaccard(words[first], words[second])
+        if similarity >= min_similarity:
+            pairs.append(NearDuplicatePair(first=first, second=second, similarity=round(similarity, 4)))
+    return pairs
+
+
+def group_pairs(pairs: Iterable[NearDuplicatePair]) -> list[list[Path]]:
+    """Connected components of the near-duplicate graph, each sorted, largest first."""
+
+    parent: dict[Path, Path] = {}
+
+    def find(path: Path) -> Path:
+        parent.setdefault(path, path)
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for pair in pairs:
+        parent[find(pair.first)] = find(pair.second)
+    groups: dict[Path, list[Path]] = defaultdict(list)
+    for path in list(parent):
+        groups[find(path)].append(path)
+    return sorted((sorted(group) for group in groups.values()), key=lambda group: (-len(group), group[0]))
@@ -3,28 +3,22 @@
 from __future__ import annotations
 
 import argparse
-import hashlib
 import json
+import os
 import re
-import subprocess
 from collections import Counter, defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+import file_hashes
+import media_metadata
+
 
 ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_SESSION_DIR = ROOT / "FlashlightsInTheDark_Protools-Session"
 DEFAULT_OUTPUT_DIR = ROOT / "docs" / "protools-housekeeping"
-FFPROBE_CMD = [
-    "ffprobe",
-    "-v",
-    "error",
-    "-show_entries",
-    "stream=codec_name,sample_rate,channels:format=duration,bit_rate",
-    "-of",
-    "json",
-]
 ZERO_DIR_NAMES = {
     "Bounced Files",
     "Clip Groups",
@@ -38,9 +32,31 @@ ITERATION_SUFFIX_RE = re.compile(r" \(\d+\)$")
 TIMESHIFT_SUFFIX_RE = re.compile(r"-TmShft_[\d-]+$")
 WEIRD_NAME_RE = re.compile(r"[!]")
 DOUBLE_SPACE_RE = re.compile(r"  +")
+METADATA_FIELDS = ("duration_seconds", "bit_rate", "codec_name", "sample_rate", "channels")
 TOP_LEVEL_SESSION_HINTS = ("FlashlightsInTheDark", "MappingPrimerTones", "CleanedMIDI")
 
 
+@dataclass(frozen=True)
+class IndexedFile:
+    path: Path
+    size_bytes: int
+    mtime: float
+    mtime_ns: int
+
+
+@dataclass(frozen=True)
+class SessionIndex:
+    files: tuple[IndexedFile, ...]
+    directories: tuple[Path, ...]
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(item.size_bytes for item in self.files)
+
+    def files_under(self, directory: Path) -> list[IndexedFile]:
+        return [item for item in self.files if directory in item.path.parents]
+
+
 def isoformat_timestamp(timestamp: float) -> str:
     return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat(timespec="seconds")
 
@@ -57,18 +73,23 @@ def human_size(num_bytes: int) -> str:
     return f"{num_bytes} B"
 
 
-def path_size(path: Path) -> int:
-    if path.is_file():
-        return path.stat().st_size
-    return sum(child.stat().st_size for child in path.rglob("*") if child.is_file())
+def scan_session(session_dir: Path) -> SessionIndex:
+    """Walk the session once with os.scandir, recording every file's size and mtime."""
 
-
-def sha256_file(path: Path) -> str:
-    digest = hashlib.sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
+    files: list[IndexedFile] = []
+    directories: list[Path] = []
+    pending = [session_dir]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(Path(entry.path))
+                    pending.append(Path(entry.path))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files.append(IndexedFile(Path(entry.path), stat.st_size, stat.st_mtime, stat.st_mtime_ns))
+    files.sort(key=lambda item: item.path)
+    return SessionIndex(files=tuple(files), directories=tuple(sorted(directories)))
 
 
 def normalize_lineage(name: str) -> str:
@@ -97,62 +118,6 @@ def normalize_audio_family(name: str) -> str:
     return stem
 
 
-def ffprobe_metadata(path: Path) -> dict[str, Any]:
-    try:
-        result = subprocess.run(
-            FFPROBE_CMD + [str(path)],
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return {}
-
-    try:
-        payload = json.loads(result.stdout)
-    except json.JSONDecodeError:
-        return {}
-
-    format_info = payload.get("format", {})
-    streams = payload.get("streams", [])
-    first_stream = streams[0] if streams else {}
-    metadata: dict[str, Any] = {}
-
-    duration = format_info.get("duration")
-    if duration is not None:
-        try:
-            metadata["duration_seconds"] = round(float(duration), 6)
-        except (TypeError, ValueError):
-            pass
-
-    bit_rate = format_info.get("bit_rate")
-    if bit_rate is not None:
-        try:
-            metadata["bit_rate"] = int(bit_rate)
-        except (TypeError, ValueError):
-            pass
-
-    codec_name = first_stream.get("codec_name")
-    if codec_name:
-        metadata["codec_name"] = codec_name
-
-    sample_rate = first_stream.get("sample_rate")
-    if sample_rate is not None:
-        try:
-            metadata["sample_rate"] = int(sample_rate)
-        except (TypeError, ValueError):
-            pass
-
-    channels = first_stream.get("channels")
-    if channels is not None:
-        try:
-            metadata["channels"] = int(channels)
-        except (TypeError, ValueError):
-            pass
-
-    return metadata
-
-
 def build_session_entries(session_dir: Path) -> list[dict[str, Any]]:
     entries: list[dict[str, Any]] = []
     for path in sorted(session_dir.glob("*.ptx")):
@@ -297,58 +262,109 @@ def rank_session_candidates(
     return ranked
 
 
-def build_audio_inventory(session_dir: Path) -> list[dict[str, Any]]:
+def is_unchanged(previous: dict[str, Any] | None, entry: dict[str, Any]) -> bool:
+    if previous is None or previous["size_bytes"] != entry["size_bytes"]:
+        return False
+    if "mtime_ns" in previous:
+        return previous["mtime_ns"] == entry["mtime_ns"]
+    return previous["mtime_utc"] == entry["mtime_utc"]
+
+
+def build_audio_inventory(
+    session_dir: Path,
+    index: SessionIndex,
+    previous_inventory: list[dict[str, Any]] | None = None,
+) -> list[dict[str, Any]]:
+    """Inventory session media, reusing probe results from the previous audit for unchanged files."""
+
+    previous_by_path = {entry["path"]: entry for entry in previous_inventory or []}
     inventory: list[dict[str, Any]] = []
+    to_probe: list[dict[str, Any]] = []
     media_roots = [
         session_dir / "Audio Files",
         session_dir / "LongPrimers",
     ]
     for media_root in media_roots:
-        if not media_root.exists():
-            continue
-        for path in sorted(media_root.rglob("*")):
-            if not path.is_file():
-                continue
+        for item in index.files_under(media_root):
+            path = item.path
             if path.suffix.lower() not in {".wav", ".mp3"}:
                 continue
-            stat = path.stat()
             entry = {
                 "name": path.name,
                 "path": str(path.relative_to(ROOT)),
                 "root": media_root.name,
-                "size_bytes": stat.st_size,
-                "mtime_utc": isoformat_timestamp(stat.st_mtime),
+                "size_bytes": item.size_bytes,
+                "mtime_utc": isoformat_timestamp(item.mtime),
+                "mtime_ns": item.mtime_ns,
                 "extension": path.suffix.lower().lstrip("."),
                 "family": normalize_audio_family(path.name),
             }
-            entry.update(ffprobe_metadata(path))
+            previous = previous_by_path.get(entry["path"])
+            if is_unchanged(previous, entry):
+                entry.update({field: previous[field] for field in METADATA_FIELDS if field in previous})
+            else:
+                to_probe.append(entry)
             inventory.append(entry)
+    probed = media_metadata.probe_many(ROOT / entry["path"] for entry in to_probe)
+    for entry in to_probe:
+        entry.update(probed[ROOT / entry["path"]])
     return inventory
 
 
-def find_exact_duplicate_audio(audio_inventory: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    by_size: dict[int, list[dict[str, Any]]] = defaultdict(list)
-    for entry in audio_inventory:
-        by_size[entry["size_bytes"]].append(entry)
+def diff_audio_inventory(
+    previous_inventory: list[dict[str, Any]],
+    audio_inventory: list[dict[str, Any]],
+) -> dict[str, list[str]]:
+    previous_by_path = {entry["path"]: entry for entry in previous_inventory}
+    current_paths = {entry["path"] for entry in audio_inventory}
+    return {
+        "added": [entry["path"] for entry in audio_inventory if entry["path"] not in previous_by_path],
+        "removed": sorted(path for path in previous_by_path if path not in current_paths),
+        "modified": [
+            entry["path"]
+            for entry in audio_inventory
+            if entry["path"] in previous_by_path and not is_unchanged(previous_by_path[entry["path"]], entry)
+        ],
+    }
+
+
+def carried_digests(
+    previous_report: dict[str, Any],
+    audio_inventory: list[dict[str, Any]],
+) -> dict[Path, str]:
+    """Full hashes from the previous duplicate report that still apply to unchanged files."""
+
+    previous_by_path = {entry["path"]: entry for entry in previous_report.get("audio_inventory", [])}
+    current_by_path = {entry["path"]: entry for entry in audio_inventory}
+    digests: dict[Path, str] = {}
+    for duplicate in previous_report.get("exact_duplicate_audio", []):
+        for path in duplicate["paths"]:
+            entry = current_by_path.get(path)
+            if entry is not None and is_unchanged(previous_by_path.get(path), entry):
+                digests[ROOT / path] = duplicate["sha256"]
+    return digests
+
 
+def find_exact_duplicate_audio(
+    audio_inventory: list[dict[str, Any]],
+    known_digests: dict[Path, str] | None = None,
+) -> list[dict[str, Any]]:
+    order = {entry["path"]: index for index, entry in enumerate(audio_inventory)}
+    groups = file_hashes.find_identical_files(
+        (ROOT / entry["path"] for entry in audio_inventory),
+        known_digests=known_digests,
+    )
     duplicates: list[dict[str, Any]] = []
-    for size_bytes, group in sorted(by_size.items()):
-        if len(group) < 2:
-            continue
-        by_hash: dict[str, list[dict[str, Any]]] = defaultdict(list)
-        for entry in group:
-            file_hash = sha256_file(ROOT / entry["path"])
-            by_hash[file_hash].append(entry)
-        for file_hash, hash_group in by_hash.items():
-            if len(hash_group) < 2:
-                continue
-            duplicates.append(
-                {
-                    "sha256": file_hash,
-                    "size_bytes": size_bytes,
-                    "paths": [item["path"] for item in hash_group],
-                }
-            )
+    for file_hash, paths in groups.items():
+        relative_paths = [str(path.relative_to(ROOT)) for path in paths]
+        duplicates.append(
+            {
+                "sha256": file_hash,
+                "size_bytes": paths[0].stat().st_size,
+                "paths": relative_paths,
+            }
+        )
+    duplicates.sort(key=lambda item: (item["size_bytes"], order[item["paths"][0]]))
     return duplicates
 
 
@@ -379,12 +395,43 @@ def find_audio_variant_families(audio_inventory: list[dict[str, Any]]) -> list[d
     return families
 
 
-def find_risky_filenames(session_dir: Path, audio_inventory: list[dict[str, Any]]) -> list[dict[str, Any]]:
+def find_near_duplicate_audio(
+    audio_inventory: list[dict[str, Any]],
+    exact_duplicates: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """Group media that sound the same but are not byte-identical (needs NumPy and ffmpeg)."""
+
+    import audio_fingerprints
+
+    exact_hash = {ROOT / path: duplicate["sha256"] for duplicate in exact_duplicates for path in duplicate["paths"]}
+    fingerprints = audio_fingerprints.fingerprint_files(ROOT / entry["path"] for entry in audio_inventory)
+    pairs = [
+        pair
+        for pair in audio_fingerprints.near_duplicate_pairs(fingerprints)
+        if pair.first not in exact_hash or exact_hash[pair.first] != exact_hash.get(pair.second)
+    ]
+    groups = audio_fingerprints.group_pairs(pairs)
+    group_of = {path: index for index, group in enumerate(groups) for path in group}
+    similarities: dict[int, list[float]] = defaultdict(list)
+    for pair in pairs:
+        similarities[group_of[pair.first]].append(pair.similarity)
+
+    return [
+        {
+            "count": len(group),
+            "min_similarity": min(similarities[index]),
+            "families": sorted({normalize_audio_family(path.name) for path in group}),
+            "paths": [str(path.relative_to(ROOT)) for path in group],
+        }
+        for index, group in enumerate(groups)
+    ]
+
+
+def find_risky_filenames(index: SessionIndex, audio_inventory: list[dict[str, Any]]) -> list[dict[str, Any]]:
     risky: list[dict[str, Any]] = []
 
-    for path in sorted(session_dir.rglob("*")):
-        if not path.is_file():
-            continue
+    for item in index.files:
+        path = item.path
         flags = []
         name = path.name
         if name == ".DS_Store":
@@ -413,13 +460,14 @@ def find_risky_filenames(session_dir: Path, audio_inventory: list[dict[str, Any]
 
 def build_cleanup_candidates(
     session_dir: Path,
+    index: SessionIndex,
     sessions: list[dict[str, Any]],
     duplicates: list[dict[str, Any]],
     risky_filenames: list[dict[str, Any]],
 ) -> list[dict[str, Any]]:
     candidates: list[dict[str, Any]] = []
 
-    for path in sorted(session_dir.rglob(".DS_Store")):
+    for path in (item.path for item in index.files if item.path.name == ".DS_Store"):
         candidates.append(
             {
                 "action": "delete",
@@ -429,8 +477,8 @@ def build_cleanup_candidates(
             }
         )
 
-    for path in sorted(session_dir.iterdir()):
-        if path.is_dir() and path.name in ZERO_DIR_NAMES and path_size(path) == 0:
+    for path in (directory for directory in index.directories if directory.parent == session_dir):
+        if path.name in ZERO_DIR_NAMES and not any(item.size_bytes for item in index.files_under(path)):
             candidates.append(
                 {
                     "action": "delete_or_ignore",
@@ -536,6 +584,16 @@ def render_markdown(report: dict[str, Any]) -> str:
     lines.append(f"- Channel counts: `{report['audio_summary']['channels']}`")
     lines.append("")
 
+    changes = report.get("changes_since_last_audit")
+    if changes is not None:
+        lines.append("## Changes Since Last Audit")
+        lines.append("")
+        lines.append(f"- Previous audit: `{changes['previous_generated_utc']}`")
+        for label in ("added", "removed", "modified"):
+            lines.append(f"- {label.capitalize()}: `{len(changes[label])}`")
+            lines.extend(f"  - `{path}`" for path in changes[label][:40])
+        lines.append("")
+
     lines.append("## Exact Duplicate Audio")
     lines.append("")
     if report["exact_duplicate_audio"]:
@@ -547,6 +605,18 @@ def render_markdown(report: dict[str, Any]) -> str:
         lines.append("- none detected")
     lines.append("")
 
+    if "near_duplicate_audio" in report:
+        lines.append("## Near-Duplicate Audio")
+        lines.append("")
+        if report["near_duplicate_audio"]:
+            for group in report["near_duplicate_audio"][:20]:
+                lines.append(
+                    f"- `{group['count']}` files, similarity >= `{group['min_similarity']}`: {', '.join(f'`{path}`' for path in group['paths'])}"
+                )
+        else:
+            lines.append("- none detected")
+        lines.append("")
+
     lines.append("## Variant Families")
     lines.append("")
     if report["audio_variant_families"]:
@@ -576,23 +646,35 @@ def render_markdown(report: dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def build_report(session_dir: Path) -> dict[str, Any]:
+def build_report(
+    session_dir: Path,
+    previous_report: dict[str, Any] | None = None,
+    near_duplicates: bool = False,
+) -> dict[str, Any]:
+    """Audit the session. With `previous_report`, unchanged media reuse its probe results and digests."""
+
+    if previous_report is not None and previous_report.get("session_root") != str(session_dir.relative_to(ROOT)):
+        previous_report = None
+    index = scan_session(session_dir)
     sessions = build_session_entries(session_dir)
     backups = build_backup_entries(session_dir)
     lineages = build_lineage_summary(sessions, backups)
     ranked_sessions = rank_session_candidates(sessions, lineages)
-    audio_inventory = build_audio_inventory(session_dir)
-    exact_duplicates = find_exact_duplicate_audio(audio_inventory)
+    previous_inventory = previous_report["audio_inventory"] if previous_report else None
+    audio_inventory = build_audio_inventory(session_dir, index, previous_inventory)
+    known_digests = carried_digests(previous_report, audio_inventory) if previous_report else None
+    exact_duplicates = find_exact_duplicate_audio(audio_inventory, known_digests)
     variant_families = find_audio_variant_families(audio_inventory)
-    risky_filenames = find_risky_filenames(session_dir, audio_inventory)
+    risky_filenames = find_risky_filenames(index, audio_inventory)
     cleanup_candidates = build_cleanup_candidates(
         session_dir=session_dir,
+        index=index,
         sessions=sessions,
         duplicates=exact_duplicates,
         risky_filenames=risky_filenames,
     )
 
-    session_size = path_size(session_dir)
+    session_size = index.size_bytes
     audio_summary = {
         "by_root": dict(Counter(item["root"] for item in audio_inventory)),
         "extensions": dict(Counter(item["extension"] for item in audio_inventory)),
@@ -610,7 +692,7 @@ def build_report(session_dir: Path) -> dict[str, Any]:
         "Files with long or irregular names should be normalized only after the canonical working session is confirmed.",
     ]
 
-    return {
+    report = {
         "generated_utc": datetime.now(tz=timezone.utc).isoformat(timespec="seconds"),
         "session_root": str(session_dir.relative_to(ROOT)),
         "summary": {
@@ -632,6 +714,14 @@ def build_report(session_dir: Path) -> dict[str, Any]:
         "cleanup_candidates": cleanup_candidates,
         "notes": notes,
     }
+    if near_duplicates:
+        report["near_duplicate_audio"] = find_near_duplicate_audio(audio_inventory, exact_duplicates)
+    if previous_report is not None:
+        report["changes_since_last_audit"] = {
+            "previous_generated_utc": previous_report.get("generated_utc"),
+            **diff_audio_inventory(previous_report["audio_inventory"], audio_inventory),
+        }
+    return report
 
 
 def main() -> None:
@@ -648,15 +738,28 @@ def main() -> None:
         default=DEFAULT_OUTPUT_DIR,
         help="Directory where the generated report files should be written.",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse probe results and hashes from the previous session_audit.json for unchanged media and report what changed since it.",
+    )
+    parser.add_argument(
+        "--near-duplicates",
+        action="store_true",
+        help="Fingerprint media waveforms to find re-exports of the same audio (requires NumPy and ffmpeg).",
+    )
     args = parser.parse_args()
 
     session_dir = args.session_dir.resolve()
     output_dir = args.output_dir.resolve()
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    report = build_report(session_dir)
     json_path = output_dir / "session_audit.json"
     md_path = output_dir / "session_audit.md"
+    previous_report = None
+    if args.incremental and json_path.exists():
+        previous_report = json.loads(json_path.read_text())
+    report = build_report(session_dir, previous_report, near_duplicates=args.near_duplicates)
 
     json_path.write_text(json.dumps(report, indent=2) + "\n")
     md_path.write_text(render_markdown(report) + "\n")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Project the master recipe bundle into the small slices a phone actually needs.
+
+A phone plays one light stave, one choir family's electronics and one primer
+colour, so it never needs the rest of the bundle. Slots map to parts and colours
+the way the client does: `SLOT_PARTS` follows the seat layout and `SLOT_COLORS` the
+primer colour groups, and both are checked against the Dart and Swift tables they
+copy before anything is built. A slice keeps only:
+
+- the primer assignment for one colour;
+- the family's `electronics` assignment and the part's `electronicsByPart` override;
+- the part's lighting stave.
+
+Slots of the same part share one slice unless the bundle assigns primers to their
+colours, so `device-recipes/` holds one `part-<key>.json` per part, plus a
+`part-<key>-<colour>.json` for each colour with primer assignments. Slices keep the
+master bundle's schema, so the existing recipe parsers read them unchanged.
+`manifest.json` maps every slot to its part, colour and slice, and lists each
+slice's size and SHA-256.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Any
+
+import recipe_bundle
+from build_trigger_point_light_show import PART_LABELS
+
+
+ROOT = recipe_bundle.ROOT
+SLICE_ROOT = recipe_bundle.CANONICAL_RECIPE_PATH.parent / "device-recipes"
+SLICE_MANIFEST_PATH = SLICE_ROOT / "manifest.json"
+SLICE_MANIFEST_VERSION = 3
+ASSIGNMENT_KEYS = ("primer", "electronics", "electronicsByPart", "lighting")
+PART_FAMILIES = {
+    "soprano_l1": "soprano",
+    "soprano_l2": "soprano",
+    "tenor_l": "tenor_bass",
+    "bass_l": "tenor_bass",
+    "alto_l2": "alto",
+    "alto_l1": "alto",
+}
+# Mirrors `LightChorusPart.slots` / `partForSlot` in flashlights_client/lib/model/client_state.dart
+# and `LightStaff.legacySlots` in FlashlightsInTheDark_MacOS/Model/LightStaffStageLayout.swift;
+# `client_layout_problems` parses both and fails the build when they disagree.
+PART_SLOTS = {
+    "soprano_l1": range(1, 7),
+    "soprano_l2": range(7, 13),
+    "tenor_l": range(13, 19),
+    "bass_l": range(19, 25),
+    "alto_l2": range(25, 31),
+    "alto_l1": range(31, 37),
+}
+# Mirrors `ClientState.defaultGroups`, which `colorForSlot` reads in client_state.dart.
+COLOR_GROUPS = {
+    "blue": (31, 32, 33, 34),
+    "red": (25, 26, 27, 28),
+    "green": (1, 2, 3, 4),
+    "purple": (19, 20, 21, 22),
+    "yellow": (13, 14, 15, 16),
+    "pink": (17, 18, 23, 24),
+    "orange": (5, 6, 11, 12),
+    "magenta": (7, 8, 9, 10),
+    "cyan": (29, 30, 35, 36),
+}
+DART_CLIENT_STATE_PATH = ROOT / "flashlights_client" / "lib" / "model" / "client_state.dart"
+SWIFT_STAGE_LAYOUT_PATH = ROOT / "FlashlightsInTheDark_MacOS" / "Model" / "LightStaffStageLayout.swift"
+SLOT_PARTS = {slot: part_key for part_key, slots in PART_SLOTS.items() for slot in slots}
+SLOT_COLORS = {slot: color for color, slots in COLOR_GROUPS.items() for slot in slots}
+
+
+def _event_skeleton(event: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in event.items() if key not in ASSIGNMENT_KEYS}
+
+
+def _only(assignments: dict[str, Any], key: str | None) -> dict[str, Any]:
+    return {key: assignments[key]} if key in assignments else {}
+
+
+def _block(source: str, opener: str, path: Path) -> str:
+    """Return the brace-delimited body that follows `opener` in `source`."""
+
+    start = source.find(opener)
+    if start < 0:
+        raise ValueError(f"{path.relative_to(ROOT)} no longer contains `{opener}`")
+    index = source.index("{", start + len(opener) - 1)
+    depth = 0
+    for end in range(index, len(source)):
+        if source[end] == "{":
+            depth += 1
+        elif source[end] == "}":
+            depth -= 1
+            if depth == 0:
+                return source[index + 1 : end]
+    raise ValueError(f"Unbalanced braces after `{opener}` in {path.relative_to(ROOT)}")
+
+
+def _switch_returns(body: str) -> dict[str, str]:
+    return dict(re.findall(r"case\s+(?:LightChorusPart)?\.(\w+):\s*return\s+([^;\n]+)", body))
+
+
+def parse_client_layout() -> tuple[dict[str, tuple[int, ...]], dict[str, tuple[int, ...]], dict[str, tuple[int, ...]]]:
+    """Read part slots and colour groups from the Dart client and staff slots from the macOS app."""
+
+    dart = DART_CLIENT_STATE_PATH.read_text(encoding="utf-8")
+    recipe_keys = {
+        case: value.strip().strip("'")
+        for case, value in _switch_returns(_block(dart, "String get recipeKey {", DART_CLIENT_STATE_PATH)).items()
+    }
+    dart_slots = {
+        recipe_keys[case]: tuple(int(slot) for slot in re.findall(r"\d+", value.split("[", 1)[-1]))
+        for case, value in _switch_returns(_block(dart, "List<int> get slots {", DART_CLIENT_STATE_PATH)).items()
+    }
+    dart_groups = {
+        color: tuple(int(slot) for slot in re.findall(r"\d+", slots))
+        for color, slots in re.findall(
+            r"PrimerColor\.(\w+):\s*\[([\d,\s]*)\]",
+            _block(dart, "defaultGroups = {", DART_CLIENT_STATE_PATH),
+        )
+    }
+
+    swift = SWIFT_STAGE_LAYOUT_PATH.read_text(encoding="utf-8")
+    swift_slots = {}
+    for case, value in _switch_returns(_block(swift, "var legacySlots: [Int] {", SWIFT_STAGE_LAYOUT_PATH)).items():
+        bounds = re.fullmatch(r"Array\((\d+)\.\.\.(\d+)\)", value.strip())
+        if case not in recipe_keys or bounds is None:
+            raise ValueError(f"Unrecognized legacySlots case `{case}` in {SWIFT_STAGE_LAYOUT_PATH.relative_to(ROOT)}")
+        swift_slots[recipe_keys[case]] = tuple(range(int(bounds[1]), int(bounds[2]) + 1))
+    return dart_slots, dart_groups, swift_slots
+
+
+def client_layout_problems() -> list[str]:
+    """Compare `PART_SLOTS` and `COLOR_GROUPS` with the client tables they were copied from."""
+
+    dart_slots, dart_groups, swift_slots = parse_client_layout()
+    expected_slots = {part_key: tuple(slots) for part_key, slots in PART_SLOTS.items()}
+    problems = []
+    if dart_slots != expected_slots:
+        problems.append(f"PART_SLOTS differs from LightChorusPart.slots in {DART_CLIENT_STATE_PATH.name}: {dart_slots}")
+    if swift_slots != expected_slots:
+        problems.append(f"PART_SLOTS differs from LightStaff.legacySlots in {SWIFT_STAGE_LAYOUT_PATH.name}: {swift_slots}")
+    if dart_groups != COLOR_GROUPS:
+        problems.append(f"COLOR_GROUPS differs from ClientState.defaultGroups in {DART_CLIENT_STATE_PATH.name}: {dart_groups}")
+    return problems
+
+
+def part_description(part_key: str, color: str | None) -> dict[str, Any]:
+    return {
+        "part": part_key,
+        "label": PART_LABELS[part_key],
+        "family": PART_FAMILIES[part_key],
+        "color": color,
+    }
+
+
+def primer_colors(bundle: dict[str, Any]) -> set[str]:
+    """Colours that any event assigns a primer to; slots of other colours share a slice."""
+
+    return {color for event in bundle.get("events", []) for color in event.get("primer", {})}
+
+
+def slice_for_part(bundle: dict[str, Any], part_key: str, color: str | None) -> dict[str, Any]:
+    device = part_description(part_key, color)
+    family = device["family"]
+    sliced = {key: value for key, value in bundle.items() if key != "events"}
+    sliced["deviceSlice"] = device
+    events = []
+    for event in bundle.get("events", []):
+        projected = _event_skeleton(event)
+        if "primer" in event:
+            projected["primer"] = _only(event["primer"], color)
+        if "electronics" in event:
+            projected["electronics"] = _only(event["electronics"], family)
+        if "electronicsByPart" in event:
+            projected["electronicsByPart"] = _only(event["electronicsByPart"], part_key)
+        lighting = event.get("lighting")
+        if lighting is not None and part_key in lighting.get("parts", {}):
+            projected["lighting"] = {**lighting, "parts": {part_key: lighting["parts"][part_key]}}
+        events.append(projected)
+    sliced["events"] = events
+    return sliced
+
+
+def slice_path(part_key: str, color: str | None) -> Path:
+    return SLICE_ROOT / (f"part-{part_key}-{color}.json" if color else f"part-{part_key}.json")
+
+
+def build_device_slices(bundle: dict[str, Any]) -> tuple[dict[Path, bytes], dict[str, Any]]:
+    """Serialize every distinct slice and map slots onto them; nothing is written here."""
+
+    problems = client_layout_problems()
+    if problems:
+        raise ValueError(f"Device slot tables drifted from the clients: {problems[0]}")
+
+    assigned_colors = primer_colors(bundle)
+    payloads: dict[Path, bytes] = {}
+    manifest: dict[str, Any] = {
+        "version": SLICE_MANIFEST_VERSION,
+        "sourceBundle": str(recipe_bundle.CANONICAL_RECIPE_PATH.relative_to(ROOT)),
+        "sourceSha256": hashlib.sha256(recipe_bundle.serialize_recipe_bundle(bundle)).hexdigest(),
+        "sourceGenerated": bundle.get("generated"),
+        "slices": {},
+        "slots": {},
+    }
+    for slot in sorted(SLOT_PARTS):
+        part_key = SLOT_PARTS[slot]
+        color = SLOT_COLORS.get(slot)
+        slice_color = color if color in assigned_colors else None
+        path = slice_path(part_key, slice_color)
+        relative = str(path.relative_to(ROOT))
+        if path not in payloads:
+            payload = recipe_bundle.serialize_recipe_bundle(slice_for_part(bundle, part_key, slice_color))
+            payloads[path] = payload
+            manifest["slices"][relative] = {
+                **part_description(part_key, slice_color),
+                "bytes": len(payload),
+                "sha256": hashlib.sha256(payload).hexdigest(),
+            }
+        manifest["slots"][str(slot)] = {"slot": slot, **part_description(part_key, color), "slice": relative}
+    return payloads, manifest
+
+
+def write_device_slices(payloads: dict[Path, bytes], manifest: dict[str, Any]) -> list[Path]:
+    """Write the slices and manifest, skipping files whose bytes are unchanged."""
+
+    SLICE_ROOT.mkdir(parents=True, exist_ok=True)
+    files = dict(payloads)
+    files[SLICE_MANIFEST_PATH] = (json.dumps(manifest, indent=2) + "\n").encode("utf-8")
+    changed = []
+    for path, payload in files.items():
+        if path.exists() and path.read_bytes() == payload:
+            continue
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.partial")
+        temp_path.write_bytes(payload)
+        temp_path.replace(path)
+        changed.append(path)
+    for stale in SLICE_ROOT.glob("*.json"):
+        if stale not in files:
+            stale.unlink()
+    return changed
+
+
+def main() -> int:
+    bundle = recipe_bundle.load_recipe_bundle()
+    payloads, manifest = build_device_slices(bundle)
+    changed = write_device_slices(payloads, manifest)
+    full_size = len(recipe_bundle.serialize_recipe_bundle(bundle))
+    largest = max(len(payload) for payload in payloads.values())
+    print(
+        f"Device slices: {len(payloads)} for {len(manifest['slots'])} slots "
+        f"(largest {largest} bytes, full bundle {full_size} bytes)"
+    )
+    for path in changed:
+        print(f"Wrote {path.relative_to(ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
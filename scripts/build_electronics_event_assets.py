@@ -13,6 +13,9 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+import media_metadata
+import recipe_bundle
+
 
 ROOT = Path(__file__).resolve().parents[1]
 SYNC_REFERENCE_PATH = ROOT / "docs" / "protools-housekeeping" / "electronics_sync_reference.md"
@@ -20,11 +23,7 @@ TIMELINE_PATH = ROOT / "docs" / "protools-housekeeping" / "event_timeline.json"
 FLUTTER_ASSET_ROOT = ROOT / "flashlights_client" / "available-sounds" / "electronics-event-clips"
 MANIFEST_JSON_PATH = ROOT / "docs" / "protools-housekeeping" / "electronics_event_assets.json"
 MANIFEST_CSV_PATH = ROOT / "docs" / "protools-housekeeping" / "electronics_event_assets.csv"
-RECIPE_COPY_PATHS = [
-    ROOT / "Flashlights-ITD_EventRecipes_4_2026_0309" / "event_recipes.json",
-    ROOT / "FlashlightsInTheDark_MacOS" / "Resources" / "event_recipes.json",
-    ROOT / "flashlights_client" / "assets" / "event_recipes.json",
-]
+RECIPE_COPY_PATHS = recipe_bundle.RECIPE_COPY_PATHS
 DEFAULT_WORKERS = 4
 
 
@@ -63,22 +62,7 @@ def iso_now() -> str:
 
 
 def ffprobe_duration_ms(path: Path) -> float:
-    result = subprocess.run(
-        [
-            "ffprobe",
-            "-v",
-            "error",
-            "-show_entries",
-            "format=duration",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
-            str(path),
-        ],
-        check=True,
-        capture_output=True,
-        text=True,
-    )
-    return round(float(result.stdout.strip()) * 1000.0, 3)
+    return media_metadata.duration_ms(path)
 
 
 def parse_sync_reference(path: Path) -> tuple[Path, float]:
@@ -299,8 +283,11 @@ def write_manifest(
         writer.writerows(rows)
 
 
-def patch_recipe_copy(path: Path, plans_by_id: dict[int, dict[str, Any]], generated_at: str) -> None:
-    bundle = json.loads(path.read_text())
+def apply_event_electronics(
+    bundle: dict[str, Any],
+    plans_by_id: dict[int, dict[str, Any]],
+    generated_at: str,
+) -> dict[str, Any]:
     bundle["electronicsSource"] = "audio/protools-exports/electronics/2026_0314_FlashlightsInTheDark_Electronics-StereoSum_7.mp3"
     bundle["electronicsSyncReference"] = "docs/protools-housekeeping/electronics_sync_reference.md"
     bundle["electronicsManifest"] = "docs/protools-housekeeping/electronics_event_assets.json"
@@ -310,8 +297,7 @@ def patch_recipe_copy(path: Path, plans_by_id: dict[int, dict[str, Any]], genera
         event_id = int(event["id"])
         plan = plans_by_id[event_id]
         event["electronics"] = plan["variants"]
-
-    path.write_text(json.dumps(bundle, indent=2) + "\n")
+    return bundle
 
 
 def main() -> None:
@@ -340,12 +326,12 @@ def main() -> None:
     )
 
     plans_by_id = {plan["id"]: plan for plan in plans}
-    for recipe_path in RECIPE_COPY_PATHS:
-        patch_recipe_copy(recipe_path, plans_by_id, generated_at)
+    bundle = apply_event_electronics(recipe_bundle.load_recipe_bundle(), plans_by_id, generated_at)
+    changed = recipe_bundle.write_recipe_bundle(bundle)
 
     print(f"Rendered {len(plans) * len(CHOIR_VARIANTS)} assets")
     print(f"Wrote {MANIFEST_JSON_PATH.relative_to(ROOT)}")
-    for recipe_path in RECIPE_COPY_PATHS:
+    for recipe_path in changed:
         print(f"Patched {recipe_path.relative_to(ROOT)}")
 
 
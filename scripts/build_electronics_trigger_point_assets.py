@@ -4,14 +4,24 @@ from __future__ import annotations
 
 import argparse
 import csv
+import hashlib
 import json
+import os
 import shutil
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+import xml.etree.ElementTree as ET
 
+import file_hashes
+import media_metadata
+import recipe_bundle
+from pcm_source_cache import PcmSource, prepare_pcm_sources
 from score_measure_utils import build_measure_token_map
 
 
@@ -55,11 +65,11 @@ MANIFEST_JSON_PATH = (
 MANIFEST_CSV_PATH = (
     ROOT / "docs" / "protools-housekeeping" / "electronics_trigger_assets.csv"
 )
-RECIPE_COPY_PATHS = [
-    ROOT / "Flashlights-ITD_EventRecipes_4_2026_0309" / "event_recipes.json",
-    ROOT / "FlashlightsInTheDark_MacOS" / "Resources" / "event_recipes.json",
-    ROOT / "flashlights_client" / "assets" / "event_recipes.json",
-]
+RENDER_CACHE_PATH = (
+    ROOT / "docs" / "protools-housekeeping" / "electronics_trigger_render_cache.json"
+)
+RENDER_CACHE_VERSION = 1
+RECIPE_COPY_PATHS = recipe_bundle.RECIPE_COPY_PATHS
 FADE_IN_MS = 20.0
 PRIMER_STEM_GAIN_DB = 6.0
 FIRST_TRIGGER_START_MS = 2000.0
@@ -79,6 +89,7 @@ TP5_PRIMER_REENTRY_FADE_IN_BEATS = 14.0
 TP5_PRIMER_EDGE_FADE_MS = 20.0
 TP5_REENTRY_SOURCE_START_MEASURE = "100"
 TP5_REENTRY_SOURCE_END_MEASURE = "104"
+DEFAULT_WORKERS = os.cpu_count() or 1
 
 
 @dataclass(frozen=True)
@@ -116,6 +127,41 @@ class PartConcreteVariant:
     label: str
 
 
+@dataclass(frozen=True)
+class RenderJob:
+    label: str
+    kind: str
+    output_path: Path
+    params: dict[str, Any]
+    duration_ms: float
+    priority: int
+
+    def command(self) -> list[str]:
+        return RENDER_COMMAND_BUILDERS[self.kind](output_path=self.output_path, **self.params)
+
+    def input_seeks_ms(self) -> dict[Path, float]:
+        """Earliest source position each timeline-aligned input is read from."""
+
+        if self.kind == "tp5_part_mix":
+            seek_ms = min(self.params["base_start_ms"], self.params["reentry_start_ms"])
+            return {self.params["full_source_path"]: seek_ms, self.params["primer_source_path"]: seek_ms}
+        seeks = {self.params["source_path"]: self.params["start_ms"]}
+        if "primer_source_path" in self.params:
+            seeks[self.params["primer_source_path"]] = self.params["start_ms"]
+        return seeks
+
+
+@dataclass(frozen=True)
+class RenderTiming:
+    label: str
+    duration_ms: float
+    elapsed_seconds: float
+
+
+class RenderAborted(RuntimeError):
+    pass
+
+
 @dataclass(frozen=True)
 class PrimerStemSource:
     key: str
@@ -206,27 +252,42 @@ PRIMER_STEM_SOURCES = {
 }
 
 
+_ACTIVE_FFMPEG: set[subprocess.Popen[bytes]] = set()
+_ACTIVE_FFMPEG_LOCK = threading.Lock()
+_RENDER_ABORT = threading.Event()
+
+
+def run_ffmpeg(command: list[str]) -> None:
+    # Renders go through here so a failing job can terminate its siblings mid-encode.
+    with _ACTIVE_FFMPEG_LOCK:
+        if _RENDER_ABORT.is_set():
+            raise RenderAborted("render aborted after an earlier failure")
+        process = subprocess.Popen(command, stderr=subprocess.PIPE)
+        _ACTIVE_FFMPEG.add(process)
+    try:
+        _, stderr = process.communicate()
+    finally:
+        with _ACTIVE_FFMPEG_LOCK:
+            _ACTIVE_FFMPEG.discard(process)
+    if _RENDER_ABORT.is_set():
+        raise RenderAborted("render aborted after an earlier failure")
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr)
+
+
+def abort_running_renders() -> None:
+    with _ACTIVE_FFMPEG_LOCK:
+        _RENDER_ABORT.set()
+        for process in _ACTIVE_FFMPEG:
+            process.terminate()
+
+
 def iso_now() -> str:
     return datetime.now(tz=timezone.utc).isoformat(timespec="seconds")
 
 
 def ffprobe_duration_ms(path: Path) -> float:
-    result = subprocess.run(
-        [
-            "ffprobe",
-            "-v",
-            "error",
-            "-show_entries",
-            "format=duration",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
-            str(path),
-        ],
-        check=True,
-        capture_output=True,
-        text=True,
-    )
-    return round(float(result.stdout.strip()) * 1000.0, 3)
+    return media_metadata.duration_ms(path)
 
 
 def convert_wav_to_mp3(source_wav: Path, target_mp3: Path) -> None:
@@ -363,7 +424,7 @@ def choir_variant_for_part(part_key: str) -> ChoirVariant:
     return CHOIR_VARIANTS[2]
 
 
-def render_variant(
+def variant_command(
     *,
     source_path: Path,
     output_path: Path,
@@ -372,14 +433,13 @@ def render_variant(
     fade_in_ms: float,
     fade_out_ms: float,
     variant: ChoirVariant,
-) -> None:
+) -> list[str]:
     duration_ms = round(end_ms - start_ms, 3)
     if duration_ms <= 0:
         raise ValueError(f"Non-positive clip duration for {output_path.name}: {duration_ms}")
 
     fade_out_ms = min(fade_out_ms, duration_ms)
     fade_out_start_ms = round(duration_ms - fade_out_ms, 3)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
 
     filter_graph = (
         f"atrim=start={start_ms / 1000.0:.6f}:end={end_ms / 1000.0:.6f},"
@@ -389,27 +449,24 @@ def render_variant(
         f"afade=t=out:st={fade_out_start_ms / 1000.0:.6f}:d={fade_out_ms / 1000.0:.6f}"
     )
 
-    subprocess.run(
-        [
-            "ffmpeg",
-            "-v",
-            "error",
-            "-y",
-            "-i",
-            str(source_path),
-            "-filter:a",
-            filter_graph,
-            "-codec:a",
-            "libmp3lame",
-            "-q:a",
-            "2",
-            str(output_path),
-        ],
-        check=True,
-    )
+    return [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-y",
+        "-i",
+        str(source_path),
+        "-filter:a",
+        filter_graph,
+        "-codec:a",
+        "libmp3lame",
+        "-q:a",
+        "2",
+        str(output_path),
+    ]
 
 
-def render_family_composite_variant(
+def family_composite_command(
     *,
     source_path: Path,
     primer_source_path: Path,
@@ -420,13 +477,13 @@ def render_family_composite_variant(
     fade_in_ms: float,
     fade_out_ms: float,
     variant: ChoirVariant,
-) -> None:
+) -> list[str]:
     duration_ms = round(end_ms - start_ms, 3)
     if duration_ms <= 0:
         raise ValueError(f"Non-positive clip duration for {output_path.name}: {duration_ms}")
 
     if start_ms >= primer_source_duration_ms:
-        render_variant(
+        return variant_command(
             source_path=source_path,
             output_path=output_path,
             start_ms=start_ms,
@@ -435,12 +492,10 @@ def render_family_composite_variant(
             fade_out_ms=fade_out_ms,
             variant=variant,
         )
-        return
 
     primer_end_ms = min(end_ms, primer_source_duration_ms)
     fade_out_ms = min(fade_out_ms, duration_ms)
     fade_out_start_ms = round(duration_ms - fade_out_ms, 3)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
 
     filter_graph = (
         f"[0:a]atrim=start={start_ms / 1000.0:.6f}:end={end_ms / 1000.0:.6f},"
@@ -458,31 +513,28 @@ def render_family_composite_variant(
         "alimiter=limit=0.97[out]"
     )
 
-    subprocess.run(
-        [
-            "ffmpeg",
-            "-v",
-            "error",
-            "-y",
-            "-i",
-            str(source_path),
-            "-i",
-            str(primer_source_path),
-            "-filter_complex",
-            filter_graph,
-            "-map",
-            "[out]",
-            "-codec:a",
-            "libmp3lame",
-            "-q:a",
-            "2",
-            str(output_path),
-        ],
-        check=True,
-    )
+    return [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-y",
+        "-i",
+        str(source_path),
+        "-i",
+        str(primer_source_path),
+        "-filter_complex",
+        filter_graph,
+        "-map",
+        "[out]",
+        "-codec:a",
+        "libmp3lame",
+        "-q:a",
+        "2",
+        str(output_path),
+    ]
 
 
-def render_passthrough_variant(
+def passthrough_command(
     *,
     source_path: Path,
     output_path: Path,
@@ -490,14 +542,13 @@ def render_passthrough_variant(
     end_ms: float,
     fade_in_ms: float,
     fade_out_ms: float,
-) -> None:
+) -> list[str]:
     duration_ms = round(end_ms - start_ms, 3)
     if duration_ms <= 0:
         raise ValueError(f"Non-positive clip duration for {output_path.name}: {duration_ms}")
 
     fade_out_ms = min(fade_out_ms, duration_ms)
     fade_out_start_ms = round(duration_ms - fade_out_ms, 3)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
 
     filter_graph = (
         f"atrim=start={start_ms / 1000.0:.6f}:end={end_ms / 1000.0:.6f},"
@@ -506,27 +557,24 @@ def render_passthrough_variant(
         f"afade=t=out:st={fade_out_start_ms / 1000.0:.6f}:d={fade_out_ms / 1000.0:.6f}"
     )
 
-    subprocess.run(
-        [
-            "ffmpeg",
-            "-v",
-            "error",
-            "-y",
-            "-i",
-            str(source_path),
-            "-filter:a",
-            filter_graph,
-            "-codec:a",
-            "libmp3lame",
-            "-q:a",
-            "2",
-            str(output_path),
-        ],
-        check=True,
-    )
+    return [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-y",
+        "-i",
+        str(source_path),
+        "-filter:a",
+        filter_graph,
+        "-codec:a",
+        "libmp3lame",
+        "-q:a",
+        "2",
+        str(output_path),
+    ]
 
 
-def render_tp5_tour_cut_part_variant(
+def tp5_part_mix_command(
     *,
     full_source_path: Path,
     concrete_source_path: Path,
@@ -538,9 +586,7 @@ def render_tp5_tour_cut_part_variant(
     reentry_start_ms: float,
     reentry_end_ms: float,
     total_duration_ms: float,
-) -> None:
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
+) -> list[str]:
     beat_duration_ms = beat_ms(72.0)
     base_duration_ms = round(beat_duration_ms * TP5_BASE_BEATS, 3)
     base_fade_out_ms = round(beat_duration_ms * TP5_BASE_FADE_OUT_BEATS, 3)
@@ -650,25 +696,30 @@ def render_tp5_tour_cut_part_variant(
         "alimiter=limit=0.97[out]"
     )
 
-    subprocess.run(
-        [
-            "ffmpeg",
-            "-v",
-            "error",
-            "-y",
-            *input_args,
-            "-filter_complex",
-            filter_graph,
-            "-map",
-            "[out]",
-            "-codec:a",
-            "libmp3lame",
-            "-q:a",
-            "2",
-            str(output_path),
-        ],
-        check=True,
-    )
+    return [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-y",
+        *input_args,
+        "-filter_complex",
+        filter_graph,
+        "-map",
+        "[out]",
+        "-codec:a",
+        "libmp3lame",
+        "-q:a",
+        "2",
+        str(output_path),
+    ]
+
+
+RENDER_COMMAND_BUILDERS: dict[str, Callable[..., list[str]]] = {
+    "variant": variant_command,
+    "family_composite": family_composite_command,
+    "passthrough": passthrough_command,
+    "tp5_part_mix": tp5_part_mix_command,
+}
 
 
 def clear_output_root(output_root: Path) -> None:
@@ -890,64 +941,272 @@ def build_trigger_plans(
     return plans, offset_ms
 
 
-def render_assets(
-    *,
-    plans: list[dict[str, Any]],
-) -> None:
+def payload_duration_ms(payload: dict[str, Any]) -> float:
+    if "durationMs" in payload:
+        return float(payload["durationMs"])
+    return float(payload["sourceEndMs"]) - float(payload["sourceStartMs"])
+
+
+def build_render_jobs(plans: list[dict[str, Any]]) -> list[RenderJob]:
+    jobs: list[RenderJob] = []
     for plan in plans:
         for variant in CHOIR_VARIANTS:
             payload = plan["variants"].get(variant.key)
             if payload is None:
                 continue
+            output_path = variant_output_path(plan["id"], variant)
+            params: dict[str, Any] = {
+                "start_ms": float(payload["sourceStartMs"]),
+                "end_ms": float(payload["sourceEndMs"]),
+                "fade_in_ms": float(payload["fadeInMs"]),
+                "fade_out_ms": float(payload["fadeOutMs"]),
+                "variant": variant,
+            }
             if payload.get("primerStemSourceFile"):
-                render_family_composite_variant(
+                kind = "family_composite"
+                params.update(
                     source_path=ROOT / payload["electronicsSourceFile"],
                     primer_source_path=ROOT / payload["primerStemSourceFile"],
                     primer_source_duration_ms=float(payload["primerStemDurationMs"]),
-                    output_path=variant_output_path(plan["id"], variant),
-                    start_ms=float(payload["sourceStartMs"]),
-                    end_ms=float(payload["sourceEndMs"]),
-                    fade_in_ms=float(payload["fadeInMs"]),
-                    fade_out_ms=float(payload["fadeOutMs"]),
-                    variant=variant,
                 )
             else:
-                render_variant(
-                    source_path=ROOT / payload.get("electronicsSourceFile", str(FULL_SOURCE_MP3.relative_to(ROOT))),
-                    output_path=variant_output_path(plan["id"], variant),
-                    start_ms=float(payload["sourceStartMs"]),
-                    end_ms=float(payload["sourceEndMs"]),
-                    fade_in_ms=float(payload["fadeInMs"]),
-                    fade_out_ms=float(payload["fadeOutMs"]),
-                    variant=variant,
+                kind = "variant"
+                params["source_path"] = ROOT / payload.get(
+                    "electronicsSourceFile", str(FULL_SOURCE_MP3.relative_to(ROOT))
+                )
+            jobs.append(
+                RenderJob(
+                    label=str(output_path.relative_to(FLUTTER_ASSET_ROOT)),
+                    kind=kind,
+                    output_path=output_path,
+                    params=params,
+                    duration_ms=payload_duration_ms(payload),
+                    priority=1,
                 )
+            )
 
         for part_variant in PART_CONCRETE_VARIANTS:
             payload = plan.get("partVariants", {}).get(part_variant.part_key)
             if payload is None:
                 continue
             if payload.get("renderMode") == "tp5_part_mix":
-                render_tp5_tour_cut_part_variant(
-                    full_source_path=FULL_SOURCE_MP3,
-                    concrete_source_path=ROOT / payload["concreteSourceFile"],
-                    primer_source_path=ROOT / payload["primerStemSourceFile"],
-                    primer_source_duration_ms=float(payload["primerStemDurationMs"]),
-                    output_path=part_variant_output_path(plan["id"], part_variant),
-                    base_channel_expression=str(payload["baseChannelExpression"]),
-                    base_start_ms=float(payload["baseStartMs"]),
-                    reentry_start_ms=float(payload["reentrySourceStartMs"]),
-                    reentry_end_ms=float(payload["reentrySourceEndMs"]),
-                    total_duration_ms=float(payload["durationMs"]),
-                )
+                kind = "tp5_part_mix"
+                output_path = part_variant_output_path(plan["id"], part_variant)
+                params = {
+                    "full_source_path": FULL_SOURCE_MP3,
+                    "concrete_source_path": ROOT / payload["concreteSourceFile"],
+                    "primer_source_path": ROOT / payload["primerStemSourceFile"],
+                    "primer_source_duration_ms": float(payload["primerStemDurationMs"]),
+                    "base_channel_expression": str(payload["baseChannelExpression"]),
+                    "base_start_ms": float(payload["baseStartMs"]),
+                    "reentry_start_ms": float(payload["reentrySourceStartMs"]),
+                    "reentry_end_ms": float(payload["reentrySourceEndMs"]),
+                    "total_duration_ms": float(payload["durationMs"]),
+                }
+                # The TP5 composites are the slowest graphs, so they always start first
+                priority = 0
             else:
-                render_passthrough_variant(
-                    source_path=ROOT / payload["sourceFile"],
-                    output_path=part_concrete_output_path(plan["id"], part_variant),
-                    start_ms=float(payload["sourceStartMs"]),
-                    end_ms=float(payload["sourceEndMs"]),
-                    fade_in_ms=float(payload["fadeInMs"]),
-                    fade_out_ms=float(payload["fadeOutMs"]),
+                kind = "passthrough"
+                output_path = part_concrete_output_path(plan["id"], part_variant)
+                params = {
+                    "source_path": ROOT / payload["sourceFile"],
+                    "start_ms": float(payload["sourceStartMs"]),
+                    "end_ms": float(payload["sourceEndMs"]),
+                    "fade_in_ms": float(payload["fadeInMs"]),
+                    "fade_out_ms": float(payload["fadeOutMs"]),
+                }
+                priority = 1
+            jobs.append(
+                RenderJob(
+                    label=str(output_path.relative_to(FLUTTER_ASSET_ROOT)),
+                    kind=kind,
+                    output_path=output_path,
+                    params=params,
+                    duration_ms=payload_duration_ms(payload),
+                    priority=priority,
                 )
+            )
+    return jobs
+
+
+def order_render_jobs(jobs: list[RenderJob]) -> list[RenderJob]:
+    return sorted(jobs, key=lambda job: (job.priority, -job.duration_ms, job.label))
+
+
+def command_input_paths(command: list[str]) -> list[Path]:
+    return [Path(command[index + 1]) for index, argument in enumerate(command[:-1]) if argument == "-i"]
+
+
+def with_pcm_inputs(
+    command: list[str],
+    pcm_sources: dict[Path, PcmSource],
+    seeks_ms: dict[Path, float],
+) -> list[str]:
+    """Swap MP3 inputs for their decoded PCM copies, seeking straight to the clip window.
+
+    `-copyts` keeps the seeked input on source timestamps, so the absolute atrim
+    points in the filter graph stay valid.
+    """
+
+    rewritten = [command[0], "-copyts"]
+    index = 1
+    while index < len(command):
+        argument = command[index]
+        if argument == "-i" and Path(command[index + 1]) in pcm_sources:
+            source_path = Path(command[index + 1])
+            rewritten += pcm_sources[source_path].input_args(seeks_ms.get(source_path, 0.0))
+            index += 2
+            continue
+        rewritten.append(argument)
+        index += 1
+    return rewritten
+
+
+def run_render_job(job: RenderJob, pcm_sources: dict[Path, PcmSource] | None = None) -> RenderTiming:
+    started = time.perf_counter()
+    job.output_path.parent.mkdir(parents=True, exist_ok=True)
+    command = job.command()
+    if pcm_sources:
+        command = with_pcm_inputs(command, pcm_sources, job.input_seeks_ms())
+    run_ffmpeg(command)
+    return RenderTiming(
+        label=job.label,
+        duration_ms=job.duration_ms,
+        elapsed_seconds=time.perf_counter() - started,
+    )
+
+
+def print_render_summary(timings: list[RenderTiming], wall_seconds: float, workers: int) -> None:
+    if not timings:
+        return
+    print(f"Render timings ({len(timings)} jobs, {workers} workers):")
+    for timing in sorted(timings, key=lambda item: item.elapsed_seconds, reverse=True):
+        print(f"  {timing.elapsed_seconds:7.2f}s  {timing.duration_ms / 1000.0:7.2f}s audio  {timing.label}")
+    busy_seconds = sum(timing.elapsed_seconds for timing in timings)
+    print(f"  wall {wall_seconds:.2f}s, summed job time {busy_seconds:.2f}s")
+
+
+def render_cache_key(job: RenderJob, source_hashes: dict[Path, str]) -> str:
+    """Hash everything that shapes the rendered audio.
+
+    Input files enter the key by content hash, and the ffmpeg command carries the
+    trim points, fades, pan expression, gain and the full filter graph.
+    """
+
+    command = job.command()
+    keyed_command: list[str] = []
+    for index, argument in enumerate(command[:-1]):
+        if index > 0 and command[index - 1] == "-i":
+            argument = f"sha256:{source_hashes[Path(argument)]}"
+        keyed_command.append(argument)
+    payload = {"version": RENDER_CACHE_VERSION, "output": job.label, "command": keyed_command}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_render_cache() -> dict[str, dict[str, Any]]:
+    path = RENDER_CACHE_PATH
+    if not path.exists():
+        return {}
+    try:
+        payload = json.loads(path.read_text())
+    except json.JSONDecodeError:
+        return {}
+    if payload.get("version") != RENDER_CACHE_VERSION:
+        return {}
+    return payload.get("entries", {})
+
+
+def write_render_cache(entries: dict[str, dict[str, Any]]) -> None:
+    RENDER_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "version": RENDER_CACHE_VERSION,
+        "assetRoot": str(FLUTTER_ASSET_ROOT.relative_to(ROOT)),
+        "entries": dict(sorted(entries.items())),
+    }
+    RENDER_CACHE_PATH.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def is_render_cached(job: RenderJob, key: str, entries: dict[str, dict[str, Any]]) -> bool:
+    entry = entries.get(job.label)
+    if entry is None or entry.get("key") != key or not job.output_path.exists():
+        return False
+    return job.output_path.stat().st_size == entry.get("bytes")
+
+
+def prune_stale_outputs(jobs: list[RenderJob]) -> list[Path]:
+    expected = {job.output_path for job in jobs}
+    stale = [path for path in FLUTTER_ASSET_ROOT.rglob("*.mp3") if path not in expected]
+    for path in stale:
+        path.unlink()
+    return stale
+
+
+def render_assets(
+    *,
+    plans: list[dict[str, Any]],
+    workers: int = DEFAULT_WORKERS,
+    use_cache: bool = True,
+    use_pcm_sources: bool = True,
+) -> list[RenderTiming]:
+    all_jobs = order_render_jobs(build_render_jobs(plans))
+    cache_entries = load_render_cache() if use_cache else {}
+    source_paths = {path for job in all_jobs for path in command_input_paths(job.command())}
+    source_hashes = file_hashes.sha256_many(source_paths)
+    keys = {job.label: render_cache_key(job, source_hashes) for job in all_jobs}
+    jobs: list[RenderJob] = []
+    fresh_entries: dict[str, dict[str, Any]] = {}
+    for job in all_jobs:
+        if is_render_cached(job, keys[job.label], cache_entries):
+            fresh_entries[job.label] = cache_entries[job.label]
+        else:
+            jobs.append(job)
+    reused_count = len(all_jobs) - len(jobs)
+    prune_stale_outputs(all_jobs)
+    workers = max(1, min(workers, len(jobs) or 1))
+    pcm_sources: dict[Path, PcmSource] = {}
+    if use_pcm_sources and jobs:
+        # Each source is decoded once here instead of once per clip inside ffmpeg
+        pcm_sources = prepare_pcm_sources(
+            {path for job in jobs for path in command_input_paths(job.command())},
+            source_hashes,
+            workers,
+        )
+    _RENDER_ABORT.clear()
+
+    timings: list[RenderTiming] = []
+    failure: tuple[RenderJob, BaseException] | None = None
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        # Jobs are queued in priority order; the executor starts them FIFO
+        futures = {executor.submit(run_render_job, job, pcm_sources): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                timings.append(future.result())
+            except BaseException as exc:
+                failure = (job, exc)
+                abort_running_renders()
+                break
+            fresh_entries[job.label] = {
+                "key": keys[job.label],
+                "bytes": job.output_path.stat().st_size,
+            }
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        write_render_cache(fresh_entries)
+
+    print(f"Render cache: reused {reused_count}, rendering {len(jobs)}")
+    print_render_summary(timings, time.perf_counter() - started, workers)
+    if failure is not None:
+        job, exc = failure
+        detail = ""
+        if isinstance(exc, subprocess.CalledProcessError) and exc.stderr:
+            detail = f"\n{exc.stderr.decode(errors='replace').strip()}"
+        raise RuntimeError(
+            f"Render failed for {job.label}; stopped {len(jobs) - len(timings) - 1} remaining jobs{detail}"
+        ) from exc
+    return timings
 
 
 def build_manifest(
@@ -1056,12 +1315,12 @@ def write_manifest(manifest: dict[str, Any]) -> None:
                 )
 
 
-def write_recipe_copies(
+def build_recipe_bundle(
     *,
     generated_at: str,
     plans: list[dict[str, Any]],
-) -> None:
-    bundle = {
+) -> dict[str, Any]:
+    return {
         "source": str(TRIGGER_POINT_SOURCE.relative_to(ROOT)),
         "triggerPositionSource": str(TRIGGER_POINT_SOURCE.relative_to(ROOT)),
         "triggerTimingNote": (
@@ -1098,10 +1357,6 @@ def write_recipe_copies(
         ],
     }
 
-    payload = json.dumps(bundle, indent=2) + "\n"
-    for path in RECIPE_COPY_PATHS:
-        path.write_text(payload)
-
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -1120,11 +1375,39 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Reuse the existing tour-cut electronics master if it already exists.",
     )
+    parser.add_argument(
+        "--force-render",
+        action="store_true",
+        help="Clear the asset root and re-render every clip, ignoring the render cache.",
+    )
+    parser.add_argument(
+        "--no-pcm-sources",
+        action="store_true",
+        help="Let ffmpeg decode the source MP3s for every clip instead of reading decoded PCM copies.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Concurrent ffmpeg renders (default: CPU count).",
+    )
     return parser.parse_args()
 
 
-def main() -> None:
-    args = parse_args()
+def build_trigger_bundle(
+    *,
+    full_score_root: ET.Element | None = None,
+    cut_score_root: ET.Element | None = None,
+    skip_render: bool = False,
+    force_render: bool = False,
+    use_pcm_sources: bool = True,
+    workers: int = DEFAULT_WORKERS,
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Plan and render the trigger assets; return the manifest and the recipe bundle.
+
+    Already-parsed score roots can be passed in by an in-process caller. Nothing but the
+    audio assets is written here.
+    """
 
     for path in (
         FULL_SOURCE_MP3,
@@ -1137,8 +1420,8 @@ def main() -> None:
             raise FileNotFoundError(path)
 
     primer_stem_exports = ensure_primer_stem_exports()
-    _, full_token_lookup, _ = build_measure_token_map(FULL_SCORE_XML)
-    _, cut_token_lookup, _ = build_measure_token_map(CUT_SCORE_XML)
+    _, full_token_lookup, _ = build_measure_token_map(FULL_SCORE_XML, full_score_root)
+    _, cut_token_lookup, _ = build_measure_token_map(CUT_SCORE_XML, cut_score_root)
     trigger_specs = load_trigger_specs(TRIGGER_POINT_SOURCE)
     source_duration_ms = ffprobe_duration_ms(FULL_SOURCE_MP3)
     plans, offset_ms = build_trigger_plans(
@@ -1150,9 +1433,15 @@ def main() -> None:
     )
     generated_at = iso_now()
 
-    if not args.skip_render:
-        clear_output_root(FLUTTER_ASSET_ROOT)
-        render_assets(plans=plans)
+    if not skip_render:
+        if force_render:
+            clear_output_root(FLUTTER_ASSET_ROOT)
+        render_assets(
+            plans=plans,
+            workers=workers,
+            use_cache=not force_render,
+            use_pcm_sources=use_pcm_sources,
+        )
 
     manifest = build_manifest(
         generated_at=generated_at,
@@ -1161,9 +1450,11 @@ def main() -> None:
         plans=plans,
         primer_stem_exports=primer_stem_exports,
     )
-    write_manifest(manifest)
-    write_recipe_copies(generated_at=generated_at, plans=plans)
+    return manifest, build_recipe_bundle(generated_at=generated_at, plans=plans)
+
 
+def print_build_summary(manifest: dict[str, Any]) -> None:
+    plans = manifest["events"]
     choir_asset_count = sum(len(plan.get("variants", {})) for plan in plans)
     part_specific_asset_count = sum(len(plan.get("partVariants", {})) for plan in plans)
     print(f"Rendered {choir_asset_count + part_specific_asset_count} assets")
@@ -1172,5 +1463,18 @@ def main() -> None:
     print(f"Recipe copies updated: {len(RECIPE_COPY_PATHS)}")
 
 
+def main() -> None:
+    args = parse_args()
+    manifest, recipe = build_trigger_bundle(
+        skip_render=args.skip_render,
+        force_render=args.force_render,
+        use_pcm_sources=not args.no_pcm_sources,
+        workers=args.workers,
+    )
+    write_manifest(manifest)
+    recipe_bundle.write_recipe_bundle(recipe)
+    print_build_summary(manifest)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Render the light-show keyframes into fixed-rate torch intensity tracks.
+
+Every part of every event becomes a 100 Hz track of uint8 levels (0-255). The
+torch driver can then index a table instead of interpolating keyframes live. Frame
+`i` is the level at `i * 10` ms into the event, evaluated exactly as the client's
+`interpolateLightLevel` does. A `step` keyframe holds its level up to and
+including the next keyframe's time; anything else ramps linearly.
+
+Tracks are stored run-length encoded, either as `[value, run, value, run, ...]`
+("rle") or as the first value followed by `[delta, run, ...]` ("delta-rle"),
+whichever is shorter. `--check` decodes every track and compares each frame
+against the keyframes using a separate pure-Python evaluator.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any
+
+import numpy as np
+
+from build_trigger_point_light_show import LIGHT_SHOW_MANIFEST_PATH, PART_ORDER, REPO_ROOT
+
+
+TRACKS_PATH = REPO_ROOT / "docs/score-study/tour_cut_light_tracks.json"
+TRACKS_VERSION = 1
+TRACK_RATE_HZ = 100
+LEVEL_SCALE = 255
+
+
+def level_at(keyframes: list[dict[str, Any]], elapsed_ms: float) -> float:
+    """Reference evaluator, line for line the client's `interpolateLightLevel`."""
+
+    if not keyframes:
+        return 0.0
+    elapsed_ms = max(elapsed_ms, 0.0)
+    if elapsed_ms <= keyframes[0]["atMs"]:
+        return keyframes[0]["level"]
+    for previous, current in zip(keyframes, keyframes[1:]):
+        if elapsed_ms <= current["atMs"]:
+            if previous.get("interpolation") == "step":
+                return previous["level"]
+            span = current["atMs"] - previous["atMs"]
+            if span <= 0:
+                return current["level"]
+            t = (elapsed_ms - previous["atMs"]) / span
+            return previous["level"] + (current["level"] - previous["level"]) * t
+    return keyframes[-1]["level"]
+
+
+def frame_count(duration_ms: float, rate_hz: int = TRACK_RATE_HZ) -> int:
+    return int(duration_ms * rate_hz // 1000) + 1
+
+
+def frame_times_ms(count: int, rate_hz: int = TRACK_RATE_HZ) -> np.ndarray:
+    return np.arange(count, dtype=np.float64) * (1000.0 / rate_hz)
+
+
+def quantize(levels: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(levels * LEVEL_SCALE), 0, LEVEL_SCALE).astype(np.uint8)
+
+
+def render_levels(keyframes: list[dict[str, Any]], times_ms: np.ndarray) -> np.ndarray:
+    """Vectorized `level_at` over many frame times."""
+
+    if not keyframes:
+        return np.zeros(len(times_ms), dtype=np.float64)
+    at_ms = np.array([frame["atMs"] for frame in keyframes], dtype=np.float64)
+    levels = np.array([frame["level"] for frame in keyframes], dtype=np.float64)
+    steps = np.array([frame.get("interpolation") == "step" for frame in keyframes])
+
+    times_ms = np.maximum(times_ms, 0.0)
+    current = np.searchsorted(at_ms, times_ms, side="left")
+    inside = (current > 0) & (current < len(at_ms))
+    result = np.where(current == 0, levels[0], levels[-1])
+
+    current = current[inside]
+    previous = current - 1
+    span = at_ms[current] - at_ms[previous]
+    safe_span = np.where(span > 0, span, 1.0)
+    t = (times_ms[inside] - at_ms[previous]) / safe_span
+    ramped = levels[previous] + (levels[current] - levels[previous]) * t
+    ramped = np.where(span > 0, ramped, levels[current])
+    result[inside] = np.where(steps[previous], levels[previous], ramped)
+    return result
+
+
+def render_track(keyframes: list[dict[str, Any]], duration_ms: float) -> np.ndarray:
+    return quantize(render_levels(keyframes, frame_times_ms(frame_count(duration_ms))))
+
+
+def _runs(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    if len(values) == 0:
+        return values, values
+    starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+    lengths = np.diff(np.append(starts, len(values)))
+    return values[starts], lengths
+
+
+def encode_track(track: np.ndarray) -> dict[str, Any]:
+    values, lengths = _runs(track.astype(np.int16))
+    rle = np.column_stack((values, lengths)).ravel().tolist()
+    if len(track) < 2:
+        return {"encoding": "rle", "data": rle}
+    deltas, delta_lengths = _runs(np.diff(track.astype(np.int16)))
+    delta_rle = [int(track[0])] + np.column_stack((deltas, delta_lengths)).ravel().tolist()
+    if len(delta_rle) < len(rle):
+        return {"encoding": "delta-rle", "data": delta_rle}
+    return {"encoding": "rle", "data": rle}
+
+
+def decode_track(encoded: dict[str, Any]) -> np.ndarray:
+    data = np.asarray(encoded["data"], dtype=np.int64)
+    if encoded["encoding"] == "rle":
+        return np.repeat(data[0::2], data[1::2]).astype(np.uint8)
+    if encoded["encoding"] == "delta-rle":
+        deltas = np.repeat(data[1::2], data[2::2])
+        return np.concatenate(([data[0]], data[0] + np.cumsum(deltas))).astype(np.uint8)
+    raise ValueError(f"Unknown track encoding {encoded['encoding']!r}")
+
+
+def build_intensity_tracks(light_manifest: dict[str, Any]) -> dict[str, Any]:
+    events = []
+    for event in light_manifest["events"]:
+        duration_ms = float(event["durationMs"])
+        parts = {}
+        for part_key in PART_ORDER:
+            part = event["parts"].get(part_key)
+            if part is None:
+                continue
+            parts[part_key] = encode_track(render_track(part["keyframes"], duration_ms))
+        events.append(
+            {
+                "id": event["id"],
+                "durationMs": duration_ms,
+                "frameCount": frame_count(duration_ms),
+                "parts": parts,
+            }
+        )
+    return {
+        "version": TRACKS_VERSION,
+        "generated": light_manifest["generated"],
+        "sourceLightShowManifest": str(LIGHT_SHOW_MANIFEST_PATH.relative_to(REPO_ROOT)),
+        "rateHz": TRACK_RATE_HZ,
+        "levelScale": LEVEL_SCALE,
+        "stageOrder": PART_ORDER,
+        "events": events,
+    }
+
+
+def check_intensity_tracks(tracks: dict[str, Any], light_manifest: dict[str, Any]) -> list[str]:
+    """Compare every decoded frame with the keyframes; return one line per mismatching track."""
+
+    if tracks.get("rateHz") != TRACK_RATE_HZ or tracks.get("levelScale") != LEVEL_SCALE:
+        return [
+            f"tracks use {tracks.get('rateHz')} Hz / {tracks.get('levelScale')}, "
+            f"expected {TRACK_RATE_HZ} Hz / {LEVEL_SCALE}"
+        ]
+    problems: list[str] = []
+    step_ms = 1000.0 / TRACK_RATE_HZ
+    tracks_by_id = {event["id"]: event for event in tracks["events"]}
+    for event in light_manifest["events"]:
+        tracked = tracks_by_id.get(event["id"])
+        if tracked is None:
+            problems.append(f"event {event['id']}: no tracks")
+            continue
+        expected_frames = frame_count(float(event["durationMs"]))
+        for part_key, part in event["parts"].items():
+            encoded = tracked["parts"].get(part_key)
+            if encoded is None:
+                problems.append(f"event {event['id']} {part_key}: no track")
+                continue
+            track = decode_track(encoded)
+            if len(track) != expected_frames:
+                problems.append(
+                    f"event {event['id']} {part_key}: {len(track)} frames, expected {expected_frames}"
+                )
+                continue
+            keyframes = part["keyframes"]
+            mismatches = [
+                index
+                for index, value in enumerate(track.tolist())
+                if value != round(min(max(level_at(keyframes, index * step_ms), 0.0), 1.0) * LEVEL_SCALE)
+            ]
+            if mismatches:
+                first = mismatches[0]
+                problems.append(
+                    f"event {event['id']} {part_key}: {len(mismatches)} frames differ, first at {first * step_ms:.0f} ms"
+                )
+    return problems
+
+
+def write_intensity_tracks(tracks: dict[str, Any]) -> None:
+    TRACKS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    TRACKS_PATH.write_text(json.dumps(tracks, separators=(",", ":")) + "\n")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Render light-show keyframes into 100 Hz run-length encoded torch intensity tracks."
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only verify the existing tracks file against the current light-show manifest.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    light_manifest = json.loads(LIGHT_SHOW_MANIFEST_PATH.read_text())
+    if args.check:
+        tracks = json.loads(TRACKS_PATH.read_text())
+    else:
+        tracks = build_intensity_tracks(light_manifest)
+
+    problems = check_intensity_tracks(tracks, light_manifest)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems:
+        return 1
+
+    if not args.check:
+        write_intensity_tracks(tracks)
+        frames = sum(event["frameCount"] * len(event["parts"]) for event in tracks["events"])
+        print(f"Intensity tracks: {TRACKS_PATH.relative_to(REPO_ROOT)} ({frames} frames at {TRACK_RATE_HZ} Hz)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
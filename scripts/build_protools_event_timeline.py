@@ -7,7 +7,6 @@ import csv
 import hashlib
 import json
 import re
-import subprocess
 import xml.etree.ElementTree as ET
 from collections import Counter
 from datetime import datetime, timezone
@@ -15,6 +14,9 @@ from fractions import Fraction
 from pathlib import Path
 from typing import Any
 
+import clip_seek_index
+import file_hashes
+import media_metadata
 from score_measure_utils import build_measure_token_map
 
 
@@ -25,15 +27,6 @@ DEFAULT_SCORE_XML = (
 )
 DEFAULT_OUTPUT_DIR = ROOT / "docs" / "protools-housekeeping"
 POSITION_RE = re.compile(r"^(?P<beat>[\d+/]+)-of-(?P<measure_beats>\d+)$")
-FFPROBE_CMD = [
-    "ffprobe",
-    "-v",
-    "error",
-    "-show_entries",
-    "stream=codec_name,sample_rate,channels:format=duration,bit_rate",
-    "-of",
-    "json",
-]
 COLOR_TO_SLOTS = {
     "green": "16,29,44",
     "magenta": "12,24,25",
@@ -64,14 +57,6 @@ def iso_now() -> str:
     return datetime.now(tz=timezone.utc).isoformat(timespec="seconds")
 
 
-def sha256_file(path: Path) -> str:
-    digest = hashlib.sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
-
-
 def human_seconds(value: float) -> str:
     minutes = int(value // 60)
     seconds = value - (minutes * 60)
@@ -103,62 +88,6 @@ def parse_measure_number(raw_measure_number: str) -> int | None:
     return int(match.group(1))
 
 
-def ffprobe_metadata(path: Path) -> dict[str, Any]:
-    try:
-        result = subprocess.run(
-            FFPROBE_CMD + [str(path)],
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return {}
-
-    try:
-        payload = json.loads(result.stdout)
-    except json.JSONDecodeError:
-        return {}
-
-    format_info = payload.get("format", {})
-    streams = payload.get("streams", [])
-    first_stream = streams[0] if streams else {}
-    metadata: dict[str, Any] = {}
-
-    duration = format_info.get("duration")
-    if duration is not None:
-        try:
-            metadata["duration_seconds"] = round(float(duration), 6)
-        except (TypeError, ValueError):
-            pass
-
-    bit_rate = format_info.get("bit_rate")
-    if bit_rate is not None:
-        try:
-            metadata["bit_rate"] = int(bit_rate)
-        except (TypeError, ValueError):
-            pass
-
-    codec_name = first_stream.get("codec_name")
-    if codec_name:
-        metadata["codec_name"] = codec_name
-
-    sample_rate = first_stream.get("sample_rate")
-    if sample_rate is not None:
-        try:
-            metadata["sample_rate"] = int(sample_rate)
-        except (TypeError, ValueError):
-            pass
-
-    channels = first_stream.get("channels")
-    if channels is not None:
-        try:
-            metadata["channels"] = int(channels)
-        except (TypeError, ValueError):
-            pass
-
-    return metadata
-
-
 def collect_measure_words(measure: ET.Element) -> list[str]:
     words = []
     for word in measure.findall(".//direction-type/words"):
@@ -217,29 +146,38 @@ def build_measure_map(score_xml: Path) -> tuple[list[dict[str, Any]], dict[int,
 
 
 def build_asset_inventory() -> dict[str, dict[str, dict[str, Any]]]:
+    primer_paths = {
+        label: sorted((asset_root / "primerTones").glob("*.mp3")) for label, asset_root in ASSET_ROOTS.items()
+    }
+    all_paths = [path for paths in primer_paths.values() for path in paths]
+    probed = media_metadata.probe_many(all_paths)
+    digests = file_hashes.sha256_many(all_paths)
     inventories: dict[str, dict[str, dict[str, Any]]] = {}
-    for label, asset_root in ASSET_ROOTS.items():
-        primer_root = asset_root / "primerTones"
+    for label, paths in primer_paths.items():
         inventory: dict[str, dict[str, Any]] = {}
-        if primer_root.exists():
-            for path in sorted(primer_root.glob("*.mp3")):
-                relative_sample = f"primerTones/{path.name}"
-                inventory[sample_lookup_key(relative_sample)] = {
-                    "sample": relative_sample,
-                    "path": str(path.relative_to(ROOT)),
-                    "sha256": sha256_file(path),
-                    **ffprobe_metadata(path),
-                }
+        for path in paths:
+            relative_sample = f"primerTones/{path.name}"
+            inventory[sample_lookup_key(relative_sample)] = {
+                "sample": relative_sample,
+                "path": str(path.relative_to(ROOT)),
+                "sha256": digests[path],
+                **probed[path],
+            }
         inventories[label] = inventory
     return inventories
 
 
-def build_event_recipe_hashes() -> dict[str, dict[str, Any]]:
+def build_event_recipe_hashes(payloads: dict[Path, bytes] | None = None) -> dict[str, dict[str, Any]]:
+    """Hash every recipe copy; `payloads` stands in for copies not yet written to disk."""
+
+    payloads = payloads or {}
+    digests = {path: hashlib.sha256(payload).hexdigest() for path, payload in payloads.items()}
+    digests.update(file_hashes.sha256_many(path for path in EVENT_RECIPE_COPIES.values() if path not in payloads))
     hashes: dict[str, dict[str, Any]] = {}
     for label, path in EVENT_RECIPE_COPIES.items():
         hashes[label] = {
             "path": str(path.relative_to(ROOT)),
-            "sha256": sha256_file(path),
+            "sha256": digests[path],
         }
     return hashes
 
@@ -253,6 +191,15 @@ def timing_note_for_event(event: dict[str, Any], measure_words: list[str]) -> st
     return "musicxml_tempo_encoded"
 
 
+def event_measure_token(event: dict[str, Any]) -> str:
+    return str(event.get("measureToken") or event["measure"])
+
+
+def event_onset_seconds(event: dict[str, Any], measure_info: dict[str, Any]) -> float:
+    onset_fraction = parse_position_offset(event["position"], measure_info["beat_type"])
+    return measure_info["start_seconds"] + float(onset_fraction) * 60.0 / measure_info["tempo_bpm"]
+
+
 def build_timeline(
     recipe_bundle: dict[str, Any],
     measure_lookup: dict[str, dict[str, Any]],
@@ -264,12 +211,9 @@ def build_timeline(
     referenced_samples_original: dict[str, str] = {}
 
     for event in recipe_bundle["events"]:
-        measure_token = str(event.get("measureToken") or event["measure"])
+        measure_token = event_measure_token(event)
         measure_info = measure_lookup[measure_token]
-        onset_fraction = parse_position_offset(event["position"], measure_info["beat_type"])
-        onset_seconds = measure_info["start_seconds"] + (
-            float(onset_fraction) * 60.0 / measure_info["tempo_bpm"]
-        )
+        onset_seconds = event_onset_seconds(event, measure_info)
 
         primer_assignments = event.get("primer", {})
         electronics_assignments = event.get("electronics", {})
@@ -501,17 +445,32 @@ def render_markdown(report: dict[str, Any]) -> str:
             "- `event_timeline.json`",
             "- `event_timeline_events.csv`",
             "- `event_timeline_clips.csv`",
+            f"- `{clip_seek_index.SEEK_INDEX_FILENAME}`",
             "",
         ]
     )
     return "\n".join(lines)
 
 
-def build_report(recipe_json: Path, score_xml: Path) -> dict[str, Any]:
-    recipe_bundle = json.loads(recipe_json.read_text())
-    tempo_map, measure_lookup, _ = build_measure_token_map(score_xml)
+def build_report(
+    recipe_json: Path,
+    score_xml: Path,
+    *,
+    recipe_bundle: dict[str, Any] | None = None,
+    score_root: ET.Element | None = None,
+    recipe_copy_payloads: dict[Path, bytes] | None = None,
+) -> dict[str, Any]:
+    """Build the timeline report.
+
+    An in-process caller can pass the recipe bundle, the parsed score and the serialized
+    recipe copies it is about to write instead of having them read back from disk.
+    """
+
+    if recipe_bundle is None:
+        recipe_bundle = json.loads(recipe_json.read_text())
+    tempo_map, measure_lookup, _ = build_measure_token_map(score_xml, score_root)
     asset_inventory = build_asset_inventory()
-    event_recipe_hashes = build_event_recipe_hashes()
+    event_recipe_hashes = build_event_recipe_hashes(recipe_copy_payloads)
     event_rows, clip_rows, integration = build_timeline(
         recipe_bundle=recipe_bundle,
         measure_lookup=measure_lookup,
@@ -566,6 +525,22 @@ def build_report(recipe_json: Path, score_xml: Path) -> dict[str, Any]:
     }
 
 
+def write_outputs(report: dict[str, Any], output_dir: Path) -> list[Path]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    json_path = output_dir / "event_timeline.json"
+    events_csv_path = output_dir / "event_timeline_events.csv"
+    clips_csv_path = output_dir / "event_timeline_clips.csv"
+    md_path = output_dir / "event_timeline.md"
+
+    json_path.write_text(json.dumps(report, indent=2) + "\n")
+    write_csv(events_csv_path, report["events"])
+    write_csv(clips_csv_path, report["clips"])
+    md_path.write_text(render_markdown(report) + "\n")
+    seek_index = clip_seek_index.build_seek_index(report["clips"], report["tempo_map"], report["generated_utc"])
+    seek_index_path = clip_seek_index.write_seek_index(seek_index, output_dir)
+    return [json_path, events_csv_path, clips_csv_path, md_path, seek_index_path]
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Build a performance-time event timeline from the recipe bundle and MusicXML score.")
     parser.add_argument(
@@ -588,25 +563,9 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    output_dir = args.output_dir.resolve()
-    output_dir.mkdir(parents=True, exist_ok=True)
-
     report = build_report(args.recipe_json.resolve(), args.score_xml.resolve())
-
-    json_path = output_dir / "event_timeline.json"
-    events_csv_path = output_dir / "event_timeline_events.csv"
-    clips_csv_path = output_dir / "event_timeline_clips.csv"
-    md_path = output_dir / "event_timeline.md"
-
-    json_path.write_text(json.dumps(report, indent=2) + "\n")
-    write_csv(events_csv_path, report["events"])
-    write_csv(clips_csv_path, report["clips"])
-    md_path.write_text(render_markdown(report) + "\n")
-
-    print(f"Wrote {json_path.relative_to(ROOT)}")
-    print(f"Wrote {events_csv_path.relative_to(ROOT)}")
-    print(f"Wrote {clips_csv_path.relative_to(ROOT)}")
-    print(f"Wrote {md_path.relative_to(ROOT)}")
+    for path in write_outputs(report, args.output_dir.resolve()):
+        print(f"Wrote {path.relative_to(ROOT)}")
 
 
 if __name__ == "__main__":
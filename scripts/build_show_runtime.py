@@ -4,11 +4,29 @@ from __future__ import annotations
 
 import argparse
 import json
-import subprocess
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from copy import deepcopy
 from pathlib import Path
+from typing import Any, Callable
+
+import build_device_recipe_slices as device_slices
+import build_electronics_trigger_point_assets as trigger_assets
+import build_light_intensity_tracks as intensity_tracks
+import build_protools_event_timeline as event_timeline
+import build_tour_cut_score as tour_cut_score
+import build_trigger_point_light_show as light_show
+import recipe_binary
+import recipe_bundle
+import torch_duty_cycle
+from stage_graph import Stage, print_stage_table, run_stages
 
 
 ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_ROOT = ROOT / "scripts"
+DEFAULT_JOBS = os.cpu_count() or 1
 
 PROFILE_MANIFEST = {
     "activeProfileId": "tour_cut",
@@ -46,11 +64,8 @@ PROFILE_COPY_PATHS = [
     ROOT / "flashlights_client" / "assets" / "show_profiles.json",
 ]
 
-ACTIVE_RECIPE_PATHS = [
-    ROOT / "Flashlights-ITD_EventRecipes_4_2026_0309" / "event_recipes.json",
-    ROOT / "FlashlightsInTheDark_MacOS" / "Resources" / "event_recipes.json",
-    ROOT / "flashlights_client" / "assets" / "event_recipes.json",
-]
+ACTIVE_RECIPE_PATHS = recipe_bundle.RECIPE_COPY_PATHS
+CANONICAL_RECIPE_PATH = recipe_bundle.CANONICAL_RECIPE_PATH
 
 ACTIVE_PROFILE_METADATA = {
     "tour_cut": {
@@ -71,24 +86,293 @@ def write_json(path: Path, payload: dict) -> None:
     path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
 
 
-def sync_profile_manifest(active_profile: str) -> None:
+def write_score(path: Path, tree: ET.ElementTree) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tree.write(path, encoding="utf-8", xml_declaration=True)
+
+
+class PipelineContext:
+    """Documents handed from stage to stage in memory and written to disk once, by `flush`.
+
+    A stage reads through `json` or `score_root`, which return what an earlier stage
+    published in this run and fall back to the file on disk. Scores are parsed at most
+    once per run and shared read-only between stages; JSON documents are copied so a
+    stage can edit what it reads before publishing it again.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._documents: dict[Path, Any] = {}
+        self._writers: dict[Path, Callable[[Path, Any], None]] = {}
+        self._scores: dict[Path, ET.ElementTree] = {}
+
+    def publish(
+        self,
+        path: Path,
+        document: Any,
+        writer: Callable[[Path, Any], None] = write_json,
+    ) -> None:
+        with self._lock:
+            self._documents[path] = document
+            self._writers[path] = writer
+
+    def publish_score(self, path: Path, tree: ET.ElementTree) -> None:
+        with self._lock:
+            self._scores[path] = tree
+        self.publish(path, tree, write_score)
+
+    def published(self, path: Path) -> Any | None:
+        with self._lock:
+            return self._documents.get(path)
+
+    def json(self, path: Path) -> dict[str, Any]:
+        with self._lock:
+            document = self._documents.get(path)
+        if document is None:
+            return json.loads(path.read_text(encoding="utf-8"))
+        return deepcopy(document)
+
+    def score_root(self, path: Path) -> ET.Element:
+        with self._lock:
+            tree = self._scores.get(path)
+        if tree is None:
+            tree = ET.parse(path)
+            with self._lock:
+                tree = self._scores.setdefault(path, tree)
+        return tree.getroot()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending = [(path, document, self._writers[path]) for path, document in self._documents.items()]
+            self._documents.clear()
+            self._writers.clear()
+        for path, document, writer in pending:
+            writer(path, document)
+
+
+def build_profile_manifest(active_profile: str) -> dict[str, Any]:
     manifest = dict(PROFILE_MANIFEST)
     manifest["activeProfileId"] = active_profile
+    return manifest
+
+
+def sync_profile_manifest(active_profile: str) -> None:
+    manifest = build_profile_manifest(active_profile)
     for path in PROFILE_COPY_PATHS:
         write_json(path, manifest)
 
 
+def annotate_recipe_bundle(bundle: dict[str, Any], active_profile: str) -> dict[str, Any]:
+    bundle.update(ACTIVE_PROFILE_METADATA[active_profile])
+    return bundle
+
+
 def annotate_active_recipe_bundles(active_profile: str) -> None:
-    metadata = ACTIVE_PROFILE_METADATA[active_profile]
-    for path in ACTIVE_RECIPE_PATHS:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-        payload.update(metadata)
-        write_json(path, payload)
+    recipe_bundle.write_recipe_bundle(annotate_recipe_bundle(recipe_bundle.load_recipe_bundle(), active_profile))
+
 
+def publish_recipe_bundle(context: PipelineContext, bundle: dict[str, Any]) -> None:
+    """The recipe copies are one document in memory, written through `recipe_bundle`."""
 
-def run_script(script_name: str) -> None:
-    script_path = ROOT / "scripts" / script_name
-    subprocess.run(["python3", str(script_path)], cwd=ROOT, check=True)
+    context.publish(CANONICAL_RECIPE_PATH, bundle, lambda _path, payload: recipe_bundle.write_recipe_bundle(payload))
+
+
+def run_profiles_stage(context: PipelineContext, active_profile: str) -> None:
+    manifest = build_profile_manifest(active_profile)
+    for path in PROFILE_COPY_PATHS:
+        context.publish(path, manifest)
+
+
+def run_tour_cut_stage(context: PipelineContext) -> None:
+    tree, manifest = tour_cut_score.build_cut_score()
+    context.publish_score(tour_cut_score.CUT_SCORE_SOURCE_PATH, tree)
+    context.publish_score(tour_cut_score.CUT_SCORE_FLUTTER_PATH, tree)
+    context.publish(tour_cut_score.MANIFEST_PATH, manifest)
+
+
+def run_trigger_assets_stage(context: PipelineContext) -> None:
+    manifest, recipe = trigger_assets.build_trigger_bundle(
+        full_score_root=context.score_root(trigger_assets.FULL_SCORE_XML),
+        cut_score_root=context.score_root(trigger_assets.CUT_SCORE_XML),
+    )
+    context.publish(trigger_assets.MANIFEST_JSON_PATH, manifest, lambda _path, payload: trigger_assets.write_manifest(payload))
+    publish_recipe_bundle(context, recipe)
+    trigger_assets.print_build_summary(manifest)
+
+
+def run_light_show_stage(context: PipelineContext) -> None:
+    light_manifest = light_show.build_lighting_manifest(
+        trigger_manifest=context.json(light_show.TRIGGER_MANIFEST_PATH),
+        score_root=context.score_root(light_show.MUSICXML_PATH),
+    )
+    problems = light_show.validate_lighting_manifest(light_manifest)
+    duty_report = torch_duty_cycle.analyze_light_show(
+        light_manifest,
+        trigger_manifest=context.json(light_show.TRIGGER_MANIFEST_PATH),
+    )
+    problems += torch_duty_cycle.budget_problems(duty_report)
+    if problems:
+        raise ValueError(f"Light-show keyframes failed validation: {problems[0]}")
+    recipe = light_show.apply_lighting_to_recipe(context.json(CANONICAL_RECIPE_PATH), light_manifest)
+    context.publish(light_show.LIGHT_SHOW_MANIFEST_PATH, light_manifest)
+    publish_recipe_bundle(context, recipe)
+
+
+def run_intensity_tracks_stage(context: PipelineContext) -> None:
+    light_manifest = context.json(light_show.LIGHT_SHOW_MANIFEST_PATH)
+    tracks = intensity_tracks.build_intensity_tracks(light_manifest)
+    problems = intensity_tracks.check_intensity_tracks(tracks, light_manifest)
+    if problems:
+        raise ValueError(f"Intensity tracks disagree with the keyframes: {problems[0]}")
+    context.publish(
+        intensity_tracks.TRACKS_PATH,
+        tracks,
+        lambda _path, payload: intensity_tracks.write_intensity_tracks(payload),
+    )
+
+
+def run_recipe_annotation_stage(context: PipelineContext, active_profile: str) -> None:
+    publish_recipe_bundle(context, annotate_recipe_bundle(context.json(CANONICAL_RECIPE_PATH), active_profile))
+
+
+def run_event_timeline_stage(context: PipelineContext) -> None:
+    pending_recipe = context.published(CANONICAL_RECIPE_PATH)
+    pending_copies = (
+        {path: recipe_bundle.serialize_recipe_bundle(pending_recipe) for path in ACTIVE_RECIPE_PATHS}
+        if pending_recipe is not None
+        else {}
+    )
+    report = event_timeline.build_report(
+        event_timeline.DEFAULT_RECIPE_JSON,
+        event_timeline.DEFAULT_SCORE_XML,
+        recipe_bundle=context.json(event_timeline.DEFAULT_RECIPE_JSON),
+        score_root=context.score_root(event_timeline.DEFAULT_SCORE_XML),
+        recipe_copy_payloads=pending_copies,
+    )
+    context.publish(
+        event_timeline.DEFAULT_OUTPUT_DIR / "event_timeline.json",
+        report,
+        lambda path, payload: event_timeline.write_outputs(payload, path.parent),
+    )
+
+
+def script_inputs(*names: str) -> tuple[Path, ...]:
+    return tuple(SCRIPTS_ROOT / name for name in names)
+
+
+def build_stages(active_profile: str, context: PipelineContext) -> list[Stage]:
+    """Declare what every pipeline stage reads and writes; see `stage_graph`.
+
+    Stages run in this process and hand their results on through `context`.
+    """
+
+    profile = {"activeProfile": active_profile}
+    return [
+        Stage(
+            name="show_profiles",
+            action=lambda: run_profiles_stage(context, active_profile),
+            inputs=script_inputs("build_show_runtime.py"),
+            outputs=tuple(PROFILE_COPY_PATHS),
+            params=profile,
+        ),
+        Stage(
+            name="tour_cut_score",
+            action=lambda: run_tour_cut_stage(context),
+            inputs=script_inputs("build_show_runtime.py", "build_tour_cut_score.py") + (tour_cut_score.SOURCE_SCORE_PATH,),
+            outputs=(
+                tour_cut_score.CUT_SCORE_SOURCE_PATH,
+                tour_cut_score.CUT_SCORE_FLUTTER_PATH,
+                tour_cut_score.MANIFEST_PATH,
+            ),
+        ),
+        Stage(
+            name="electronics_trigger_assets",
+            action=lambda: run_trigger_assets_stage(context),
+            inputs=script_inputs(
+                "build_show_runtime.py",
+                "build_electronics_trigger_point_assets.py",
+                "score_measure_utils.py",
+                "pcm_source_cache.py",
+                "media_metadata.py",
+                "json_file_cache.py",
+                "recipe_bundle.py",
+            )
+            + (
+                trigger_assets.FULL_SOURCE_MP3,
+                trigger_assets.FULL_SCORE_XML,
+                trigger_assets.CUT_SCORE_XML,
+                trigger_assets.TRIGGER_POINT_SOURCE,
+                trigger_assets.MUSIQUE_CONCRETE_SOURCE_ROOT,
+            )
+            + tuple(source.wav_path for source in trigger_assets.PRIMER_STEM_SOURCES.values()),
+            outputs=(
+                trigger_assets.CUT_SOURCE_MP3,
+                trigger_assets.PRIMER_STEM_EXPORT_ROOT,
+                trigger_assets.FLUTTER_ASSET_ROOT,
+                trigger_assets.MANIFEST_JSON_PATH,
+                trigger_assets.MANIFEST_CSV_PATH,
+                trigger_assets.RENDER_CACHE_PATH,
+                *trigger_assets.RECIPE_COPY_PATHS,
+            ),
+        ),
+        Stage(
+            name="light_show",
+            action=lambda: run_light_show_stage(context),
+            inputs=script_inputs(
+                "build_show_runtime.py",
+                "build_trigger_point_light_show.py",
+                "torch_duty_cycle.py",
+                "recipe_bundle.py",
+            )
+            + (light_show.TRIGGER_MANIFEST_PATH, light_show.MUSICXML_PATH),
+            outputs=(light_show.LIGHT_SHOW_MANIFEST_PATH, *light_show.RECIPE_COPY_PATHS),
+        ),
+        Stage(
+            name="light_intensity_tracks",
+            action=lambda: run_intensity_tracks_stage(context),
+            inputs=script_inputs("build_show_runtime.py", "build_light_intensity_tracks.py")
+            + (light_show.LIGHT_SHOW_MANIFEST_PATH,),
+            outputs=(intensity_tracks.TRACKS_PATH,),
+        ),
+        Stage(
+            name="recipe_annotations",
+            action=lambda: run_recipe_annotation_stage(context, active_profile),
+            inputs=script_inputs(
+                "build_show_runtime.py",
+                "recipe_bundle.py",
+                "recipe_binary.py",
+                "build_device_recipe_slices.py",
+            )
+            + (device_slices.DART_CLIENT_STATE_PATH, device_slices.SWIFT_STAGE_LAYOUT_PATH),
+            # write_recipe_bundle refreshes the binary bundle and device slices with the JSON
+            outputs=(*ACTIVE_RECIPE_PATHS, *recipe_binary.RECIPE_BINARY_PATHS, device_slices.SLICE_ROOT),
+            params=profile,
+        ),
+        Stage(
+            name="event_timeline",
+            action=lambda: run_event_timeline_stage(context),
+            inputs=script_inputs(
+                "build_show_runtime.py",
+                "build_protools_event_timeline.py",
+                "clip_seek_index.py",
+                "score_measure_utils.py",
+                "media_metadata.py",
+                "json_file_cache.py",
+            )
+            + (event_timeline.DEFAULT_SCORE_XML, *event_timeline.EVENT_RECIPE_COPIES.values())
+            + tuple(asset_root / "primerTones" for asset_root in event_timeline.ASSET_ROOTS.values()),
+            outputs=tuple(
+                event_timeline.DEFAULT_OUTPUT_DIR / name
+                for name in (
+                    "event_timeline.json",
+                    "event_timeline_events.csv",
+                    "event_timeline_clips.csv",
+                    "event_timeline.md",
+                    event_timeline.clip_seek_index.SEEK_INDEX_FILENAME,
+                )
+            ),
+        ),
+    ]
 
 
 def main() -> int:
@@ -106,6 +390,17 @@ def main() -> int:
         action="store_true",
         help="Only write show profile metadata and recipe annotations.",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Maximum number of independent stages to run at once.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run every stage even if its inputs and outputs match the last successful build.",
+    )
     args = parser.parse_args()
 
     if args.active_profile != "tour_cut" and not args.profiles_only:
@@ -114,16 +409,21 @@ def main() -> int:
             "Use --active-profile tour_cut or run with --profiles-only."
         )
 
-    sync_profile_manifest(args.active_profile)
-
-    if not args.profiles_only:
-        run_script("build_tour_cut_score.py")
-        run_script("build_electronics_trigger_point_assets.py")
-        run_script("build_trigger_point_light_show.py")
-        run_script("build_protools_event_timeline.py")
+    if args.profiles_only:
+        sync_profile_manifest(args.active_profile)
+        annotate_active_recipe_bundles(args.active_profile)
+        return 0
 
-    annotate_active_recipe_bundles(args.active_profile)
-    return 0
+    started = time.perf_counter()
+    context = PipelineContext()
+    results = run_stages(
+        build_stages(args.active_profile, context),
+        jobs=args.jobs,
+        force=args.force,
+        finalize=context.flush,
+    )
+    print_stage_table(results, time.perf_counter() - started)
+    return 1 if any(result.status not in {"ran", "skipped"} for result in results) else 0
 
 
 if __name__ == "__main__":
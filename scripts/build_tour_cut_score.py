@@ -127,8 +127,11 @@ def replace_with_rest_measure(measure: ET.Element, state: MeasureState) -> ET.El
     return stripped
 
 
-def build_cut_score() -> tuple[ET.ElementTree, dict[str, object]]:
-    tree = ET.parse(SOURCE_SCORE_PATH)
+def build_cut_score(tree: ET.ElementTree | None = None) -> tuple[ET.ElementTree, dict[str, object]]:
+    """Cut the full score down to the tour cut. A passed-in source tree is modified in place."""
+
+    if tree is None:
+        tree = ET.parse(SOURCE_SCORE_PATH)
     root = tree.getroot()
 
     part_measure_manifest: dict[str, list[dict[str, object]]] = {}
@@ -3,8 +3,10 @@
 
 from __future__ import annotations
 
+import argparse
 import json
 import re
+import sys
 import xml.etree.ElementTree as ET
 from copy import deepcopy
 from dataclasses import dataclass
@@ -12,17 +14,22 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+import recipe_bundle
+import torch_duty_cycle
+
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 TRIGGER_MANIFEST_PATH = REPO_ROOT / "docs/protools-housekeeping/electronics_trigger_assets.json"
 MUSICXML_PATH = REPO_ROOT / "flashlights_client/assets/FlashlightsInTheDark_v32_TourCut.musicxml"
 LIGHT_SHOW_MANIFEST_PATH = REPO_ROOT / "docs/score-study/tour_cut_light_show.json"
 
-RECIPE_COPY_PATHS = [
-    REPO_ROOT / "Flashlights-ITD_EventRecipes_4_2026_0309/event_recipes.json",
-    REPO_ROOT / "FlashlightsInTheDark_MacOS/Resources/event_recipes.json",
-    REPO_ROOT / "flashlights_client/assets/event_recipes.json",
-]
+RECIPE_COPY_PATHS = recipe_bundle.RECIPE_COPY_PATHS
+
+# Phone torches are switched through the camera stack; changes closer together
+# than this are dropped or smeared on slower devices.
+MIN_TORCH_SWITCH_MS = 50.0
 
 PART_ORDER = [
     "soprano_l1",
@@ -79,44 +86,60 @@ class EventPlan:
     parts: dict[str, PartPlan] | None
 
 
+def _point_arrays(
+    points: list[tuple[float, float] | tuple[float, float, str]],
+) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    fractions = np.array([point[0] for point in points], dtype=np.float64)
+    levels = np.array([point[1] for point in points], dtype=np.float64)
+    interpolations = [point[2] if len(point) > 2 else "linear" for point in points]
+    return fractions, levels, interpolations
+
+
 def _scale_points(
     duration_ms: float,
     points: list[tuple[float, float] | tuple[float, float, str]],
 ) -> list[dict[str, float | str]]:
+    if not points:
+        return [{"atMs": 0.0, "level": 0.0}]
+
+    fractions, levels, interpolations = _point_arrays(points)
+    end_ms = round(duration_ms, 3)
+    # np.round rounds half-way values differently from `round`; keep Python's on the final floats.
+    at_ms = [round(at, 3) for at in (duration_ms * fractions).tolist()]
+    levels = [round(level, 3) for level in np.clip(levels, 0.0, 1.0).tolist()]
+    if at_ms[0] != 0.0:
+        at_ms.insert(0, 0.0)
+        levels.insert(0, 0.0)
+        interpolations = ["linear", *interpolations]
+    if at_ms[-1] != end_ms:
+        at_ms.append(end_ms)
+        levels.append(0.0)
+        interpolations = [*interpolations, "linear"]
+    else:
+        levels[-1] = 0.0
+
     keyframes: list[dict[str, float | str]] = []
-    for raw_point in points:
-        fraction = raw_point[0]
-        level = raw_point[1]
-        interpolation = raw_point[2] if len(raw_point) > 2 else "linear"
-        entry: dict[str, float | str] = {
-            "atMs": round(duration_ms * fraction, 3),
-            "level": round(max(0.0, min(level, 1.0)), 3),
-        }
+    for at, level, interpolation in zip(at_ms, levels, interpolations):
+        entry: dict[str, float | str] = {"atMs": at, "level": level}
         if interpolation != "linear":
             entry["interpolation"] = interpolation
         keyframes.append(entry)
-
-    if not keyframes:
-        return [{"atMs": 0.0, "level": 0.0}]
-    if keyframes[0]["atMs"] != 0.0:
-        keyframes.insert(0, {"atMs": 0.0, "level": 0.0})
-    if keyframes[-1]["atMs"] != round(duration_ms, 3):
-        keyframes.append({"atMs": round(duration_ms, 3), "level": 0.0})
-    else:
-        keyframes[-1]["level"] = 0.0
     return keyframes
 
 
 def _dedupe_fraction_points(
     points: list[tuple[float, float] | tuple[float, float, str]],
 ) -> list[tuple[float, float] | tuple[float, float, str]]:
-    deduped: dict[float, tuple[float, float] | tuple[float, float, str]] = {}
-    for point in sorted(points, key=lambda item: item[0]):
-        key = round(point[0], 6)
-        existing = deduped.get(key)
-        if existing is None or point[1] >= existing[1]:
-            deduped[key] = point
-    return [deduped[key] for key in sorted(deduped)]
+    """Keep one point per fraction (to 1e-6): the loudest, and the later of equal levels."""
+
+    if not points:
+        return []
+    fractions, levels, _ = _point_arrays(points)
+    order = np.argsort(fractions, kind="stable")
+    keys = np.round(fractions[order], 6)
+    ranked = np.lexsort((np.arange(len(order)), levels[order], keys))
+    last_of_key = np.append(keys[ranked][1:] != keys[ranked][:-1], True)
+    return [points[index] for index in order[ranked[last_of_key]].tolist()]
 
 
 def _beats_to_points(
@@ -143,8 +166,9 @@ def _measure_base_number(raw: str | None) -> int | None:
     return int(match.group(1))
 
 
-def _collect_final_voice_onsets() -> dict[str, list[dict[str, float | bool]]]:
-    root = ET.parse(MUSICXML_PATH).getroot()
+def _collect_final_voice_onsets(root: ET.Element | None = None) -> dict[str, list[dict[str, float | bool]]]:
+    if root is None:
+        root = ET.parse(MUSICXML_PATH).getroot()
     parts = {part.attrib["id"]: part for part in root.findall("part")}
     result: dict[str, list[dict[str, float | bool]]] = {}
 
@@ -208,30 +232,29 @@ def _collect_final_voice_onsets() -> dict[str, list[dict[str, float | bool]]]:
     return result
 
 
-def _build_final_parts(duration_ms: float) -> dict[str, PartPlan]:
-    onset_map = _collect_final_voice_onsets()
+def _build_final_parts(
+    duration_ms: float,
+    onset_map: dict[str, list[dict[str, float | bool]]],
+) -> dict[str, PartPlan]:
     ms_per_beat = 60000.0 / 72.0
     parts: dict[str, PartPlan] = {}
 
     for part_key in PART_ORDER:
         records = onset_map[part_key]
+        onset_ms = np.array([float(record["onsetBeats"]) for record in records], dtype=np.float64) * ms_per_beat
+        downbeat = np.array([bool(record["measureDownbeat"]) for record in records], dtype=bool)
+        next_onset_ms = np.append(onset_ms[1:], duration_ms)
+        gap_ms = np.maximum(150.0, next_onset_ms - onset_ms)
+        peak = np.minimum(FINAL_BASE_LEVELS[part_key] + np.where(downbeat, 0.05, 0.0), 0.40)
+        pulse_ms = np.minimum(np.where(downbeat, 200.0, 120.0), gap_ms * 0.45)
+        off_ms = np.minimum(duration_ms, onset_ms + pulse_ms)
+
         points: list[tuple[float, float] | tuple[float, float, str]] = [(0.0, 0.0, "step")]
-        for index, record in enumerate(records):
-            onset_ms = float(record["onsetBeats"]) * ms_per_beat
-            next_onset_ms = (
-                float(records[index + 1]["onsetBeats"]) * ms_per_beat
-                if index + 1 < len(records)
-                else duration_ms
-            )
-            gap_ms = max(150.0, next_onset_ms - onset_ms)
-            peak = min(
-                FINAL_BASE_LEVELS[part_key] + (0.05 if bool(record["measureDownbeat"]) else 0.0),
-                0.40,
-            )
-            pulse_ms = min(200.0 if bool(record["measureDownbeat"]) else 120.0, gap_ms * 0.45)
-            off_ms = min(duration_ms, onset_ms + pulse_ms)
-            points.append((onset_ms / duration_ms, peak, "step"))
-            points.append((off_ms / duration_ms, 0.0, "step"))
+        for onset_fraction, level, off_fraction in zip(
+            (onset_ms / duration_ms).tolist(), peak.tolist(), (off_ms / duration_ms).tolist()
+        ):
+            points.append((onset_fraction, level, "step"))
+            points.append((off_fraction, 0.0, "step"))
 
         normalised = _dedupe_fraction_points(points)
         parts[part_key] = PartPlan(
@@ -501,11 +524,18 @@ def _build_event_plans() -> dict[int, EventPlan]:
     }
 
 
-def _build_lighting_manifest() -> dict[str, Any]:
-    trigger_manifest = json.loads(TRIGGER_MANIFEST_PATH.read_text())
+def build_lighting_manifest(
+    trigger_manifest: dict[str, Any] | None = None,
+    score_root: ET.Element | None = None,
+) -> dict[str, Any]:
+    """Build the light-show manifest, reading the trigger manifest and score unless given."""
+
+    if trigger_manifest is None:
+        trigger_manifest = json.loads(TRIGGER_MANIFEST_PATH.read_text())
     events = trigger_manifest["events"]
     source_duration_ms = float(trigger_manifest["sourceDurationMs"])
     event_plans = _build_event_plans()
+    final_onsets: dict[str, list[dict[str, float | bool]]] | None = None
 
     result_events: list[dict[str, Any]] = []
     for index, event in enumerate(events):
@@ -520,7 +550,9 @@ def _build_lighting_manifest() -> dict[str, Any]:
             available_window_ms = source_duration_ms - onset_ms
 
         duration_ms = _resolve_event_duration_ms(available_window_ms, plan)
-        parts_source = _build_final_parts(duration_ms) if event_id == 12 else plan.parts
+        if event_id == 12 and final_onsets is None:
+            final_onsets = _collect_final_voice_onsets(score_root)
+        parts_source = _build_final_parts(duration_ms, final_onsets) if event_id == 12 else plan.parts
         assert parts_source is not None
 
         parts_payload: dict[str, Any] = {}
@@ -561,46 +593,123 @@ def _build_lighting_manifest() -> dict[str, Any]:
     }
 
 
-def _inject_lighting_into_recipes(light_manifest: dict[str, Any]) -> None:
+def apply_lighting_to_recipe(bundle: dict[str, Any], light_manifest: dict[str, Any]) -> dict[str, Any]:
+    """Attach the light-show cues to every event of a recipe bundle, in place."""
+
     events_by_id = {event["id"]: event for event in light_manifest["events"]}
-    generated = light_manifest["generated"]
-
-    for path in RECIPE_COPY_PATHS:
-        bundle = json.loads(path.read_text())
-        bundle["lightingSourceMusicXml"] = light_manifest["sourceMusicXml"]
-        bundle["lightingManifest"] = str(LIGHT_SHOW_MANIFEST_PATH.relative_to(REPO_ROOT))
-        bundle["lightingGenerated"] = generated
-        bundle["lightingDesignNote"] = (
-            "Tour-cut six-staff torch choreography preserving full trigger identities 1, 2, 3, 4, 5, 11, 12. "
-            "Trigger Point 5 now carries its own extended bridge light show: an eight-beat global ramp, the piece's "
-            "most complex lighting field across beats 9-24, and a hard blackout on beat 25. Trigger Point 11 begins "
-            "with the piece's only fully unified slow glow before the staves separate again; Trigger Point 12 is "
-            "strictly locked to light-chorus note onsets."
-        )
+    bundle["lightingSourceMusicXml"] = light_manifest["sourceMusicXml"]
+    bundle["lightingManifest"] = str(LIGHT_SHOW_MANIFEST_PATH.relative_to(REPO_ROOT))
+    bundle["lightingGenerated"] = light_manifest["generated"]
+    bundle["lightingDesignNote"] = (
+        "Tour-cut six-staff torch choreography preserving full trigger identities 1, 2, 3, 4, 5, 11, 12. "
+        "Trigger Point 5 now carries its own extended bridge light show: an eight-beat global ramp, the piece's "
+        "most complex lighting field across beats 9-24, and a hard blackout on beat 25. Trigger Point 11 begins "
+        "with the piece's only fully unified slow glow before the staves separate again; Trigger Point 12 is "
+        "strictly locked to light-chorus note onsets."
+    )
+
+    for event in bundle.get("events", []):
+        event_id = int(event["id"])
+        lighting = events_by_id[event_id]
+        event["lighting"] = {
+            "summary": lighting["summary"],
+            "scoreDynamics": lighting["scoreDynamics"],
+            "designTags": lighting["designTags"],
+            "durationMs": lighting["durationMs"],
+            "parts": deepcopy(lighting["parts"]),
+        }
+    return bundle
 
-        for event in bundle.get("events", []):
-            event_id = int(event["id"])
-            lighting = events_by_id[event_id]
-            event["lighting"] = {
-                "summary": lighting["summary"],
-                "scoreDynamics": lighting["scoreDynamics"],
-                "designTags": lighting["designTags"],
-                "durationMs": lighting["durationMs"],
-                "parts": deepcopy(lighting["parts"]),
-            }
 
-        path.write_text(json.dumps(bundle, indent=2) + "\n")
+def _inject_lighting_into_recipes(light_manifest: dict[str, Any]) -> None:
+    bundle = apply_lighting_to_recipe(recipe_bundle.load_recipe_bundle(), light_manifest)
+    recipe_bundle.write_recipe_bundle(bundle)
 
 
-def main() -> None:
-    light_manifest = _build_lighting_manifest()
+def write_lighting_manifest(light_manifest: dict[str, Any]) -> None:
     LIGHT_SHOW_MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
     LIGHT_SHOW_MANIFEST_PATH.write_text(json.dumps(light_manifest, indent=2) + "\n")
+
+
+def validate_keyframes(keyframes: list[dict[str, Any]], min_switch_ms: float = MIN_TORCH_SWITCH_MS) -> list[str]:
+    """Describe keyframes that go back in time or follow the previous one within `min_switch_ms`."""
+
+    if len(keyframes) < 2:
+        return []
+    at_ms = np.array([frame["atMs"] for frame in keyframes], dtype=np.float64)
+    gaps = np.diff(at_ms)
+    problems = [
+        f"keyframe {index + 1} at {at_ms[index + 1]:.3f} ms comes before {at_ms[index]:.3f} ms"
+        for index in np.flatnonzero(gaps < 0).tolist()
+    ]
+    problems.extend(
+        f"keyframe {index + 1} at {at_ms[index + 1]:.3f} ms is {gaps[index]:.3f} ms after the previous one"
+        for index in np.flatnonzero((gaps >= 0) & (gaps < min_switch_ms)).tolist()
+    )
+    return problems
+
+
+def validate_lighting_manifest(
+    light_manifest: dict[str, Any],
+    min_switch_ms: float = MIN_TORCH_SWITCH_MS,
+) -> list[str]:
+    problems: list[str] = []
+    for event in light_manifest["events"]:
+        for part_key, part in event["parts"].items():
+            problems.extend(
+                f"event {event['id']} {part_key}: {problem}"
+                for problem in validate_keyframes(part["keyframes"], min_switch_ms)
+            )
+    return problems
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--min-switch-ms",
+        type=float,
+        default=MIN_TORCH_SWITCH_MS,
+        help="Reject keyframes closer together than this many milliseconds.",
+    )
+    parser.add_argument(
+        "--duty-window-s",
+        type=float,
+        default=torch_duty_cycle.DEFAULT_WINDOW_MS / 1000.0,
+        help="Sliding window for the torch thermal budget check.",
+    )
+    parser.add_argument(
+        "--duty-budget",
+        type=float,
+        default=torch_duty_cycle.DEFAULT_WINDOW_BUDGET,
+        help="Reject parts whose mean torch level over any window exceeds this (0-1).",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    light_manifest = build_lighting_manifest()
+    problems = validate_lighting_manifest(light_manifest, args.min_switch_ms)
+    duty_report = torch_duty_cycle.analyze_light_show(light_manifest, args.duty_window_s * 1000.0, args.duty_budget)
+    problems.extend(torch_duty_cycle.budget_problems(duty_report))
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems:
+        return 1
+
+    write_lighting_manifest(light_manifest)
     _inject_lighting_into_recipes(light_manifest)
 
     print(f"Light-show manifest: {LIGHT_SHOW_MANIFEST_PATH.relative_to(REPO_ROOT)}")
     print(f"Recipe copies updated: {len(RECIPE_COPY_PATHS)}")
+    busiest_key, busiest = max(duty_report["parts"].items(), key=lambda item: item[1]["peakWindow"]["meanLevel"])
+    print(
+        f"Torch load: peak {args.duty_window_s:g} s mean level {busiest['peakWindow']['meanLevel']:.3f} "
+        f"({busiest_key}, events {', '.join(map(str, busiest['peakWindow']['eventIds']))}; "
+        f"budget {args.duty_budget:.2f})"
+    )
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
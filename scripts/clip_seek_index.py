@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Answer "what is sounding at time t, and how far in" for rehearsal restarts.
+
+To restart from a measure, the conductor needs every primer tone and electronics
+clip that is already playing there, with the offset to resume each one from. The
+index is built from the timeline's `clip_rows`. It cuts the show at every clip onset
+and end, and stores the active clips for each elementary segment in between:
+
+- `boundaries_seconds` is sorted. `active[i]` lists the clips in
+  `[boundaries_seconds[i], boundaries_seconds[i + 1])`;
+- `clips` keeps the fields a player needs, in `event_timeline.json` clip order;
+- `measures` maps every measure token to its start time, so "measure N" is a lookup.
+
+A query is one bisect followed by reading the k active clips, O(log n + k). Clips
+are half-open, so a clip that ends at t is no longer active at t. The runtime
+reads `event_timeline_seek_index.json`; `ClipSeekIndex` is the reference reader.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any
+
+
+SEEK_INDEX_FILENAME = "event_timeline_seek_index.json"
+DEFAULT_INDEX_PATH = Path(__file__).resolve().parents[1] / "docs" / "protools-housekeeping" / SEEK_INDEX_FILENAME
+SEEK_INDEX_VERSION = 1
+CLIP_FIELDS = (
+    "event_id",
+    "measure_token",
+    "clip_type",
+    "assignment_key",
+    "slots",
+    "sample",
+    "channel_mode",
+    "onset_seconds",
+    "end_seconds",
+)
+
+
+def build_seek_index(
+    clip_rows: list[dict[str, Any]],
+    tempo_map: list[dict[str, Any]],
+    generated_utc: str | None = None,
+) -> dict[str, Any]:
+    """Sweep the clip onsets and ends into elementary segments with their active clips."""
+
+    starting: dict[float, list[int]] = {}
+    ending: dict[float, list[int]] = {}
+    for index, row in enumerate(clip_rows):
+        if row["end_seconds"] > row["onset_seconds"]:
+            starting.setdefault(row["onset_seconds"], []).append(index)
+            ending.setdefault(row["end_seconds"], []).append(index)
+    boundaries = sorted(starting.keys() | ending.keys())
+
+    active: list[list[int]] = []
+    sounding: set[int] = set()
+    for boundary in boundaries[:-1]:
+        sounding.difference_update(ending.get(boundary, ()))
+        sounding.update(starting.get(boundary, ()))
+        active.append(sorted(sounding))
+
+    return {
+        "version": SEEK_INDEX_VERSION,
+        "generated_utc": generated_utc,
+        "clips": [{field: row[field] for field in CLIP_FIELDS} for row in clip_rows],
+        "boundaries_seconds": boundaries,
+        "active": active,
+        "measures": {entry["measureToken"]: entry["start_seconds"] for entry in tempo_map},
+    }
+
+
+def write_seek_index(index: dict[str, Any], output_dir: Path) -> Path:
+    path = output_dir / SEEK_INDEX_FILENAME
+    path.write_text(json.dumps(index, separators=(",", ":")) + "\n")
+    return path
+
+
+class ClipSeekIndex:
+    """Reference reader for the exported seek index."""
+
+    def __init__(self, index: dict[str, Any]) -> None:
+        if index.get("version") != SEEK_INDEX_VERSION:
+            raise ValueError(f"Unsupported seek index version {index.get('version')}")
+        self.clips: list[dict[str, Any]] = index["clips"]
+        self.boundaries: list[float] = index["boundaries_seconds"]
+        self.active: list[list[int]] = index["active"]
+        self.measures: dict[str, float] = index["measures"]
+
+    @classmethod
+    def load(cls, path: Path) -> "ClipSeekIndex":
+        return cls(json.loads(path.read_text()))
+
+    def active_at(self, seconds: float) -> list[tuple[dict[str, Any], float]]:
+        """Return `(clip, offset_seconds)` for every clip sounding at `seconds`."""
+
+        segment = bisect_right(self.boundaries, seconds) - 1
+        if segment < 0 or segment >= len(self.active):
+            return []
+        return [(self.clips[index], seconds - self.clips[index]["onset_seconds"]) for index in self.active[segment]]
+
+    def measure_start_seconds(self, measure_token: str) -> float:
+        try:
+            return self.measures[measure_token]
+        except KeyError:
+            raise ValueError(f"Measure {measure_token!r} is not in the score") from None
+
+    def active_at_measure(self, measure_token: str) -> list[tuple[dict[str, Any], float]]:
+        return self.active_at(self.measure_start_seconds(measure_token))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="List the clips to resume when rehearsal restarts mid-piece.")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--measure", help="Measure token to restart from, for example 36 or 38.2.")
+    where.add_argument("--seconds", type=float, help="Performance time to restart from.")
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=DEFAULT_INDEX_PATH,
+        help="Seek index written by build_protools_event_timeline.py.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    index = ClipSeekIndex.load(args.index)
+    try:
+        seconds = args.seconds if args.measure is None else index.measure_start_seconds(args.measure)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+
+    active = index.active_at(seconds)
+    print(f"Restart at {seconds:.3f} s: {len(active)} clip(s) sounding")
+    for clip, offset in active:
+        print(
+            f"  event {clip['event_id']:>2} {clip['clip_type']:<16} {clip['assignment_key']:<12} "
+            f"+{offset:8.3f} s  {clip['sample']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
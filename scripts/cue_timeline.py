@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""Stream the show's cues in performance order without building the timeline.
+
+`build_protools_event_timeline` writes the whole timeline out as reports. Playback
+code wants one cue at a time instead: the conductor-side sender, the concert
+simulator, an export writer. Every assignment in the recipe bundle becomes a track,
+an already-sorted run of cues:
+
+- a primer tone for each colour;
+- an electronics clip for each family, and one for each per-part override;
+- the lighting keyframes for each part.
+
+`CueTimeline.cues()` merges the tracks lazily with `heapq.merge`. The tracks are
+indexed by their first cue time and a running maximum of their last cue time, so
+`seek(ms)` opens only the tracks that are still live at that point. A light track that
+is between keyframes at the seek point first yields a `resumed` keyframe. It carries
+the level the client would be showing there. A clip that is already sounding yields a
+`resumed` cue at `ms` with `offset_ms` into the clip, matching `ClipSeekIndex`. Primer
+tones only resume when the timeline knows their length (`--primer-durations`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import sys
+from bisect import bisect_left
+from dataclasses import asdict, dataclass
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import clip_seek_index
+from build_light_intensity_tracks import level_at
+from build_protools_event_timeline import (
+    DEFAULT_OUTPUT_DIR,
+    DEFAULT_RECIPE_JSON,
+    DEFAULT_SCORE_XML,
+    ROOT,
+    build_asset_inventory,
+    event_measure_token,
+    event_onset_seconds,
+    sample_lookup_key,
+)
+from score_measure_utils import build_measure_token_map
+
+
+DEFAULT_CUE_EXPORT = DEFAULT_OUTPUT_DIR / "event_cues.jsonl"
+CUE_KINDS = ("primer", "electronics", "electronics_part", "light")
+KIND_RANK = {kind: rank for rank, kind in enumerate(CUE_KINDS)}
+
+
+@dataclass(frozen=True)
+class Cue:
+    at_ms: float
+    kind: str
+    event_id: int
+    target: str
+    index: int = 0
+    sample: str | None = None
+    duration_ms: float | None = None
+    level: float | None = None
+    interpolation: str | None = None
+    resumed: bool = False
+    offset_ms: float | None = None
+
+
+@dataclass(frozen=True)
+class _Track:
+    start_ms: float
+    end_ms: float
+    kind: str
+    event_id: int
+    target: str
+    onset_ms: float
+    assignment: dict[str, Any]
+    duration_ms: float | None = None
+
+
+def cue_sort_key(cue: Cue) -> tuple[float, int, int, str, int]:
+    return (cue.at_ms, KIND_RANK[cue.kind], cue.event_id, cue.target, cue.index)
+
+
+def cue_record(cue: Cue) -> dict[str, Any]:
+    return {key: value for key, value in asdict(cue).items() if value is not None and value is not False}
+
+
+def _keyframe_cue(track: _Track, index: int, keyframe: dict[str, Any]) -> Cue:
+    return Cue(
+        at_ms=round(track.onset_ms + keyframe["atMs"], 3),
+        kind="light",
+        event_id=track.event_id,
+        target=track.target,
+        index=index,
+        level=keyframe["level"],
+        interpolation=keyframe.get("interpolation", "linear"),
+    )
+
+
+def _track_cues(track: _Track, from_ms: float | None = None) -> Iterator[Cue]:
+    if track.kind != "light":
+        if from_ms is None or track.start_ms >= from_ms:
+            yield Cue(
+                at_ms=round(track.start_ms, 3),
+                kind=track.kind,
+                event_id=track.event_id,
+                target=track.target,
+                sample=track.assignment.get("sample", ""),
+                duration_ms=track.duration_ms,
+            )
+        elif track.end_ms > from_ms:
+            yield Cue(
+                at_ms=round(float(from_ms), 3),
+                kind=track.kind,
+                event_id=track.event_id,
+                target=track.target,
+                sample=track.assignment.get("sample", ""),
+                duration_ms=track.duration_ms,
+                resumed=True,
+                offset_ms=round(from_ms - track.start_ms, 3),
+            )
+        return
+
+    keyframes = track.assignment["keyframes"]
+    first = 0
+    if from_ms is not None:
+        elapsed_ms = from_ms - track.onset_ms
+        first = bisect_left(keyframes, elapsed_ms, key=lambda keyframe: keyframe["atMs"])
+        if 0 < first < len(keyframes) and keyframes[first]["atMs"] > elapsed_ms:
+            previous = keyframes[first - 1]
+            yield Cue(
+                at_ms=round(float(from_ms), 3),
+                kind="light",
+                event_id=track.event_id,
+                target=track.target,
+                index=first - 1,
+                level=round(level_at(keyframes, elapsed_ms), 3),
+                interpolation=previous.get("interpolation", "linear"),
+                resumed=True,
+            )
+    for index in range(first, len(keyframes)):
+        yield _keyframe_cue(track, index, keyframes[index])
+
+
+def _clip_duration_ms(
+    sample: str,
+    asset_inventory: dict[str, dict[str, dict[str, Any]]] | None,
+) -> float | None:
+    if asset_inventory is None:
+        return None
+    sample_key = sample_lookup_key(sample)
+    seconds = (
+        asset_inventory["macos"].get(sample_key, {}).get("duration_seconds")
+        or asset_inventory["flutter"].get(sample_key, {}).get("duration_seconds")
+    )
+    return round(seconds * 1000.0, 3) if seconds else None
+
+
+class CueTimeline:
+    """Lazily merged, seekable cue stream over one recipe bundle."""
+
+    def __init__(
+        self,
+        recipe_bundle: dict[str, Any],
+        measure_lookup: dict[str, dict[str, Any]],
+        asset_inventory: dict[str, dict[str, dict[str, Any]]] | None = None,
+    ) -> None:
+        tracks: list[_Track] = []
+        for event in recipe_bundle["events"]:
+            onset_ms = event_onset_seconds(event, measure_lookup[event_measure_token(event)]) * 1000.0
+            event_id = event["id"]
+            for color, assignment in event.get("primer", {}).items():
+                duration_ms = _clip_duration_ms(assignment["sample"], asset_inventory)
+                end_ms = onset_ms + (duration_ms or 0.0)
+                tracks.append(_Track(onset_ms, end_ms, "primer", event_id, color, onset_ms, assignment, duration_ms))
+            for kind, assignments in (
+                ("electronics", event.get("electronics", {})),
+                ("electronics_part", event.get("electronicsByPart", {})),
+            ):
+                for target, assignment in assignments.items():
+                    duration_ms = float(assignment.get("durationMs", 0.0))
+                    end_ms = onset_ms + duration_ms
+                    tracks.append(_Track(onset_ms, end_ms, kind, event_id, target, onset_ms, assignment, duration_ms))
+            for part_key, part in event.get("lighting", {}).get("parts", {}).items():
+                keyframes = part.get("keyframes", [])
+                if keyframes:
+                    tracks.append(
+                        _Track(
+                            onset_ms + keyframes[0]["atMs"],
+                            onset_ms + keyframes[-1]["atMs"],
+                            "light",
+                            event_id,
+                            part_key,
+                            onset_ms,
+                            part,
+                        )
+                    )
+
+        tracks.sort(key=lambda track: (track.start_ms, KIND_RANK[track.kind], track.event_id, track.target))
+        self._tracks = tracks
+        self._starts = [track.start_ms for track in tracks]
+        self._latest_ends = list(accumulate((track.end_ms for track in tracks), max))
+
+    @classmethod
+    def from_files(
+        cls,
+        recipe_json: Path = DEFAULT_RECIPE_JSON,
+        score_xml: Path = DEFAULT_SCORE_XML,
+        *,
+        with_primer_durations: bool = False,
+    ) -> "CueTimeline":
+        recipe_bundle = json.loads(recipe_json.read_text())
+        _, measure_lookup, _ = build_measure_token_map(score_xml)
+        asset_inventory = build_asset_inventory() if with_primer_durations else None
+        return cls(recipe_bundle, measure_lookup, asset_inventory)
+
+    @property
+    def track_count(self) -> int:
+        return len(self._tracks)
+
+    def cues(self) -> Iterator[Cue]:
+        return heapq.merge(*(_track_cues(track) for track in self._tracks), key=cue_sort_key)
+
+    def __iter__(self) -> Iterator[Cue]:
+        return self.cues()
+
+    def seek(self, ms: float) -> Iterator[Cue]:
+        """Cues from `ms` on, with clips and light ramps already under way resumed at `ms`."""
+
+        live = bisect_left(self._latest_ends, ms)
+        upcoming = bisect_left(self._starts, ms)
+        tracks = [track for track in self._tracks[live:upcoming] if track.end_ms >= ms]
+        tracks.extend(self._tracks[upcoming:])
+        return heapq.merge(*(_track_cues(track, ms) for track in tracks), key=cue_sort_key)
+
+
+def sounding_at(timeline: CueTimeline, ms: float) -> dict[tuple[str, int, str, str], float]:
+    """Map every clip cue that `seek(ms)` starts at `ms` to its offset into the clip."""
+
+    sounding = {}
+    for cue in timeline.seek(ms):
+        if cue.at_ms > round(ms, 3):
+            break
+        if cue.kind != "light":
+            sounding[(cue.kind, cue.event_id, cue.target, cue.sample or "")] = cue.offset_ms or 0.0
+    return sounding
+
+
+def seek_problems(
+    timeline: CueTimeline,
+    index: clip_seek_index.ClipSeekIndex,
+    kinds: Iterable[str] = ("electronics", "electronics_part"),
+    tolerance_ms: float = 1.0,
+) -> list[str]:
+    """Seek into the middle of every indexed clip and compare what resumes with the seek index."""
+
+    kinds = set(kinds)
+    problems = []
+    for clip in index.clips:
+        if clip["clip_type"] not in kinds or clip["end_seconds"] <= clip["onset_seconds"]:
+            continue
+        seconds = (clip["onset_seconds"] + clip["end_seconds"]) / 2.0
+        expected = {
+            (active["clip_type"], active["event_id"], active["assignment_key"], active["sample"]): offset * 1000.0
+            for active, offset in index.active_at(seconds)
+            if active["clip_type"] in kinds
+        }
+        actual = sounding_at(timeline, seconds * 1000.0)
+        if expected.keys() != actual.keys():
+            missing = sorted(expected.keys() - actual.keys())
+            extra = sorted(actual.keys() - expected.keys())
+            problems.append(f"seek({seconds * 1000.0:.0f}) missing {missing}, unexpected {extra}")
+            continue
+        for key, offset_ms in expected.items():
+            if abs(actual[key] - offset_ms) > tolerance_ms:
+                problems.append(f"seek({seconds * 1000.0:.0f}) resumes {key} at {actual[key]} ms, index says {offset_ms:.3f} ms")
+    return problems
+
+
+def write_cue_stream(cues: Iterable[Cue], path: Path) -> int:
+    """Write one JSON object per line as the cues arrive; return how many were written."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with path.open("w") as handle:
+        for cue in cues:
+            handle.write(json.dumps(cue_record(cue)) + "\n")
+            count += 1
+    return count
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export the time-ordered cue stream as JSON Lines.")
+    parser.add_argument("--recipe-json", type=Path, default=DEFAULT_RECIPE_JSON, help="Path to the event recipe JSON bundle.")
+    parser.add_argument("--score-xml", type=Path, default=DEFAULT_SCORE_XML, help="Path to the source MusicXML file.")
+    parser.add_argument("--seek-ms", type=float, default=None, help="Start the stream at this show time.")
+    parser.add_argument(
+        "--primer-durations",
+        action="store_true",
+        help="Probe the primer assets so primer cues carry their clip length.",
+    )
+    parser.add_argument("--output", type=Path, default=DEFAULT_CUE_EXPORT, help="JSON Lines file to write.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Seek into the middle of every clip in the seek index and verify that the clip resumes there.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    timeline = CueTimeline.from_files(
+        args.recipe_json.resolve(),
+        args.score_xml.resolve(),
+        with_primer_durations=args.primer_durations,
+    )
+    if args.check:
+        kinds = ("primer", "electronics", "electronics_part") if args.primer_durations else ("electronics", "electronics_part")
+        problems = seek_problems(timeline, clip_seek_index.ClipSeekIndex.load(clip_seek_index.DEFAULT_INDEX_PATH), kinds)
+        for problem in problems:
+            print(problem, file=sys.stderr)
+        return 1 if problems else 0
+
+    cues = timeline.cues() if args.seek_ms is None else timeline.seek(args.seek_ms)
+    output = args.output.resolve()
+    count = write_cue_stream(cues, output)
+    shown = output.relative_to(ROOT) if output.is_relative_to(ROOT) else output
+    print(f"Wrote {count} cues from {timeline.track_count} tracks to {shown}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
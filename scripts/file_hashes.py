@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Shared SHA-256 file hashing with a persistent on-disk digest cache.
+
+Digests are stored in `.cache/sha256-digests.json`, keyed by resolved path and
+validated against the file's size and `st_mtime_ns`. Cache misses are hashed in
+a thread pool from memory-mapped files; hashlib releases the GIL while it
+digests large buffers, so the pool runs in parallel.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+from json_file_cache import JsonFileCache
+
+
+ROOT = Path(__file__).resolve().parents[1]
+HASH_CACHE_PATH = ROOT / ".cache" / "sha256-digests.json"
+HASH_CACHE_VERSION = 1
+DEFAULT_WORKERS = os.cpu_count() or 1
+HASH_CHUNK_BYTES = 8 * 1024 * 1024
+PREHASH_BYTES = 64 * 1024
+
+_CACHE = JsonFileCache(HASH_CACHE_PATH, HASH_CACHE_VERSION, "sha256")
+
+
+def sha256_file(path: Path) -> str:
+    """Hash one file without consulting the cache."""
+
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, HASH_CHUNK_BYTES):
+                    digest.update(view[offset : offset + HASH_CHUNK_BYTES])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+def prehash_file(path: Path) -> str:
+    """Cheap fingerprint of the first and last 64 KB, for ruling out duplicates."""
+
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        digest.update(handle.read(PREHASH_BYTES))
+        if size > PREHASH_BYTES:
+            handle.seek(max(PREHASH_BYTES, size - PREHASH_BYTES))
+            digest.update(handle.read(PREHASH_BYTES))
+    return digest.hexdigest()
+
+
+def sha256_many(paths: Iterable[Path], workers: int = DEFAULT_WORKERS) -> dict[Path, str]:
+    """Return the SHA-256 of every path, hashing only files the cache has not seen."""
+
+    hits, misses = _CACHE.lookup_many(paths)
+    results = {path: str(digest) for path, digest in hits.items()}
+    if not misses:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(misses)))) as executor:
+        hashed = dict(zip(misses, executor.map(sha256_file, misses)))
+
+    _CACHE.store_many(hashed, misses)
+    results.update(hashed)
+    return results
+
+
+def cached_sha256(path: Path) -> str:
+    return sha256_many([path])[path]
+
+
+def find_identical_files(
+    paths: Iterable[Path],
+    workers: int = DEFAULT_WORKERS,
+    known_digests: dict[Path, str] | None = None,
+) -> dict[str, list[Path]]:
+    """Group byte-identical files by SHA-256.
+
+    Files are bucketed by size, then by a prefix/suffix pre-hash, and only files that
+    still share a bucket get a full hash. `known_digests` supplies full hashes the
+    caller already trusts. Groups with a single member are dropped.
+    """
+
+    by_size: dict[int, list[Path]] = defaultdict(list)
+    for path in dict.fromkeys(paths):
+        by_size[path.stat().st_size].append(path)
+    size_candidates = [group for group in by_size.values() if len(group) > 1]
+
+    prehash_paths = [path for group in size_candidates for path in group]
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(prehash_paths) or 1))) as executor:
+        prehashes = dict(zip(prehash_paths, executor.map(prehash_file, prehash_paths)))
+
+    candidates: list[Path] = []
+    for group in size_candidates:
+        by_prehash: dict[str, list[Path]] = defaultdict(list)
+        for path in group:
+            by_prehash[prehashes[path]].append(path)
+        candidates.extend(path for bucket in by_prehash.values() if len(bucket) > 1 for path in bucket)
+
+    known_digests = known_digests or {}
+    digests = {path: known_digests[path] for path in candidates if path in known_digests}
+    digests.update(sha256_many((path for path in candidates if path not in digests), workers))
+    by_digest: dict[str, list[Path]] = defaultdict(list)
+    for path in candidates:
+        by_digest[digests[path]].append(path)
+    return {digest: group for digest, group in by_digest.items() if len(group) > 1}
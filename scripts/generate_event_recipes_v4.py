@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import argparse
 import csv
 import json
 import re
+import sys
 from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime, timezone
@@ -14,13 +16,29 @@ import xml.etree.ElementTree as ET
 
 try:
     from openpyxl import Workbook
-    from openpyxl.styles import Font
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, NamedStyle
 except ImportError:  # pragma: no cover - optional export
     Workbook = None
+    WriteOnlyCell = None
     Font = None
+    NamedStyle = None
 
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from light_chorus_app.pitch_tables import (
+    ALTER_TO_ACCIDENTAL,
+    LABEL_TO_MIDI,
+    SPELLING_TO_PITCH,
+    STEP_TO_SEMITONE,
+    primer_sample_path,
+)
+
+import recipe_bundle
+
 REFERENCE_BUNDLE_PATH = ROOT / "FlashlightsInTheDark_MacOS/Resources/event_recipes.json"
 NEW_SCORE_PATH = (
     ROOT
@@ -31,9 +49,7 @@ OUTPUT_DIR = ROOT / "Flashlights-ITD_EventRecipes_4_2026_0309"
 OFFICIAL_TRIGGER_POSITIONS_PATH = OUTPUT_DIR / "official_trigger_positions.csv"
 OUTPUT_CSV_PATH = OUTPUT_DIR / "Flashlights-ITD_EventRecipes_4.csv"
 OUTPUT_XLSX_PATH = OUTPUT_DIR / "Flashlights-ITD_EventRecipes_4.xlsx"
-OUTPUT_JSON_PATH = OUTPUT_DIR / "event_recipes.json"
-MAC_JSON_PATH = ROOT / "FlashlightsInTheDark_MacOS/Resources/event_recipes.json"
-CLIENT_JSON_PATH = ROOT / "flashlights_client/assets/event_recipes.json"
+RECIPE_COPY_PATHS = recipe_bundle.RECIPE_COPY_PATHS
 OFFICIAL_TRIGGER_POSITION_IMAGES = [
     ROOT / "docs/reference-images/official-trigger-score/Flashlights_OfficialEventPositions_pg1.jpeg",
     ROOT / "docs/reference-images/official-trigger-score/Flashlights_OfficialEventPositions_pg2.jpeg",
@@ -41,24 +57,6 @@ OFFICIAL_TRIGGER_POSITION_IMAGES = [
 
 POSITION_RE = re.compile(r"^(?P<beat>[\d+\/]+)-of-(?P<measure_beats>\d+)$")
 
-STEP_TO_SEMITONE = {
-    "C": 0,
-    "D": 2,
-    "E": 4,
-    "F": 5,
-    "G": 7,
-    "A": 9,
-    "B": 11,
-}
-
-ALTER_TO_ACCIDENTAL = {
-    -2: "bb",
-    -1: "b",
-    0: "",
-    1: "#",
-    2: "##",
-}
-
 PART_TO_COLORS = {
     "P4": ["green", "magenta", "orange"],
     "P5": ["blue", "red", "cyan"],
@@ -182,6 +180,9 @@ def parse_pitch(note: ET.Element) -> tuple[int, str]:
         raise ValueError("Incomplete pitch data")
     alter = int(pitch.findtext("alter", "0"))
     octave_number = int(octave)
+    spelled = SPELLING_TO_PITCH.get((step, alter, octave_number))
+    if spelled is not None:
+        return spelled
     midi = 12 * (octave_number + 1) + STEP_TO_SEMITONE[step] + alter
     accidental = ALTER_TO_ACCIDENTAL.get(alter, f"({alter})")
     return midi, f"{step}{accidental}{octave_number}"
@@ -275,24 +276,10 @@ def score_pitch_layers(
 
 
 def sample_name_for(note_label: str, *, is_long: bool) -> str:
-    note_match = re.match(r"^([A-G])(bb|##|b|#)?(\d+)$", note_label)
-    if note_match is None:
+    midi = LABEL_TO_MIDI.get(note_label)
+    if midi is None:
         raise ValueError(f"Unsupported note label: {note_label}")
-    step = note_match.group(1)
-    accidental = note_match.group(2) or ""
-    octave = int(note_match.group(3))
-    alter = {
-        "bb": -2,
-        "b": -1,
-        "": 0,
-        "#": 1,
-        "##": 2,
-    }[accidental]
-    midi = 12 * (octave + 1) + STEP_TO_SEMITONE[step] + alter
-    base_index = midi - 36
-    if is_long:
-        return f"primerTones/long{base_index + 50}.mp3"
-    return f"primerTones/short{base_index}.mp3"
+    return primer_sample_path(midi, is_long=is_long)
 
 
 def expand_family_layers(pitches: list[str]) -> list[str]:
@@ -475,26 +462,85 @@ def export_csv(rows: list[list[str]], path: Path) -> None:
         writer.writerows(rows)
 
 
-def export_xlsx(rows: list[list[str]], path: Path) -> None:
+XLSX_BOLD_ROWS = (6, 7, 8, 9, 10)
+XLSX_BOLD_STYLE_NAME = "Event Recipe Header"
+XLSX_SHEET_TITLE = "Event Recipes"
+XLSX_LABEL_COLUMNS = 2
+# XLSX sheets stop at column XFD (16,384); events past that continue on
+# "Event Recipes 2", ... with the two label columns repeated.
+XLSX_EVENTS_PER_SHEET = 16_384 - XLSX_LABEL_COLUMNS
+
+
+def _xlsx_sheet_rows(rows: list[list[str]]) -> list[tuple[str, list[list[str]]]]:
+    event_columns = max((len(row) - XLSX_LABEL_COLUMNS for row in rows), default=0)
+    sheets = []
+    for start in range(XLSX_LABEL_COLUMNS, XLSX_LABEL_COLUMNS + max(event_columns, 1), XLSX_EVENTS_PER_SHEET):
+        number = len(sheets) + 1
+        title = XLSX_SHEET_TITLE if number == 1 else f"{XLSX_SHEET_TITLE} {number}"
+        sheet_rows = [row[:XLSX_LABEL_COLUMNS] + row[start : start + XLSX_EVENTS_PER_SHEET] for row in rows]
+        sheets.append((title, sheet_rows))
+    return sheets
+
+
+def export_xlsx_write_only(rows: list[list[str]], path: Path) -> None:
+    workbook = Workbook(write_only=True)
+    workbook.add_named_style(NamedStyle(name=XLSX_BOLD_STYLE_NAME, font=Font(bold=True)))
+
+    for title, sheet_rows in _xlsx_sheet_rows(rows):
+        sheet = workbook.create_sheet(title)
+        sheet.freeze_panes = "C7"
+        for row_index, row in enumerate(sheet_rows, start=1):
+            if row_index not in XLSX_BOLD_ROWS:
+                sheet.append(row)
+                continue
+            cells = []
+            for value in row:
+                cell = WriteOnlyCell(sheet, value=value)
+                cell.style = XLSX_BOLD_STYLE_NAME
+                cells.append(cell)
+            sheet.append(cells)
+
+    workbook.save(path)
+
+
+def export_xlsx(rows: list[list[str]], path: Path, *, write_only: bool = False) -> None:
     if Workbook is None:
         return
+    if write_only:
+        export_xlsx_write_only(rows, path)
+        return
     workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Event Recipes"
 
-    for row_index, row in enumerate(rows, start=1):
-        for column_index, value in enumerate(row, start=1):
-            sheet.cell(row=row_index, column=column_index, value=value)
+    for sheet_index, (title, sheet_rows) in enumerate(_xlsx_sheet_rows(rows)):
+        if sheet_index == 0:
+            sheet = workbook.active
+            sheet.title = title
+        else:
+            sheet = workbook.create_sheet(title)
 
-    for row_index in (6, 7, 8, 9, 10):
-        for cell in sheet[row_index]:
-            cell.font = Font(bold=True)
+        for row_index, row in enumerate(sheet_rows, start=1):
+            for column_index, value in enumerate(row, start=1):
+                sheet.cell(row=row_index, column=column_index, value=value)
 
-    sheet.freeze_panes = "C7"
+        for row_index in XLSX_BOLD_ROWS:
+            for cell in sheet[row_index]:
+                cell.font = Font(bold=True)
+
+        sheet.freeze_panes = "C7"
     workbook.save(path)
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Regenerate the v4 event recipe bundle and spreadsheet exports."
+    )
+    parser.add_argument(
+        "--write-only-xlsx",
+        action="store_true",
+        help="Stream the XLSX export through openpyxl's write-only mode.",
+    )
+    args = parser.parse_args()
+
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     reference_lengths = load_reference_lengths(REFERENCE_BUNDLE_PATH)
@@ -514,11 +560,9 @@ def main() -> None:
     bundle = build_bundle(event_points=event_points, score_data=score_data)
     rows = build_spreadsheet_rows(bundle)
 
-    OUTPUT_JSON_PATH.write_text(json.dumps(bundle, indent=2) + "\n")
-    MAC_JSON_PATH.write_text(json.dumps(bundle, indent=2) + "\n")
-    CLIENT_JSON_PATH.write_text(json.dumps(bundle, indent=2) + "\n")
+    recipe_bundle.write_recipe_bundle(bundle)
     export_csv(rows, OUTPUT_CSV_PATH)
-    export_xlsx(rows, OUTPUT_XLSX_PATH)
+    export_xlsx(rows, OUTPUT_XLSX_PATH, write_only=args.write_only_xlsx)
 
 
 if __name__ == "__main__":
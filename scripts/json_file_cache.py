@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Persistent per-file JSON cache keyed by resolved path, size and `st_mtime_ns`.
+
+Shared by the ffprobe metadata and SHA-256 digest caches. Entries for files that
+no longer exist are pruned once, when the cache is first loaded.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+
+FileSignature = tuple[str, int, int]
+
+
+def file_signature(path: Path) -> FileSignature:
+    resolved = path.resolve()
+    stat = resolved.stat()
+    return str(resolved), stat.st_size, stat.st_mtime_ns
+
+
+class JsonFileCache:
+    """Thread-safe `{"version": N, "files": {path: {size, mtimeNs, <field>}}}` store."""
+
+    def __init__(self, path: Path, version: int, field: str) -> None:
+        self.path = path
+        self.version = version
+        self.field = field
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] | None = None
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        """Return the in-memory entries, reading them from disk on first use. Call with the lock held."""
+
+        if self._entries is None:
+            entries: dict[str, dict[str, Any]] = {}
+            if self.path.exists():
+                try:
+                    payload = json.loads(self.path.read_text())
+                except json.JSONDecodeError:
+                    payload = {}
+                if payload.get("version") == self.version:
+                    entries = {key: entry for key, entry in payload.get("files", {}).items() if Path(key).exists()}
+            self._entries = entries
+        return self._entries
+
+    def lookup_many(self, paths: Iterable[Path]) -> tuple[dict[Path, Any], dict[Path, FileSignature]]:
+        """Split paths into cached values and the signatures of the misses.
+
+        Signatures are taken before the caller computes the misses, so a file that
+        changes mid-computation is stored under its old signature and re-read next time.
+        """
+
+        signatures = {path: file_signature(path) for path in dict.fromkeys(paths)}
+        hits: dict[Path, Any] = {}
+        misses: dict[Path, FileSignature] = {}
+        with self._lock:
+            entries = self._load()
+            for path, signature in signatures.items():
+                key, size, mtime_ns = signature
+                entry = entries.get(key)
+                if entry is not None and entry.get("size") == size and entry.get("mtimeNs") == mtime_ns:
+                    hits[path] = entry[self.field]
+                else:
+                    misses[path] = signature
+        return hits, misses
+
+    def store_many(self, values: dict[Path, Any], signatures: dict[Path, FileSignature]) -> None:
+        """Record freshly computed values and rewrite the cache file atomically."""
+
+        if not values:
+            return
+        with self._lock:
+            entries = self._load()
+            for path, value in values.items():
+                key, size, mtime_ns = signatures[path]
+                entries[key] = {"size": size, "mtimeNs": mtime_ns, self.field: value}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.partial")
+            payload = {"version": self.version, "files": dict(sorted(entries.items()))}
+            temp_path.write_text(json.dumps(payload, indent=2) + "\n")
+            temp_path.replace(self.path)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Shared ffprobe metadata lookups with a persistent on-disk cache.
+
+Results are stored in `.cache/ffprobe-metadata.json`, keyed by resolved path and
+validated against the file's size and `st_mtime_ns`, so an unchanged file is
+never probed twice. Cache misses are probed in a thread pool.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable
+
+from json_file_cache import JsonFileCache
+
+
+ROOT = Path(__file__).resolve().parents[1]
+METADATA_CACHE_PATH = ROOT / ".cache" / "ffprobe-metadata.json"
+METADATA_CACHE_VERSION = 1
+DEFAULT_WORKERS = os.cpu_count() or 1
+FFPROBE_CMD = [
+    "ffprobe",
+    "-v",
+    "error",
+    "-show_entries",
+    "stream=codec_name,sample_rate,channels:format=duration,bit_rate",
+    "-of",
+    "json",
+]
+
+_CACHE = JsonFileCache(METADATA_CACHE_PATH, METADATA_CACHE_VERSION, "metadata")
+
+
+def parse_ffprobe_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    format_info = payload.get("format", {})
+    streams = payload.get("streams", [])
+    first_stream = streams[0] if streams else {}
+    metadata: dict[str, Any] = {}
+
+    duration = format_info.get("duration")
+    if duration is not None:
+        try:
+            metadata["duration_seconds"] = round(float(duration), 6)
+        except (TypeError, ValueError):
+            pass
+
+    bit_rate = format_info.get("bit_rate")
+    if bit_rate is not None:
+        try:
+            metadata["bit_rate"] = int(bit_rate)
+        except (TypeError, ValueError):
+            pass
+
+    codec_name = first_stream.get("codec_name")
+    if codec_name:
+        metadata["codec_name"] = codec_name
+
+    sample_rate = first_stream.get("sample_rate")
+    if sample_rate is not None:
+        try:
+            metadata["sample_rate"] = int(sample_rate)
+        except (TypeError, ValueError):
+            pass
+
+    channels = first_stream.get("channels")
+    if channels is not None:
+        try:
+            metadata["channels"] = int(channels)
+        except (TypeError, ValueError):
+            pass
+
+    return metadata
+
+
+def run_ffprobe(path: Path) -> dict[str, Any] | None:
+    """Probe one file. Returns None when ffprobe itself is unavailable."""
+
+    try:
+        result = subprocess.run(
+            FFPROBE_CMD + [str(path)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        return None
+    except subprocess.CalledProcessError:
+        return {}
+
+    try:
+        payload = json.loads(result.stdout)
+    except json.JSONDecodeError:
+        return {}
+    return parse_ffprobe_payload(payload)
+
+
+def probe_many(paths: Iterable[Path], workers: int = DEFAULT_WORKERS) -> dict[Path, dict[str, Any]]:
+    """Return ffprobe metadata for every path, probing only files the cache has not seen.
+
+    Files that cannot be probed map to `{}`, matching the old per-file helpers.
+    """
+
+    hits, misses = _CACHE.lookup_many(paths)
+    results = {path: dict(metadata) for path, metadata in hits.items()}
+    if not misses:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(misses)))) as executor:
+        probed = dict(zip(misses, executor.map(run_ffprobe, misses)))
+
+    # A missing ffprobe binary is not a property of the file, so it is not cached
+    _CACHE.store_many({path: metadata for path, metadata in probed.items() if metadata is not None}, misses)
+    results.update((path, dict(metadata or {})) for path, metadata in probed.items())
+    return results
+
+
+def probe(path: Path) -> dict[str, Any]:
+    return probe_many([path])[path]
+
+
+def duration_ms(path: Path) -> float:
+    duration_seconds = probe(path).get("duration_seconds")
+    if duration_seconds is None:
+        raise ValueError(f"ffprobe could not read a duration from {path}")
+    return round(duration_seconds * 1000.0, 3)
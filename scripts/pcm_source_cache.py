@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Decode-once PCM copies of the long MP3 sources used for clip rendering.
+
+Every source is decoded a single time into raw little-endian float32 frames under
+`.cache/pcm-sources/`, keyed by the source's content hash. Clip renders then
+read the raw file with an input-side seek (or map it with NumPy) instead of
+making ffmpeg decode the whole MP3 again for every short window.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+
+ROOT = Path(__file__).resolve().parents[1]
+PCM_CACHE_ROOT = ROOT / ".cache" / "pcm-sources"
+PCM_FORMAT = "f32le"
+PCM_CODEC = "pcm_f32le"
+PCM_DTYPE = "<f4"
+BYTES_PER_SAMPLE = 4
+
+
+@dataclass(frozen=True)
+class PcmSource:
+    source_path: Path
+    pcm_path: Path
+    sample_rate: int
+    channels: int
+
+    @property
+    def frames(self) -> int:
+        return self.pcm_path.stat().st_size // (BYTES_PER_SAMPLE * self.channels)
+
+    @property
+    def duration_ms(self) -> float:
+        return round(self.frames * 1000.0 / self.sample_rate, 3)
+
+    def input_args(self, seek_ms: float = 0.0) -> list[str]:
+        args = ["-f", PCM_FORMAT, "-ar", str(self.sample_rate), "-ac", str(self.channels)]
+        if seek_ms > 0:
+            args += ["-ss", f"{seek_ms / 1000.0:.6f}"]
+        return args + ["-i", str(self.pcm_path)]
+
+    def memmap(self) -> Any:
+        import numpy as np
+
+        return np.memmap(self.pcm_path, dtype=PCM_DTYPE, mode="r", shape=(self.frames, self.channels))
+
+
+def probe_audio_format(path: Path) -> tuple[int, int]:
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "a:0",
+            "-show_entries",
+            "stream=sample_rate,channels",
+            "-of",
+            "json",
+            str(path),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    stream = json.loads(result.stdout)["streams"][0]
+    return int(stream["sample_rate"]), int(stream["channels"])
+
+
+def pcm_paths_for(source_hash: str) -> tuple[Path, Path]:
+    stem = PCM_CACHE_ROOT / source_hash
+    return stem.with_suffix(".f32"), stem.with_suffix(".json")
+
+
+def decode_pcm_source(source_path: Path, source_hash: str) -> PcmSource:
+    pcm_path, meta_path = pcm_paths_for(source_hash)
+    if pcm_path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+        return PcmSource(
+            source_path=source_path,
+            pcm_path=pcm_path,
+            sample_rate=int(meta["sampleRate"]),
+            channels=int(meta["channels"]),
+        )
+
+    sample_rate, channels = probe_audio_format(source_path)
+    PCM_CACHE_ROOT.mkdir(parents=True, exist_ok=True)
+    temp_path = pcm_path.with_name(f"{pcm_path.name}.partial")
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-y",
+            "-i",
+            str(source_path),
+            "-map",
+            "0:a:0",
+            "-f",
+            PCM_FORMAT,
+            "-codec:a",
+            PCM_CODEC,
+            str(temp_path),
+        ],
+        check=True,
+    )
+    temp_path.replace(pcm_path)
+    meta_path.write_text(
+        json.dumps(
+            {
+                "sourceFile": str(source_path),
+                "sourceSha256": source_hash,
+                "sampleRate": sample_rate,
+                "channels": channels,
+                "format": PCM_FORMAT,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+    return PcmSource(source_path=source_path, pcm_path=pcm_path, sample_rate=sample_rate, channels=channels)
+
+
+def prepare_pcm_sources(
+    source_paths: Iterable[Path],
+    source_hashes: dict[Path, str],
+    workers: int = 1,
+) -> dict[Path, PcmSource]:
+    """Decode every distinct source once, in parallel, reusing cached decodes."""
+
+    unique_paths = sorted(set(source_paths))
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(unique_paths) or 1))) as executor:
+        decoded = executor.map(lambda path: decode_pcm_source(path, source_hashes[path]), unique_paths)
+        return dict(zip(unique_paths, decoded))
+
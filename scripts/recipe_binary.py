@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Compact binary encoding of the event recipe bundle.
+
+`event_recipes.bin` sits next to the canonical `event_recipes.json` and holds the
+same document. No client reads it yet (it parses slower than the JSON and gzips to
+about the same size), so it is kept out of the macOS and Flutter bundles. The layout is a small tagged format with no dependencies:
+
+- the header is `FITDRCP` followed by one format-version byte;
+- a string table follows: a varint count, a varint byte length per string, then one
+  UTF-8 blob. Every dict key and string value is stored once and referenced by index;
+- then comes the root value, one tag byte followed by its payload.
+
+Lists of two or more dicts that share one key sequence, such as keyframes, are
+stored as record tables: the keys once, then one column per key. A column of floats
+is a flat little-endian float64 array, a column of ints is zigzag varints, and
+anything else is a column of tagged values. Decoding gives back a document equal
+to the JSON, keeping key order and the difference between `1` and `1.0`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import struct
+import sys
+from pathlib import Path
+from typing import Any
+
+import recipe_bundle
+
+
+MAGIC = b"FITDRCP"
+FORMAT_VERSION = 1
+RECIPE_BINARY_PATHS = [recipe_bundle.CANONICAL_RECIPE_PATH.with_suffix(".bin")]
+
+TAG_NULL = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STRING = 5
+TAG_LIST = 6
+TAG_DICT = 7
+TAG_RECORDS = 8
+
+COLUMN_VALUES = 0
+COLUMN_FLOAT = 1
+COLUMN_INT = 2
+
+_FLOAT = struct.Struct("<d")
+
+
+def _varint(value: int, out: bytearray) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def _is_int(value: Any) -> bool:
+    return type(value) is int
+
+
+def _record_keys(items: list[Any]) -> tuple[str, ...] | None:
+    if len(items) < 2 or not all(type(item) is dict for item in items):
+        return None
+    keys = tuple(items[0])
+    if not keys or any(tuple(item) != keys for item in items[1:]):
+        return None
+    return keys
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.strings: dict[str, int] = {}
+        self.body = bytearray()
+
+    def string(self, value: str) -> None:
+        index = self.strings.setdefault(value, len(self.strings))
+        _varint(index, self.body)
+
+    def value(self, value: Any) -> None:
+        out = self.body
+        if value is None:
+            out.append(TAG_NULL)
+        elif value is True or value is False:
+            out.append(TAG_TRUE if value else TAG_FALSE)
+        elif _is_int(value):
+            out.append(TAG_INT)
+            _varint(_zigzag(value), out)
+        elif type(value) is float:
+            out.append(TAG_FLOAT)
+            out += _FLOAT.pack(value)
+        elif type(value) is str:
+            out.append(TAG_STRING)
+            self.string(value)
+        elif type(value) is list:
+            keys = _record_keys(value)
+            if keys is not None:
+                self.records(value, keys)
+                return
+            out.append(TAG_LIST)
+            _varint(len(value), out)
+            for item in value:
+                self.value(item)
+        elif type(value) is dict:
+            out.append(TAG_DICT)
+            _varint(len(value), out)
+            for key, item in value.items():
+                self.string(key)
+                self.value(item)
+        else:
+            raise TypeError(f"Cannot encode {type(value).__name__} in a recipe bundle")
+
+    def records(self, rows: list[dict[str, Any]], keys: tuple[str, ...]) -> None:
+        out = self.body
+        out.append(TAG_RECORDS)
+        _varint(len(rows), out)
+        _varint(len(keys), out)
+        for key in keys:
+            self.string(key)
+        for key in keys:
+            column = [row[key] for row in rows]
+            if all(type(item) is float for item in column):
+                out.append(COLUMN_FLOAT)
+                out += struct.pack(f"<{len(column)}d", *column)
+            elif all(_is_int(item) for item in column):
+                out.append(COLUMN_INT)
+                for item in column:
+                    _varint(_zigzag(item), out)
+            else:
+                out.append(COLUMN_VALUES)
+                for item in column:
+                    self.value(item)
+
+
+def encode_recipe_bundle(bundle: dict[str, Any]) -> bytes:
+    encoder = _Encoder()
+    encoder.value(bundle)
+    encoded_strings = [value.encode("utf-8") for value in encoder.strings]
+    out = bytearray(MAGIC)
+    out.append(FORMAT_VERSION)
+    _varint(len(encoded_strings), out)
+    for encoded in encoded_strings:
+        _varint(len(encoded), out)
+    for encoded in encoded_strings:
+        out += encoded
+    out += encoder.body
+    return bytes(out)
+
+
+class _Decoder:
+    def __init__(self, data: bytes) -> None:
+        if data[: len(MAGIC)] != MAGIC:
+            raise ValueError("Not an event recipe binary bundle")
+        if data[len(MAGIC)] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported event recipe binary version {data[len(MAGIC)]}")
+        self.data = data
+        self.offset = len(MAGIC) + 1
+        lengths = [self.varint() for _ in range(self.varint())]
+        self.strings: list[str] = []
+        for length in lengths:
+            self.strings.append(data[self.offset : self.offset + length].decode("utf-8"))
+            self.offset += length
+
+    def varint(self) -> int:
+        data = self.data
+        result = 0
+        shift = 0
+        while True:
+            byte = data[self.offset]
+            self.offset += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def value(self) -> Any:
+        tag = self.data[self.offset]
+        self.offset += 1
+        if tag == TAG_STRING:
+            return self.strings[self.varint()]
+        if tag == TAG_FLOAT:
+            (value,) = _FLOAT.unpack_from(self.data, self.offset)
+            self.offset += _FLOAT.size
+            return value
+        if tag == TAG_INT:
+            return _unzigzag(self.varint())
+        if tag == TAG_DICT:
+            strings = self.strings
+            return {strings[self.varint()]: self.value() for _ in range(self.varint())}
+        if tag == TAG_RECORDS:
+            return self.records()
+        if tag == TAG_LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == TAG_NULL:
+            return None
+        if tag == TAG_TRUE:
+            return True
+        if tag == TAG_FALSE:
+            return False
+        raise ValueError(f"Unknown tag {tag} at byte {self.offset - 1}")
+
+    def records(self) -> list[dict[str, Any]]:
+        count = self.varint()
+        keys = [self.strings[self.varint()] for _ in range(self.varint())]
+        columns: list[Any] = []
+        for _ in keys:
+            kind = self.data[self.offset]
+            self.offset += 1
+            if kind == COLUMN_FLOAT:
+                columns.append(struct.unpack_from(f"<{count}d", self.data, self.offset))
+                self.offset += 8 * count
+            elif kind == COLUMN_INT:
+                columns.append([_unzigzag(self.varint()) for _ in range(count)])
+            else:
+                columns.append([self.value() for _ in range(count)])
+        return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def decode_recipe_bundle(data: bytes) -> dict[str, Any]:
+    return _Decoder(data).value()
+
+
+def verify_round_trip(bundle: dict[str, Any], data: bytes) -> str | None:
+    """Return why `data` does not reproduce `bundle` byte for byte as JSON, or None."""
+
+    try:
+        decoded = decode_recipe_bundle(data)
+    except (ValueError, IndexError, struct.error, UnicodeDecodeError) as exc:
+        return f"unreadable: {exc}"
+    if recipe_bundle.serialize_recipe_bundle(decoded) != recipe_bundle.serialize_recipe_bundle(bundle):
+        return "decoded bundle differs from event_recipes.json"
+    return None
+
+
+def write_recipe_binary(bundle: dict[str, Any]) -> list[Path]:
+    payload = encode_recipe_bundle(bundle)
+    problem = verify_round_trip(bundle, payload)
+    if problem is not None:
+        raise ValueError(f"Binary recipe bundle does not round-trip: {problem}")
+    return recipe_bundle.write_payload_copies(payload, RECIPE_BINARY_PATHS)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Encode event_recipes.json into event_recipes.bin next to the canonical recipe bundle."
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only verify that every existing event_recipes.bin decodes to the current JSON bundle.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    bundle = recipe_bundle.load_recipe_bundle()
+
+    if args.check:
+        failures = 0
+        for path in RECIPE_BINARY_PATHS:
+            problem = verify_round_trip(bundle, path.read_bytes()) if path.exists() else "missing"
+            if problem is not None:
+                failures += 1
+                print(f"{path.relative_to(recipe_bundle.ROOT)}: {problem}", file=sys.stderr)
+        return 1 if failures else 0
+
+    changed = write_recipe_binary(bundle)
+    size = RECIPE_BINARY_PATHS[0].stat().st_size
+    json_size = recipe_bundle.CANONICAL_RECIPE_PATH.stat().st_size
+    print(f"Binary recipe bundle: {size} bytes ({size / json_size:.1%} of the JSON)")
+    for path in changed:
+        print(f"Wrote {path.relative_to(recipe_bundle.ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
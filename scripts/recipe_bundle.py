@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""One place that reads and writes the shipped `event_recipes.json` copies.
+
+The conductor bundle, the macOS resources and the Flutter assets all carry the same
+recipe bundle. Builders compose it in memory: the base recipe with its electronics,
+then the lighting, then the profile metadata. They hand the result to
+`write_recipe_bundle`, which serializes it once and writes the canonical copy
+atomically. Each other copy is hardlinked to it (or copied across filesystems),
+but only when its bytes differ. The shipped copies are always written together with
+what is derived from them, `event_recipes.bin` and the `device-recipes/` slices, so
+no builder can leave those stale.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+
+ROOT = Path(__file__).resolve().parents[1]
+CANONICAL_RECIPE_PATH = ROOT / "Flashlights-ITD_EventRecipes_4_2026_0309" / "event_recipes.json"
+RECIPE_COPY_PATHS = [
+    CANONICAL_RECIPE_PATH,
+    ROOT / "FlashlightsInTheDark_MacOS" / "Resources" / "event_recipes.json",
+    ROOT / "flashlights_client" / "assets" / "event_recipes.json",
+]
+
+
+def serialize_recipe_bundle(bundle: dict[str, Any]) -> bytes:
+    return (json.dumps(bundle, indent=2) + "\n").encode("utf-8")
+
+
+def load_recipe_bundle(path: Path = CANONICAL_RECIPE_PATH) -> dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _has_bytes(path: Path, payload: bytes) -> bool:
+    try:
+        if path.stat().st_size != len(payload):
+            return False
+        return path.read_bytes() == payload
+    except FileNotFoundError:
+        return False
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.partial")
+    temp_path.write_bytes(payload)
+    temp_path.replace(path)
+
+
+def _install_copy(canonical: Path, target: Path) -> None:
+    """Hardlink the canonical file into place, falling back to a copy across filesystems."""
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_target = target.with_name(f".{target.name}.{os.getpid()}.partial")
+    temp_target.unlink(missing_ok=True)
+    try:
+        os.link(canonical, temp_target)
+    except OSError:
+        shutil.copy2(canonical, temp_target)
+    temp_target.replace(target)
+
+
+def write_payload_copies(payload: bytes, paths: list[Path]) -> list[Path]:
+    """Write `payload` to the first path and mirror it to the rest; return the paths that changed."""
+
+    canonical, *copies = paths
+    changed: list[Path] = []
+    if not _has_bytes(canonical, payload):
+        _write_atomic(canonical, payload)
+        changed.append(canonical)
+    for target in copies:
+        if not _has_bytes(target, payload):
+            _install_copy(canonical, target)
+            changed.append(target)
+    return changed
+
+
+def write_derived_files(bundle: dict[str, Any]) -> list[Path]:
+    """Regenerate `event_recipes.bin` and the device slices from `bundle`; return what changed."""
+
+    # Both modules import this one, so they are loaded on first use
+    import build_device_recipe_slices
+    import recipe_binary
+
+    changed = recipe_binary.write_recipe_binary(bundle)
+    changed += build_device_recipe_slices.write_device_slices(*build_device_recipe_slices.build_device_slices(bundle))
+    return changed
+
+
+def write_recipe_bundle(bundle: dict[str, Any], paths: list[Path] | None = None) -> list[Path]:
+    """Write `bundle` to every recipe copy; return the files whose bytes changed.
+
+    The first path is the canonical copy. It is the only one serialized and written.
+    Writing the shipped copies (no `paths`) also refreshes the derived files.
+    """
+
+    if paths is not None:
+        return write_payload_copies(serialize_recipe_bundle(bundle), paths)
+    changed = write_payload_copies(serialize_recipe_bundle(bundle), RECIPE_COPY_PATHS)
+    return changed + write_derived_files(bundle)
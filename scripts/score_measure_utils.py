@@ -45,8 +45,10 @@ def collect_measure_words(measure: ET.Element) -> list[str]:
 
 def build_measure_token_map(
     score_xml: Path,
+    root: ET.Element | None = None,
 ) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]], dict[int, dict[str, Any]]]:
-    root = ET.parse(score_xml).getroot()
+    if root is None:
+        root = ET.parse(score_xml).getroot()
     first_part = root.find(".//part")
     if first_part is None:
         raise ValueError(f"No part found in {score_xml}")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""A small make-like runner for the show build pipeline.
+
+Each `Stage` declares the files and directories it reads and writes. Stages that
+write something another stage touches run first (declaration order breaks ties
+between writers); everything else may run concurrently. After a successful run,
+every stage's inputs and outputs are stamped by content hash. The next run skips
+a stage whose stamped hashes still match the tree, and its parameters are
+unchanged, provided nothing it depends on ran.
+
+Stages may hand their results to later stages in memory and leave the writing to
+a `finalize` callback that runs once every stage has finished. That is why a stage
+below one that ran is never checked against the disk: its inputs may not be there yet.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import file_hashes
+
+
+ROOT = Path(__file__).resolve().parents[1]
+STAMP_PATH = ROOT / ".cache" / "build-show-runtime-stamps.json"
+STAMP_VERSION = 1
+MISSING = "missing"
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    action: Callable[[], None]
+    inputs: tuple[Path, ...]
+    outputs: tuple[Path, ...]
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class StageResult:
+    name: str
+    status: str
+    elapsed_seconds: float
+    error: str | None = None
+
+
+def paths_overlap(first: Path, second: Path) -> bool:
+    return first == second or first in second.parents or second in first.parents
+
+
+def stage_dependencies(stages: list[Stage]) -> dict[str, set[str]]:
+    """Map each stage to the earlier stages that write something it reads or writes."""
+
+    dependencies: dict[str, set[str]] = {}
+    for index, stage in enumerate(stages):
+        touched = stage.inputs + stage.outputs
+        dependencies[stage.name] = {
+            earlier.name
+            for earlier in stages[:index]
+            if any(paths_overlap(written, path) for written in earlier.outputs for path in touched)
+        }
+    return dependencies
+
+
+def expand_files(paths: Iterable[Path]) -> dict[str, Path | None]:
+    """Relative path -> file for every file under `paths`; None marks a missing path."""
+
+    files: dict[str, Path | None] = {}
+    for path in paths:
+        if path.is_dir():
+            for child in sorted(path.rglob("*")):
+                if child.is_file():
+                    files[str(child.relative_to(ROOT))] = child
+        else:
+            files[str(path.relative_to(ROOT))] = path if path.is_file() else None
+    return files
+
+
+def content_fingerprint(paths: Iterable[Path]) -> dict[str, str]:
+    files = expand_files(paths)
+    digests = file_hashes.sha256_many(path for path in files.values() if path is not None)
+    return {relative: digests[path] if path is not None else MISSING for relative, path in files.items()}
+
+
+def stage_stamp(stage: Stage) -> dict[str, Any]:
+    return {
+        "params": stage.params,
+        "inputs": content_fingerprint(stage.inputs),
+        "outputs": content_fingerprint(stage.outputs),
+    }
+
+
+def load_stamps() -> dict[str, dict[str, Any]]:
+    if not STAMP_PATH.exists():
+        return {}
+    try:
+        payload = json.loads(STAMP_PATH.read_text())
+    except json.JSONDecodeError:
+        return {}
+    if payload.get("version") != STAMP_VERSION:
+        return {}
+    return payload.get("stages", {})
+
+
+def write_stamps(stamps: dict[str, dict[str, Any]]) -> None:
+    STAMP_PATH.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = STAMP_PATH.with_name(f"{STAMP_PATH.name}.{os.getpid()}.partial")
+    temp_path.write_text(json.dumps({"version": STAMP_VERSION, "stages": dict(sorted(stamps.items()))}, indent=2) + "\n")
+    temp_path.replace(STAMP_PATH)
+
+
+def is_fresh(stage: Stage, stamp: dict[str, Any] | None) -> bool:
+    if stamp is None:
+        return False
+    current = stage_stamp(stage)
+    if MISSING in current["outputs"].values():
+        return False
+    return current == stamp
+
+
+def run_stages(
+    stages: list[Stage],
+    jobs: int = 1,
+    force: bool = False,
+    finalize: Callable[[], None] | None = None,
+) -> list[StageResult]:
+    """Run stale stages in dependency order, up to `jobs` at a time.
+
+    After a failure no new stages start: stages that depend on the failure are
+    reported as blocked, the rest as cancelled. `finalize` is called once all
+    stages are done, even after a failure, and before anything is stamped.
+    """
+
+    by_name = {stage.name: stage for stage in stages}
+    dependencies = stage_dependencies(stages)
+    stamps = {} if force else load_stamps()
+    results: dict[str, StageResult] = {}
+    lock = threading.Lock()
+
+    def execute(stage: Stage) -> StageResult:
+        started = time.perf_counter()
+        with lock:
+            stamp = stamps.get(stage.name)
+            upstream_ran = any(results[name].status == "ran" for name in dependencies[stage.name])
+        if not upstream_ran and is_fresh(stage, stamp):
+            return StageResult(stage.name, "skipped", time.perf_counter() - started)
+        try:
+            stage.action()
+        except BaseException as exc:  # noqa: BLE001 - report SystemExit from scripts too
+            return StageResult(stage.name, "failed", time.perf_counter() - started, error=str(exc) or type(exc).__name__)
+        return StageResult(stage.name, "ran", time.perf_counter() - started)
+
+    pending = list(stages)
+    running: dict[Future[StageResult], str] = {}
+    failed = False
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        while pending or running:
+            for stage in list(pending):
+                blockers = dependencies[stage.name]
+                if any(results.get(name) is not None and results[name].status in {"failed", "blocked"} for name in blockers):
+                    results[stage.name] = StageResult(stage.name, "blocked", 0.0)
+                    pending.remove(stage)
+                elif not failed and len(running) < max(1, jobs) and all(name in results for name in blockers):
+                    running[executor.submit(execute, stage)] = stage.name
+                    pending.remove(stage)
+            if not running:
+                for stage in pending:
+                    results[stage.name] = StageResult(stage.name, "cancelled", 0.0)
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results[running.pop(future)] = result
+                failed = failed or result.status == "failed"
+
+    if finalize is not None:
+        finalize()
+
+    fresh_stamps = {} if force else load_stamps()
+    for name, result in results.items():
+        if result.status in {"ran", "skipped"}:
+            fresh_stamps[name] = stage_stamp(by_name[name])
+        else:
+            fresh_stamps.pop(name, None)
+    write_stamps(fresh_stamps)
+    return [results[stage.name] for stage in stages]
+
+
+def print_stage_table(results: list[StageResult], wall_seconds: float) -> None:
+    width = max([len(result.name) for result in results] + [5])
+    print(f"{'Stage':<{width}}  {'Status':<8}  {'Seconds':>8}")
+    for result in results:
+        print(f"{result.name:<{width}}  {result.status:<8}  {result.elapsed_seconds:8.2f}")
+        if result.error:
+            print(f"{'':<{width}}  {result.error}")
+    print(f"{'wall':<{width}}  {'':<8}  {wall_seconds:8.2f}")
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""Estimate how hard each light-show part drives a phone's torch.
+
+Phones throttle or switch off the torch once they get hot, and heat follows the
+light the torch puts out over the last few tens of seconds. This module integrates
+each part's keyframes exactly, with the same `step`/linear rules as the client's
+`interpolateLightLevel`. For every part it reports:
+
+- the energy in full-torch seconds, summed over the show;
+- the duty cycle, the share of lit time while the part's events run;
+- the mean level over a sliding window, checked every `WINDOW_HOP_MS`.
+
+Events are placed on the show timeline at their trigger onsets from the trigger
+manifest. Like the client, an event stops when the next trigger fires, and the torch
+is dark between events. The windows slide over this concatenated per-part signal,
+so a window that crosses a trigger boundary sees both events. Runs of windows whose
+mean level is above the budget are merged into one span each.
+`build_trigger_point_light_show` uses this as a gate before it writes a manifest.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+LIGHT_SHOW_MANIFEST_PATH = REPO_ROOT / "docs/score-study/tour_cut_light_show.json"
+DEFAULT_WINDOW_MS = 30000.0
+DEFAULT_WINDOW_BUDGET = 0.6
+WINDOW_HOP_MS = 100.0
+
+
+def _keyframe_arrays(keyframes: list[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    at_ms = np.array([frame["atMs"] for frame in keyframes], dtype=np.float64)
+    levels = np.clip(np.array([frame["level"] for frame in keyframes], dtype=np.float64), 0.0, 1.0)
+    steps = np.array([frame.get("interpolation") == "step" for frame in keyframes], dtype=bool)
+    return at_ms, levels, steps
+
+
+def _cumulative(
+    at_ms: np.ndarray,
+    start: np.ndarray,
+    end: np.ndarray,
+    before: float,
+    after: float,
+    times_ms: np.ndarray,
+) -> np.ndarray:
+    """Integral from `at_ms[0]` to each time of a function that ramps `start[i]` -> `end[i]` on segment i.
+
+    Outside the keyframes the function holds `before` and `after`; callers clip the
+    times to the span they want counted.
+    """
+
+    span = np.diff(at_ms)
+    area = np.where(span > 0, (start + end) * 0.5 * span, 0.0)
+    cumulative = np.concatenate(([0.0], np.cumsum(area)))
+    result = np.where(
+        times_ms < at_ms[0],
+        before * (times_ms - at_ms[0]),
+        cumulative[-1] + after * (times_ms - at_ms[-1]),
+    )
+    if len(span) == 0:
+        return result
+
+    inside = (times_ms >= at_ms[0]) & (times_ms < at_ms[-1])
+    index = np.clip(np.searchsorted(at_ms, times_ms[inside], side="right") - 1, 0, len(span) - 1)
+    offset = times_ms[inside] - at_ms[index]
+    safe_span = np.where(span[index] > 0, span[index], 1.0)
+    slope = (end[index] - start[index]) / safe_span
+    result[inside] = cumulative[index] + start[index] * offset + slope * offset * offset * 0.5
+    return result
+
+
+def cumulative_energy(keyframes: list[dict[str, Any]], times_ms: np.ndarray) -> np.ndarray:
+    """Light emitted from the first keyframe up to each time, in level-milliseconds."""
+
+    at_ms, levels, steps = _keyframe_arrays(keyframes)
+    start = levels[:-1]
+    end = np.where(steps[:-1], levels[:-1], levels[1:])
+    return _cumulative(at_ms, start, end, levels[0], levels[-1], np.asarray(times_ms, dtype=np.float64))
+
+
+def cumulative_lit(keyframes: list[dict[str, Any]], times_ms: np.ndarray) -> np.ndarray:
+    """Milliseconds with the torch on from the first keyframe up to each time."""
+
+    at_ms, levels, steps = _keyframe_arrays(keyframes)
+    lit = levels > 0
+    segment_lit = np.where(steps[:-1], lit[:-1], lit[:-1] | lit[1:]).astype(np.float64)
+    return _cumulative(
+        at_ms,
+        segment_lit,
+        segment_lit,
+        float(lit[0]),
+        float(lit[-1]),
+        np.asarray(times_ms, dtype=np.float64),
+    )
+
+
+def event_spans(
+    light_manifest: dict[str, Any],
+    trigger_manifest: dict[str, Any] | None = None,
+) -> list[tuple[dict[str, Any], float, float]]:
+    """Return `(event, onset_ms, span_ms)` in show order, each span cut at the next onset."""
+
+    if trigger_manifest is None:
+        trigger_manifest = json.loads((REPO_ROOT / light_manifest["sourceTriggerManifest"]).read_text())
+    onsets = {int(event["id"]): float(event["onsetMilliseconds"]) for event in trigger_manifest["events"]}
+    placed = []
+    for event in light_manifest["events"]:
+        if int(event["id"]) not in onsets:
+            raise ValueError(f"Light-show event {event['id']} has no onset in the trigger manifest")
+        placed.append((onsets[int(event["id"])], event))
+    placed.sort(key=lambda item: item[0])
+
+    spans = []
+    for index, (onset_ms, event) in enumerate(placed):
+        span_ms = float(event["durationMs"])
+        if index + 1 < len(placed):
+            span_ms = min(span_ms, placed[index + 1][0] - onset_ms)
+        spans.append((event, onset_ms, span_ms))
+    return spans
+
+
+def show_cumulative(
+    cumulative: Callable[[list[dict[str, Any]], np.ndarray], np.ndarray],
+    pieces: list[tuple[list[dict[str, Any]], float, float]],
+    times_ms: np.ndarray,
+) -> np.ndarray:
+    """Sum `cumulative(keyframes, t)` over `(keyframes, onset_ms, span_ms)` pieces on the show timeline.
+
+    Each piece only counts inside `[onset_ms, onset_ms + span_ms)`, so the result is the
+    integral of a signal that is dark between pieces.
+    """
+
+    times_ms = np.asarray(times_ms, dtype=np.float64)
+    total = np.zeros_like(times_ms)
+    for keyframes, onset_ms, span_ms in pieces:
+        local = np.clip(times_ms - onset_ms, 0.0, span_ms)
+        total += cumulative(keyframes, local) - cumulative(keyframes, np.zeros(1))
+    return total
+
+
+def window_means(
+    pieces: list[tuple[list[dict[str, Any]], float, float]],
+    show_end_ms: float,
+    window_ms: float = DEFAULT_WINDOW_MS,
+    hop_ms: float = WINDOW_HOP_MS,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return window start times and the mean level over `[start, start + window_ms)` of the show."""
+
+    last_start = max(show_end_ms - window_ms, 0.0)
+    starts = np.arange(0.0, last_start, hop_ms)
+    starts = np.append(starts, last_start)
+    ends = np.minimum(starts + window_ms, show_end_ms)
+    energy = show_cumulative(cumulative_energy, pieces, ends) - show_cumulative(cumulative_energy, pieces, starts)
+    return starts, energy / window_ms
+
+
+def _over_budget_spans(
+    starts: np.ndarray,
+    means: np.ndarray,
+    budget: float,
+    window_ms: float,
+) -> list[tuple[float, float, float]]:
+    over = means > budget
+    if not over.any():
+        return []
+    edges = np.diff(np.concatenate(([0], over.astype(np.int8), [0])))
+    spans: list[tuple[float, float, float]] = []
+    for first, stop in zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()):
+        start_ms = float(starts[first])
+        end_ms = float(starts[stop - 1] + window_ms)
+        peak = float(means[first:stop].max())
+        if spans and start_ms <= spans[-1][1]:
+            previous = spans.pop()
+            start_ms, peak = previous[0], max(previous[2], peak)
+        spans.append((start_ms, end_ms, peak))
+    return spans
+
+
+def _event_ids_between(spans: list[tuple[dict[str, Any], float, float]], start_ms: float, end_ms: float) -> list[int]:
+    return [event["id"] for event, onset_ms, span_ms in spans if onset_ms < end_ms and onset_ms + span_ms > start_ms]
+
+
+def analyze_light_show(
+    light_manifest: dict[str, Any],
+    window_ms: float = DEFAULT_WINDOW_MS,
+    budget: float = DEFAULT_WINDOW_BUDGET,
+    trigger_manifest: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    spans = event_spans(light_manifest, trigger_manifest)
+    show_end_ms = max((onset_ms + span_ms for _, onset_ms, span_ms in spans), default=0.0)
+    pieces_by_part: dict[str, list[tuple[list[dict[str, Any]], float, float]]] = {}
+    for event, onset_ms, span_ms in spans:
+        for part_key, part in event["parts"].items():
+            if part["keyframes"]:
+                pieces_by_part.setdefault(part_key, []).append((part["keyframes"], onset_ms, span_ms))
+
+    summary: dict[str, dict[str, Any]] = {}
+    over_budget: list[dict[str, Any]] = []
+    bounds = np.array([0.0, show_end_ms])
+    for part_key, pieces in pieces_by_part.items():
+        duration_ms = sum(span_ms for _, _, span_ms in pieces)
+        energy = float(np.diff(show_cumulative(cumulative_energy, pieces, bounds))[0])
+        lit_ms = float(np.diff(show_cumulative(cumulative_lit, pieces, bounds))[0])
+        starts, means = window_means(pieces, show_end_ms, window_ms)
+        peak = int(np.argmax(means))
+        peak_start_ms = float(starts[peak])
+        summary[part_key] = {
+            "durationMs": round(duration_ms, 3),
+            "energyTorchSeconds": round(energy / 1000.0, 3),
+            "litMs": round(lit_ms, 3),
+            "dutyCycle": round(lit_ms / duration_ms, 4) if duration_ms else 0.0,
+            "meanLevel": round(energy / duration_ms, 4) if duration_ms else 0.0,
+            "peakWindow": {
+                "startMs": round(peak_start_ms, 3),
+                "eventIds": _event_ids_between(spans, peak_start_ms, peak_start_ms + window_ms),
+                "meanLevel": round(float(means[peak]), 4),
+            },
+        }
+        for start_ms, end_ms, peak_mean in _over_budget_spans(starts, means, budget, window_ms):
+            end_ms = min(end_ms, show_end_ms)
+            over_budget.append(
+                {
+                    "part": part_key,
+                    "startMs": round(start_ms, 3),
+                    "endMs": round(end_ms, 3),
+                    "eventIds": _event_ids_between(spans, start_ms, end_ms),
+                    "peakMeanLevel": round(peak_mean, 4),
+                }
+            )
+    return {"windowMs": window_ms, "budget": budget, "parts": summary, "overBudget": over_budget}
+
+
+def budget_problems(report: dict[str, Any]) -> list[str]:
+    return [
+        f"{span['part']} (events {', '.join(map(str, span['eventIds']))}): mean level {span['peakMeanLevel']:.3f} over "
+        f"{report['windowMs'] / 1000.0:g} s exceeds {report['budget']:.3f} "
+        f"between {span['startMs']:.0f} and {span['endMs']:.0f} ms of the show"
+        for span in report["overBudget"]
+    ]
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(f"{'Part':<12}  {'Lit s':>8}  {'Duty':>6}  {'Torch s':>8}  {'Peak window':>11}  {'At s':>6}  Events")
+    for part_key, part in report["parts"].items():
+        peak = part["peakWindow"]
+        print(
+            f"{part_key:<12}  {part['litMs'] / 1000.0:8.1f}  {part['dutyCycle']:6.1%}  "
+            f"{part['energyTorchSeconds']:8.1f}  {peak['meanLevel']:11.3f}  {peak['startMs'] / 1000.0:6.1f}  "
+            f"{', '.join(map(str, peak['eventIds']))}"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Report torch duty cycle and sliding-window load per light-show part.")
+    parser.add_argument("--window-s", type=float, default=DEFAULT_WINDOW_MS / 1000.0, help="Sliding window length.")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_WINDOW_BUDGET,
+        help="Highest allowed mean torch level (0-1) over any window.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    light_manifest = json.loads(LIGHT_SHOW_MANIFEST_PATH.read_text())
+    report = analyze_light_show(light_manifest, args.window_s * 1000.0, args.budget)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    problems = budget_problems(report)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
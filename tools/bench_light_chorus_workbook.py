@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Spreadsheet export benchmark.
+
+Compares the regular and write-only openpyxl paths used by the Light Chorus
+builder (`build_workbook`) and the v4 event-recipe export (`export_xlsx`) on
+synthetic scores, reporting wall time and peak Python heap for each size.
+
+Wall time and heap come from separate runs, because tracemalloc slows the
+allocation-heavy regular mode far more than the write-only one. Scores wider
+than one XLSX sheet (16,384 columns) are split across several sheets.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+for import_root in (ROOT, ROOT / "scripts"):
+    if str(import_root) not in sys.path:
+        sys.path.insert(0, str(import_root))
+
+from generate_event_recipes_v4 import export_xlsx
+from light_chorus_app.processor import PART_DEFINITIONS, EventColumn, NoteEntry, build_workbook
+
+DEFAULT_SIZES = (200, 2_000, 20_000)
+
+
+def synthetic_events(count: int) -> Tuple[List[EventColumn], List[str]]:
+    part_order = [part_name for part_name, _ in PART_DEFINITIONS]
+    events: List[EventColumn] = []
+    for index in range(count):
+        part_notes = {}
+        for part_index, part_name in enumerate(part_order):
+            if (index + part_index) % 3 == 0:
+                continue
+            midi = 48 + (index + part_index * 5) % 36
+            part_notes[part_name] = [NoteEntry(midi=midi, note_name=f"N{midi}", short_sample=str(midi - 36))]
+        events.append(
+            EventColumn(
+                number=index + 1,
+                tick=index * 480,
+                measure=index // 4 + 1,
+                position_label=f"{index % 4 + 1}-of-4",
+                part_notes=part_notes,
+            )
+        )
+    return events, part_order
+
+
+def synthetic_recipe_rows(count: int) -> List[List[str]]:
+    rows: List[List[str]] = [["Source Score", "synthetic"], [], [], [], []]
+    rows.append(["", "Event #", *[str(index + 1) for index in range(count)]])
+    for label in ("Measure #", "Position (beat)", "Official Trigger Point", "Sample Length"):
+        rows.append(["", label, *[f"{label[:1]}{index}" for index in range(count)]])
+    for staff in range(12):
+        rows.append(["", f"Staff {staff}", *[f"primerTones/short{(index + staff) % 48}.mp3" for index in range(count)]])
+    return rows
+
+
+def measure(action: Callable[[], None], trace_memory: bool = True) -> Tuple[float, float]:
+    started = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - started
+    if not trace_memory:
+        return elapsed, float("nan")
+    tracemalloc.start()
+    action()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass and only report wall time.")
+    args = parser.parse_args()
+    trace_memory = not args.no_memory
+
+    print(f"{'target':<14} {'events':>7} {'mode':<11} {'seconds':>9} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory(prefix="xlsx-bench-") as tmp_dir:
+        output_path = Path(tmp_dir) / "bench.xlsx"
+        for size in args.sizes:
+            events, part_order = synthetic_events(size)
+            recipe_rows = synthetic_recipe_rows(size)
+            for write_only in (False, True):
+                mode = "write-only" if write_only else "regular"
+                seconds, peak = measure(
+                    lambda: build_workbook(events, part_order, write_only=write_only).save(output_path),
+                    trace_memory,
+                )
+                print(f"{'light chorus':<14} {size:>7} {mode:<11} {seconds:>9.3f} {peak:>9.1f}")
+                seconds, peak = measure(
+                    lambda: export_xlsx(recipe_rows, output_path, write_only=write_only),
+                    trace_memory,
+                )
+                print(f"{'event recipes':<14} {size:>7} {mode:<11} {seconds:>9.3f} {peak:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
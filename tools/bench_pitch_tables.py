@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Pitch lookup microbenchmark.
+
+Replays every pitched note of the full MusicXML score through the legacy
+per-note string/regex helpers and through `light_chorus_app.pitch_tables`,
+checks that both produce identical results, and reports the speedup.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+for import_root in (ROOT, ROOT / "scripts"):
+    if str(import_root) not in sys.path:
+        sys.path.insert(0, str(import_root))
+
+from generate_event_recipes_v4 import NEW_SCORE_PATH, parse_pitch, sample_name_for
+from light_chorus_app.pitch_tables import ALTER_TO_ACCIDENTAL, STEP_TO_SEMITONE, note_name
+
+LEGACY_ACCIDENTAL_MAP = {"C#": "Db", "D#": "Eb", "F#": "Gb", "G#": "Ab", "A#": "Bb"}
+
+
+def legacy_note_to_name(note: int, octave_offset: int) -> str:
+    pitch_classes = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+    base_name = pitch_classes[note % 12]
+    name = LEGACY_ACCIDENTAL_MAP.get(base_name, base_name)
+    return f"{name}{(note // 12) + octave_offset}"
+
+
+def legacy_parse_pitch(note: ET.Element) -> Tuple[int, str]:
+    pitch = note.find("pitch")
+    step = pitch.findtext("step")
+    alter = int(pitch.findtext("alter", "0"))
+    octave_number = int(pitch.findtext("octave"))
+    midi = 12 * (octave_number + 1) + STEP_TO_SEMITONE[step] + alter
+    return midi, f"{step}{ALTER_TO_ACCIDENTAL.get(alter, f'({alter})')}{octave_number}"
+
+
+def legacy_sample_name_for(note_label: str, *, is_long: bool) -> str:
+    note_match = re.match(r"^([A-G])(bb|##|b|#)?(\d+)$", note_label)
+    if note_match is None:
+        raise ValueError(f"Unsupported note label: {note_label}")
+    alter = {"bb": -2, "b": -1, "": 0, "#": 1, "##": 2}[note_match.group(2) or ""]
+    midi = 12 * (int(note_match.group(3)) + 1) + STEP_TO_SEMITONE[note_match.group(1)] + alter
+    base_index = midi - 36
+    if is_long:
+        return f"primerTones/long{base_index + 50}.mp3"
+    return f"primerTones/short{base_index}.mp3"
+
+
+def pitched_notes(score_path: Path) -> List[ET.Element]:
+    root = ET.parse(score_path).getroot()
+    return [note for note in root.iter("note") if note.find("pitch") is not None]
+
+
+def run_pipeline(
+    notes: List[ET.Element],
+    parse: Callable[[ET.Element], Tuple[int, str]],
+    name_for: Callable[[int, int], str],
+    sample_for: Callable[..., str],
+) -> List[Tuple[int, str, str, str, str, str]]:
+    results = []
+    for note in notes:
+        midi, label = parse(note)
+        results.append(
+            (
+                midi,
+                label,
+                name_for(midi, -1),
+                name_for(midi, 0),
+                sample_for(label, is_long=False),
+                sample_for(label, is_long=True),
+            )
+        )
+    return results
+
+
+def best_of(repeats: int, action: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        action()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--score", type=Path, default=NEW_SCORE_PATH)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    notes = pitched_notes(args.score)
+    legacy = lambda: run_pipeline(notes, legacy_parse_pitch, legacy_note_to_name, legacy_sample_name_for)  # noqa: E731
+    tabled = lambda: run_pipeline(notes, parse_pitch, note_name, sample_name_for)  # noqa: E731
+    if legacy() != tabled():
+        print("Pitch table results differ from the legacy helpers", file=sys.stderr)
+        return 1
+
+    legacy_seconds = best_of(args.repeats, legacy)
+    table_seconds = best_of(args.repeats, tabled)
+    print(f"Score: {args.score.name} ({len(notes)} pitched notes)")
+    print(f"legacy helpers: {legacy_seconds * 1000:8.2f} ms")
+    print(f"pitch tables:   {table_seconds * 1000:8.2f} ms")
+    print(f"speedup:        {legacy_seconds / table_seconds:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Compare the size and parse time of event_recipes.json and event_recipes.bin.
+
+Encodes the canonical recipe bundle, checks that the binary decodes back to the
+same JSON, then reports raw and gzip sizes and the median parse time of each format.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS = ROOT / "scripts"
+if str(SCRIPTS) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS))
+
+import recipe_binary
+import recipe_bundle
+
+
+def median_ms(parse: Callable[[bytes], object], payload: bytes, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        parse(payload)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50, help="Parses per format; the median is reported.")
+    args = parser.parse_args()
+
+    json_payload = recipe_bundle.CANONICAL_RECIPE_PATH.read_bytes()
+    bundle = json.loads(json_payload)
+    compact_payload = json.dumps(bundle, separators=(",", ":")).encode("utf-8")
+    binary_payload = recipe_binary.encode_recipe_bundle(bundle)
+    problem = recipe_binary.verify_round_trip(bundle, binary_payload)
+    if problem is not None:
+        print(f"Binary bundle does not round-trip: {problem}", file=sys.stderr)
+        return 1
+
+    formats = [
+        ("json (shipped)", json_payload, json.loads),
+        ("json (compact)", compact_payload, json.loads),
+        ("binary", binary_payload, recipe_binary.decode_recipe_bundle),
+    ]
+    print(f"{'Format':<16}  {'Bytes':>8}  {'Gzip':>8}  {'Parse ms':>8}")
+    for label, payload, parse in formats:
+        print(
+            f"{label:<16}  {len(payload):8d}  {len(gzip.compress(payload)):8d}  "
+            f"{median_ms(parse, payload, args.runs):8.3f}"
+        )
+    print("Parse times are CPython; json.loads is C, the binary reader is pure Python.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,13 @@
+"""Entry point for headless Light Chorus batch conversion."""
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from light_chorus_app.cli import main
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())